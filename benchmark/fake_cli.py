@@ -0,0 +1,224 @@
+"""
+Local stand-in for pyJiraCli, pyPolarionCli and pySupersetCli, used by the benchmark.
+It accepts the arguments pyMetricCli passes to the tools, writes search results
+of the configured size and waits for the configured latency.
+
+Usage: python fake_cli.py <jira|polarion|superset> <arguments of the tool>
+
+Environment:
+    PYMETRICCLI_BENCH_ITEMS: Number of issues or work items of a search. Default: 1000
+    PYMETRICCLI_BENCH_LATENCY: Latency of each call in seconds. Default: 0
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import sys
+import json
+import time
+
+################################################################################
+# Variables
+################################################################################
+
+ITEMS_ENV = "PYMETRICCLI_BENCH_ITEMS"
+LATENCY_ENV = "PYMETRICCLI_BENCH_LATENCY"
+
+_STATUSES = ("open", "in_progress", "closed")
+_UPDATED = "2025-01-01T10:00:00.000+0100"
+
+# Number of items written at once.
+_CHUNK_SIZE = 10000
+
+################################################################################
+# Classes
+################################################################################
+
+################################################################################
+# Functions
+################################################################################
+
+
+def _get_argument(arguments: list, name: str) -> str:
+    """
+    Get the value of a command line option.
+
+    Args:
+        arguments (list): The command line arguments.
+        name (str): The option, e.g. "--file".
+
+    Returns:
+        str: The value of the option.
+    """
+    return arguments[arguments.index(name) + 1]
+
+
+def _write_items(file_path: str, header: dict, items_key: str, make_item) -> None:
+    """
+    Write search results in chunks, so even large results need little memory.
+
+    Args:
+        file_path (str): Path to the result file.
+        header (dict): The values of the results besides the item list.
+        items_key (str): Key of the item list.
+        make_item (Callable[[int], dict]): Creates the item with the given index.
+    """
+    item_count = int(os.environ.get(ITEMS_ENV, "1000"))
+
+    with open(file_path, "w", encoding="utf-8") as file:
+        file.write(json.dumps(header)[:-1] + f', "{items_key}": [')
+
+        for start in range(0, item_count, _CHUNK_SIZE):
+            chunk = [json.dumps(make_item(index))
+                     for index in range(start, min(start + _CHUNK_SIZE, item_count))]
+
+            if start > 0:
+                file.write(", ")
+
+            file.write(", ".join(chunk))
+
+        file.write("]}")
+
+
+def _make_issue(index: int) -> dict:
+    """
+    Create a Jira issue.
+
+    Args:
+        index (int): The index of the issue.
+
+    Returns:
+        dict: The issue.
+    """
+    return {"key": f"BENCH-{index}",
+            "fields": {"summary": f"Benchmark issue {index}",
+                       "status": {"name": _STATUSES[index % len(_STATUSES)]},
+                       "created": _UPDATED,
+                       "updated": _UPDATED}}
+
+
+def _make_work_item(index: int) -> dict:
+    """
+    Create a Polarion work item.
+
+    Args:
+        index (int): The index of the work item.
+
+    Returns:
+        dict: The work item.
+    """
+    return {"id": f"BENCH-{index}",
+            "title": f"Benchmark work item {index}",
+            "type": "requirement",
+            "status": _STATUSES[index % len(_STATUSES)],
+            "updated": _UPDATED}
+
+
+def _run_jira(arguments: list) -> int:
+    """
+    Act as "pyJiraCli search".
+
+    Args:
+        arguments (list): The command line arguments.
+
+    Returns:
+        int: The exit code.
+    """
+    _write_items(_get_argument(arguments, "--file"),
+                 {"total": int(os.environ.get(ITEMS_ENV, "1000"))},
+                 "issues",
+                 _make_issue)
+    return 0
+
+
+def _run_polarion(arguments: list) -> int:
+    """
+    Act as "pyPolarionCli search".
+
+    Args:
+        arguments (list): The command line arguments.
+
+    Returns:
+        int: The exit code.
+    """
+    project = _get_argument(arguments, "--project")
+    file_path = os.path.join(_get_argument(arguments, "--output"),
+                             f"{project}_search_results.json")
+
+    _write_items(file_path, {"project": project}, "workitems", _make_work_item)
+    return 0
+
+
+def _run_superset(arguments: list) -> int:
+    """
+    Act as "pySupersetCli upload". The file is parsed like a real upload would.
+
+    Args:
+        arguments (list): The command line arguments.
+
+    Returns:
+        int: The exit code.
+    """
+    with open(_get_argument(arguments, "--file"), "r", encoding="utf-8") as file:
+        json.load(file)
+
+    return 0
+
+
+def main() -> int:
+    """
+    The program entry point function.
+
+    Returns:
+        int: The exit code.
+    """
+    tools = {"jira": _run_jira, "polarion": _run_polarion, "superset": _run_superset}
+    exit_code = 0
+
+    if (len(sys.argv) < 2) or (sys.argv[1] not in tools):
+        print(__doc__, file=sys.stderr)
+        exit_code = 2
+    elif "--help" not in sys.argv:
+        time.sleep(float(os.environ.get(LATENCY_ENV, "0")))
+        exit_code = tools[sys.argv[1]](sys.argv[2:])
+
+    return exit_code
+
+################################################################################
+# Main
+################################################################################
+
+
+if __name__ == "__main__":
+    sys.exit(main())
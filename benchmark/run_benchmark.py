@@ -0,0 +1,575 @@
+"""
+Benchmark of the pyMetricCli pipeline with local stand-ins for pyJiraCli,
+pyPolarionCli and pySupersetCli, see fake_cli.py. No server is contacted.
+
+Each case runs the stages of one adapter run in its own process and measures
+their wall time: tool probe, search, JSON load, adapter handling, temporary
+file write and upload. Each end-to-end case runs pyMetricCli itself with an
+adapter file and measures its total wall time. The report contains the
+throughput and the peak RSS of the case process or of the pyMetricCli process.
+Results can be saved as baseline, later runs are compared against it to reveal
+regressions.
+
+Usage: python benchmark/run_benchmark.py [--items 1000 10000] [--latency 0.1]
+       [--baseline benchmark/baseline.json] [--save-baseline] [--tolerance 0.2]
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import datetime
+import platform
+import tempfile
+import subprocess
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows.
+    resource = None
+
+_BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(_BENCHMARK_DIR), "src"))
+
+# pylint: disable=wrong-import-position
+from fake_cli import ITEMS_ENV, LATENCY_ENV
+from pyMetricCli.pipeline import save_temp_file
+from pyMetricCli.adapter_interface import AdapterInterface
+from pyMetricCli.jira import Jira
+from pyMetricCli.paths import CACHE_DIR_ENV
+from pyMetricCli.polarion import Polarion
+from pyMetricCli.ret import Ret
+from pyMetricCli.superset import Superset
+from pyMetricCli.tools import probe_tool
+
+################################################################################
+# Variables
+################################################################################
+
+_DEFAULT_ITEMS = [1000, 10000, 100000]
+_DEFAULT_BASELINE = os.path.join(_BENCHMARK_DIR, "baseline.json")
+_DEFAULT_TOLERANCE = 0.2
+
+# Differences below this number of seconds are treated as noise.
+_MIN_DIFFERENCE = 0.05
+
+_TOOLS = {"jira": "pyJiraCli", "polarion": "pyPolarionCli", "superset": "pySupersetCli"}
+_STAGES = ("probe", "search", "load", "handle", "write", "upload")
+
+# Suffix of the end-to-end cases, e.g. "jira-cli".
+_CLI_SUFFIX = "-cli"
+
+# Adapter file of an end-to-end case, which uses the adapter of this benchmark.
+_ADAPTER_FILE_TEMPLATE = '''"""
+Adapter of an end-to-end benchmark case, created by run_benchmark.py.
+"""
+import sys
+sys.path.insert(0, {benchmark_dir!r})
+from run_benchmark import create_adapter_class
+Adapter = create_adapter_class({tool!r}, {work_dir!r})
+'''
+
+################################################################################
+# Classes
+################################################################################
+
+################################################################################
+# Functions
+################################################################################
+
+
+def _get_peak_rss_mb(who: int = None) -> float:
+    """
+    Get the peak resident set size of this process in MB.
+    The tool processes are not measured, as on Linux they inherit the
+    peak RSS of this process when they are started.
+
+    Args:
+        who (int): resource.RUSAGE_SELF or resource.RUSAGE_CHILDREN for the largest
+            terminated child process. Default: resource.RUSAGE_SELF
+
+    Returns:
+        float: The peak RSS in MB, None if not available.
+    """
+    peak_rss = None
+
+    if resource is not None:
+        if who is None:
+            who = resource.RUSAGE_SELF
+
+        max_rss = resource.getrusage(who).ru_maxrss
+        # Linux reports KB, macOS bytes.
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        peak_rss = round(max_rss / divisor, 1)
+
+    return peak_rss
+
+
+def _measure(stages: dict, name: str, function, *args):
+    """
+    Run a function and store its wall time as stage.
+
+    Args:
+        stages (dict): The wall time of each stage in seconds.
+        name (str): The name of the stage.
+        function (Callable): The function to run.
+        args: The arguments of the function.
+
+    Returns:
+        The return value of the function.
+    """
+    start = time.perf_counter()
+    result = function(*args)
+    stages[name] = round(time.perf_counter() - start, 4)
+
+    return result
+
+
+def create_adapter_class(tool: str, work_dir: str) -> type:
+    """
+    Create the adapter class of a benchmark case, which counts the items per status.
+    Used by the adapter files of the end-to-end cases as well.
+
+    Args:
+        tool (str): "jira" or "polarion".
+        work_dir (str): The working directory of the case.
+
+    Returns:
+        type: The adapter class.
+    """
+    class BenchmarkAdapter(AdapterInterface):
+        """
+        Counts the issues or work items per status.
+        """
+        output = {"status_open": 0, "status_in_progress": 0, "status_closed": 0}
+
+        jira_config = {
+            "server": "bench",
+            "token": "bench",
+            "filter": "project = BENCH" if tool == "jira" else "",
+            "max": "0",
+            "fields": [],
+            "file": os.path.join(work_dir, "jira_search_results.json")
+        }
+
+        polarion_config = {
+            "server": "bench",
+            "username": "bench",
+            "password": "bench",
+            "token": "",
+            "project": "BENCH",
+            "query": "type:requirement" if tool == "polarion" else "",
+            "fields": [],
+            "output": work_dir
+        }
+
+        superset_config = {
+            "server": "bench",
+            "username": "bench",
+            "password": "bench",
+            "database": "1",
+            "table": "bench"
+        }
+
+        def handle_jira(self, search_results: dict) -> bool:
+            """
+            Count the issues per status.
+            """
+            for issue in search_results["issues"]:
+                self.output["status_" + issue["fields"]["status"]["name"]] += 1
+            return True
+
+        def handle_polarion(self, search_results: dict) -> bool:
+            """
+            Count the work items per status.
+            """
+            for work_item in search_results["workitems"]:
+                self.output["status_" + work_item["status"]] += 1
+            return True
+
+    return BenchmarkAdapter
+
+
+def run_case(tool: str, items: int, work_dir: str) -> dict:
+    """
+    Run the stages of one adapter run and measure them.
+    Runs in its own process, started by _start_case().
+
+    Args:
+        tool (str): "jira" or "polarion".
+        items (int): Number of issues or work items of the search.
+        work_dir (str): The working directory of the case.
+
+    Returns:
+        dict: The results of the case.
+    """
+    stages = {}
+    adapter = create_adapter_class(tool, work_dir)()
+    start = time.perf_counter()
+
+    _measure(stages, "probe", lambda: all(probe_tool(executable)
+                                          for executable in _TOOLS.values()))
+
+    if tool == "jira":
+        wrapper = Jira(adapter.jira_config)
+        handle = adapter.handle_jira
+    else:
+        wrapper = Polarion(adapter.polarion_config)
+        handle = adapter.handle_polarion
+
+    results = _measure(stages, "search", wrapper.search_stream)
+    results = _measure(stages, "load", results.load)
+
+    if _measure(stages, "handle", handle, results) is False:
+        raise RuntimeError("The adapter failed to handle the search results.")
+
+    temp_file_path = os.path.join(work_dir, "superset_input.json")
+
+    if Ret.OK != _measure(stages, "write", save_temp_file, adapter.output, temp_file_path):
+        raise RuntimeError("The temporary file could not be written.")
+
+    if 0 != _measure(stages, "upload", Superset(adapter.superset_config).upload, temp_file_path):
+        raise RuntimeError("The upload failed.")
+
+    wall = time.perf_counter() - start
+    processing = stages["search"] + stages["load"] + stages["handle"]
+
+    return {"tool": tool,
+            "items": items,
+            "stages": stages,
+            "wall": round(wall, 4),
+            "throughput": round(items / processing) if processing > 0 else None,
+            "peak_rss_mb": _get_peak_rss_mb()}
+
+
+def run_cli_case(tool: str, items: int, work_dir: str) -> dict:
+    """
+    Run pyMetricCli end to end with an adapter file and measure it.
+    Runs in its own process, started by _start_case(), so the peak RSS of
+    the terminated child processes is the one of pyMetricCli or of a tool.
+
+    Args:
+        tool (str): "jira" or "polarion".
+        items (int): Number of issues or work items of the search.
+        work_dir (str): The working directory of the case.
+
+    Returns:
+        dict: The results of the case.
+    """
+    adapter_file_path = os.path.join(work_dir, "benchmark_adapter.py")
+
+    with open(adapter_file_path, "w", encoding="utf-8") as file:
+        file.write(_ADAPTER_FILE_TEMPLATE.format(benchmark_dir=_BENCHMARK_DIR,
+                                                 tool=tool,
+                                                 work_dir=work_dir))
+
+    env = dict(os.environ)
+    src_dir = os.path.join(os.path.dirname(_BENCHMARK_DIR), "src")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src_dir, env.get("PYTHONPATH")]))
+
+    start = time.perf_counter()
+    ret = subprocess.run([sys.executable, "-m", "pyMetricCli", "-a", adapter_file_path],
+                         capture_output=True, check=False, env=env, text=True)
+    wall = time.perf_counter() - start
+
+    if 0 != ret.returncode:
+        raise RuntimeError(f"pyMetricCli failed with {ret.returncode}:\n{ret.stderr}")
+
+    return {"tool": tool + _CLI_SUFFIX,
+            "items": items,
+            "stages": {},
+            "wall": round(wall, 4),
+            "throughput": round(items / wall) if wall > 0 else None,
+            "peak_rss_mb": _get_peak_rss_mb(resource.RUSAGE_CHILDREN if resource else None)}
+
+
+def _create_launchers(bin_dir: str) -> None:
+    """
+    Create executables named like the tools, which run fake_cli.py.
+
+    Args:
+        bin_dir (str): The directory of the executables, to be added to PATH.
+    """
+    fake_cli_path = os.path.join(_BENCHMARK_DIR, "fake_cli.py")
+
+    for name, executable in _TOOLS.items():
+        launcher_path = os.path.join(bin_dir, executable)
+
+        with open(launcher_path, "w", encoding="utf-8") as file:
+            file.write(f'#!/bin/sh\nexec "{sys.executable}" "{fake_cli_path}" {name} "$@"\n')
+
+        os.chmod(launcher_path, 0o755)
+
+
+def _start_case(tool: str, items: int, latency: float, work_dir: str) -> dict:
+    """
+    Run a benchmark case in its own process, so its peak RSS is not
+    influenced by the other cases.
+
+    Args:
+        tool (str): "jira" or "polarion", with _CLI_SUFFIX for an end-to-end case.
+        items (int): Number of issues or work items of the search.
+        latency (float): Latency of each tool call in seconds.
+        work_dir (str): The working directory of the benchmark.
+
+    Returns:
+        dict: The results of the case.
+    """
+    case_dir = os.path.join(work_dir, f"{tool}_{items}")
+    os.makedirs(case_dir, exist_ok=True)
+
+    env = dict(os.environ)
+    env["PATH"] = os.path.join(work_dir, "bin") + os.pathsep + env.get("PATH", "")
+    env[CACHE_DIR_ENV] = os.path.join(work_dir, "cache")
+    env[ITEMS_ENV] = str(items)
+    env[LATENCY_ENV] = str(latency)
+
+    # The version of an uninstalled pyMetricCli is read from the pyproject.toml
+    # in the working directory, therefore the cases run in the repository root.
+    ret = subprocess.run([sys.executable, os.path.abspath(__file__),
+                          "--case", tool, str(items), case_dir],
+                         capture_output=True, check=False, env=env, text=True,
+                         cwd=os.path.dirname(_BENCHMARK_DIR))
+
+    if 0 != ret.returncode:
+        raise RuntimeError(f"The case {tool}/{items} failed:\n{ret.stderr}")
+
+    return json.loads(ret.stdout.strip().splitlines()[-1])
+
+
+def _print_results(results: list) -> None:
+    """
+    Print the results as table.
+
+    Args:
+        results (list): The results of all cases.
+    """
+    header = ["case"] + list(_STAGES) + ["wall", "items/s", "rss MB"]
+    print(" ".join(f"{column:>15}" for column in header))
+
+    for case in results:
+        row = [f"{case['tool']}/{case['items']}"]
+        # The end-to-end cases measure the total wall time only.
+        row += [f"{case['stages'][stage]:.3f}" if stage in case["stages"] else "-"
+                for stage in _STAGES]
+        row += [f"{case['wall']:.3f}", str(case["throughput"]), str(case["peak_rss_mb"])]
+        print(" ".join(f"{column:>15}" for column in row))
+
+
+def _compare_with_baseline(results: list, baseline: dict, tolerance: float) -> list:
+    """
+    Compare the results with the baseline.
+
+    Args:
+        results (list): The results of all cases.
+        baseline (dict): The stored baseline.
+        tolerance (float): Allowed relative slowdown, e.g. 0.2 for 20 %.
+
+    Returns:
+        list: Descriptions of the regressions.
+    """
+    regressions = []
+    baseline_cases = {(case["tool"], case["items"]): case for case in baseline["results"]}
+
+    for case in results:
+        baseline_case = baseline_cases.get((case["tool"], case["items"]))
+
+        if baseline_case is None:
+            continue
+
+        values = dict(case["stages"], wall=case["wall"])
+        baseline_values = dict(baseline_case["stages"], wall=baseline_case["wall"])
+
+        for name, value in values.items():
+            baseline_value = baseline_values.get(name)
+
+            if (baseline_value is not None) and \
+                    (value > baseline_value * (1 + tolerance)) and \
+                    ((value - baseline_value) > _MIN_DIFFERENCE):
+                regressions.append(f"{case['tool']}/{case['items']} {name}: "
+                                   f"{baseline_value:.3f} s -> {value:.3f} s")
+
+        if (case["peak_rss_mb"] is not None) and (baseline_case.get("peak_rss_mb") is not None) \
+                and (case["peak_rss_mb"] > baseline_case["peak_rss_mb"] * (1 + tolerance)):
+            regressions.append(f"{case['tool']}/{case['items']} peak RSS: "
+                               f"{baseline_case['peak_rss_mb']} MB -> {case['peak_rss_mb']} MB")
+
+    return regressions
+
+
+def _add_parser() -> argparse.ArgumentParser:
+    """
+    Add parser for command line arguments.
+
+    Returns:
+        argparse.ArgumentParser: The parser object for commandline arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of the pyMetricCli pipeline.")
+
+    parser.add_argument("--items",
+                        type=int,
+                        nargs="+",
+                        default=_DEFAULT_ITEMS,
+                        help=f"Numbers of issues and work items of the searches.\
+                            Default: {_DEFAULT_ITEMS}")
+
+    parser.add_argument("--latency",
+                        type=float,
+                        default=0.0,
+                        help="Latency of each tool call in seconds. Default: 0")
+
+    parser.add_argument("--tools",
+                        nargs="+",
+                        choices=["jira", "polarion"],
+                        default=["jira", "polarion"],
+                        help="Searches to benchmark. Default: jira polarion")
+
+    parser.add_argument("--no-cli",
+                        action="store_true",
+                        help="Skip the end-to-end cases, which run pyMetricCli itself.")
+
+    parser.add_argument("--baseline",
+                        type=str,
+                        default=_DEFAULT_BASELINE,
+                        help="Baseline file to compare with. Default: benchmark/baseline.json")
+
+    parser.add_argument("--save-baseline",
+                        action="store_true",
+                        help="Save the results as new baseline.")
+
+    parser.add_argument("--tolerance",
+                        type=float,
+                        default=_DEFAULT_TOLERANCE,
+                        help=f"Allowed relative slowdown compared to the baseline.\
+                            Default: {_DEFAULT_TOLERANCE}")
+
+    parser.add_argument("--output",
+                        type=str,
+                        help="Write the results to this JSON file.")
+
+    # Internal: run a single case in this process.
+    parser.add_argument("--case",
+                        nargs=3,
+                        metavar=("TOOL", "ITEMS", "WORK_DIR"),
+                        help=argparse.SUPPRESS)
+
+    return parser
+
+
+def main() -> int:
+    """
+    The program entry point function.
+
+    Returns:
+        int: 0 on success, 1 on regressions, 2 if a case failed.
+    """
+    args = _add_parser().parse_args()
+
+    if args.case is not None:
+        tool, items, case_dir = args.case
+
+        if tool.endswith(_CLI_SUFFIX):
+            result = run_cli_case(tool[:-len(_CLI_SUFFIX)], int(items), case_dir)
+        else:
+            result = run_case(tool, int(items), case_dir)
+
+        print(json.dumps(result))
+        return 0
+
+    exit_code = 0
+    results = []
+    work_dir = tempfile.mkdtemp(prefix="pyMetricCli_benchmark_")
+
+    try:
+        os.makedirs(os.path.join(work_dir, "bin"))
+        _create_launchers(os.path.join(work_dir, "bin"))
+
+        for items in args.items:
+            for tool in args.tools:
+                results.append(_start_case(tool, items, args.latency, work_dir))
+
+                if args.no_cli is False:
+                    results.append(_start_case(tool + _CLI_SUFFIX, items, args.latency,
+                                               work_dir))
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        exit_code = 2
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    _print_results(results)
+
+    report = {"created": datetime.datetime.now().isoformat(),
+              "python": platform.python_version(),
+              "platform": platform.platform(),
+              "latency": args.latency,
+              "results": results}
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if (0 == exit_code) and os.path.isfile(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            regressions = _compare_with_baseline(results, json.load(file), args.tolerance)
+
+        for regression in regressions:
+            print(f"Regression: {regression}")
+
+        if len(regressions) > 0:
+            exit_code = 1
+        else:
+            print(f"No regressions compared to {args.baseline}.")
+
+    # Regressions do not prevent saving, as they may be intended.
+    if (2 != exit_code) and (args.save_baseline is True):
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+        print(f"Saved baseline {args.baseline}.")
+
+    return exit_code
+
+################################################################################
+# Main
+################################################################################
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -88,6 +88,12 @@ class Adapter(AdapterInterface):
         "fields": ["id", "title", "status"],
     }
 
+    # Optional: metrics computed by pyMetricCli and written to the output dictionary,
+    # before handle_polarion() is called. Here the work items are counted per status.
+    polarion_metrics = [
+        {"output": "status_{group}", "group_by": "status"}
+    ]
+
     superset_config = {
         "profile": "newtec_superset",
         "server": "",
@@ -34,20 +34,29 @@
 ################################################################################
 
 import sys
+import signal
 import logging
 import argparse
 import os.path
-import importlib.util
-import json
+import glob
 import datetime
-import shutil
+from typing import Callable, Optional, Tuple
 
 from pyMetricCli.version import __version__, __author__, __email__, __repository__, __license__
 from pyMetricCli.ret import Ret
-from pyMetricCli.jira import Jira
-from pyMetricCli.polarion import Polarion
-from pyMetricCli.superset import Superset
 from pyMetricCli.adapter_interface import AdapterInterface
+from pyMetricCli.adapter_loader import load_adapter
+from pyMetricCli.tools import check_tools
+from pyMetricCli.result_cache import ResultCache, DEFAULT_TTL
+from pyMetricCli.instrumentation import Instrumentation, activate, measure
+from pyMetricCli.handler_profiler import HandlerProfiler, set_profiler
+from pyMetricCli.columnar_store import ColumnarStore
+from pyMetricCli.outbox import Outbox, DEFAULT_MAX_ROWS, DEFAULT_MAX_AGE
+from pyMetricCli.pipeline import run_loaded_adapters
+from pyMetricCli.backfill import run_backfill, get_dates
+from pyMetricCli.process_engine import get_engine, DEFAULT_MAX_PROCESSES
+from pyMetricCli.workspace import set_workspace_options
+from pyMetricCli.service import MetricService, serve, DEFAULT_SCHEDULE, DEFAULT_LISTEN_ADDRESS
 
 ################################################################################
 # Variables
@@ -61,19 +70,82 @@ PROG_COPYRIGHT = f"Copyright (c) 2024 NewTec GmbH - {__license__}"
 PROG_GITHUB = f"Find the project on GitHub: {__repository__}"
 PROG_EPILOG = f"{PROG_COPYRIGHT} - {PROG_GITHUB}"
 
-_TEMP_DIR_NAME = "temp"
-_TEMP_FILE_NAME = "superset_input.json"
-_TEMP_FILE_PATH = os.path.join(_TEMP_DIR_NAME, _TEMP_FILE_NAME)
+# Default number of adapters processed at the same time.
+_DEFAULT_JOBS = 4
+
+# Return status if a tool is not installed.
+_NOT_INSTALLED_RET = {
+    "pyJiraCli": Ret.ERROR_NOT_INSTALLED_JIRA,
+    "pyPolarionCli": Ret.ERROR_NOT_INSTALLED_POLARION,
+    "pySupersetCli": Ret.ERROR_NOT_INSTALLED_SUPERSET
+}
 
 ################################################################################
 # Classes
 ################################################################################
 
+
+class _CheckToolsAction(argparse.Action):
+    """
+    Command line action which runs all tools to check if they are installed,
+    updates the tool detection cache and exits.
+    """
+
+    def __init__(self, option_strings, dest, **kwargs) -> None:
+        super().__init__(option_strings, dest, nargs=0, **kwargs)
+
+    def __call__(self, parser, namespace, values, option_string=None) -> None:
+        ret_status = Ret.OK
+
+        for executable, is_installed in check_tools().items():
+            if is_installed is True:
+                print(f"{executable} is installed.")
+            else:
+                print(f"{executable} is not installed!")
+
+                if Ret.OK == ret_status:
+                    ret_status = _NOT_INSTALLED_RET[executable]
+
+        parser.exit(ret_status)
+
 ################################################################################
 # Functions
 ################################################################################
 
 
+def _parse_date(value: str) -> datetime.date:
+    """
+    Parse a date given on the command line.
+
+    Args:
+        value (str): The date in the format YYYY-MM-DD.
+
+    Returns:
+        datetime.date: The date.
+    """
+    try:
+        date = datetime.date.fromisoformat(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD") from e
+
+    return date
+
+
+def _handle_signal(signal_number: int, _frame) -> None:
+    """
+    Handle SIGINT and SIGTERM: kill the running tool processes, so the
+    searches and uploads waiting for them end at once, and interrupt the
+    main thread.
+
+    Args:
+        signal_number (int): The received signal.
+        _frame: The current stack frame, unused.
+    """
+    LOG.warning("Received signal %d, cancelling the running tools.", signal_number)
+    get_engine().cancel()
+    raise KeyboardInterrupt()
+
+
 def add_parser() -> argparse.ArgumentParser:
     """ Add parser for command line arguments and
         set the execute function of each
@@ -94,14 +166,148 @@ def add_parser() -> argparse.ArgumentParser:
     required_arguments.add_argument('-a',
                                     '--adapter_file',
                                     type=str,
+                                    nargs="+",
+                                    action="extend",
                                     metavar='<adapter_file>',
                                     required=True,
-                                    help="Adapter file to be used.")
+                                    help="Adapter file to be used.\
+                                        Multiple files, directories containing adapter files\
+                                        and glob patterns can be given.")
 
     parser.add_argument("--version",
                         action="version",
                         version="%(prog)s " + __version__)
 
+    parser.add_argument("--check-tools",
+                        action=_CheckToolsAction,
+                        help="Run all tools to check if they are installed and exit.")
+
+    parser.add_argument("--cache",
+                        action="store_true",
+                        help="Read and write cached search results, which may be up to\
+                            --cache-ttl seconds old. Disabled by default.")
+
+    parser.add_argument("--no-cache",
+                        action="store_true",
+                        help="Neither read nor write cached search results (default).\
+                            Overrides --cache and --refresh.")
+
+    parser.add_argument("--refresh",
+                        action="store_true",
+                        help="Ignore cached search results, but cache the new ones.\
+                            Enables the cache.")
+
+    parser.add_argument("--cache-ttl",
+                        type=int,
+                        metavar='<seconds>',
+                        default=DEFAULT_TTL,
+                        help=f"Time to live of cached search results in seconds.\
+                            Can be overwritten by 'cache_ttl' in the adapter configs.\
+                            Default: {DEFAULT_TTL}")
+
+    parser.add_argument("--outbox",
+                        action="store_true",
+                        help="Collect the output in a local outbox and upload it to Superset\
+                            once a threshold is reached, see --outbox-max-rows and\
+                            --outbox-max-age.")
+
+    parser.add_argument("--outbox-max-rows",
+                        type=int,
+                        metavar='<rows>',
+                        default=DEFAULT_MAX_ROWS,
+                        help=f"Upload a table of the outbox once it has this number of rows.\
+                            Default: {DEFAULT_MAX_ROWS}")
+
+    parser.add_argument("--outbox-max-age",
+                        type=int,
+                        metavar='<seconds>',
+                        default=DEFAULT_MAX_AGE,
+                        help=f"Upload a table of the outbox once its oldest row has this age.\
+                            Default: {DEFAULT_MAX_AGE}")
+
+    parser.add_argument("--flush",
+                        action="store_true",
+                        help="Upload all tables of the outbox used by the given adapters.\
+                            Implies --outbox.")
+
+    parser.add_argument("--serve",
+                        action="store_true",
+                        help="Keep running and run each adapter on its schedule.\
+                            Runs can be triggered and their status queried via HTTP.")
+
+    parser.add_argument("--schedule",
+                        type=str,
+                        metavar='<cron>',
+                        default=DEFAULT_SCHEDULE,
+                        help=f"Cron schedule of adapters without 'schedule' attribute.\
+                            Default: '{DEFAULT_SCHEDULE}'")
+
+    parser.add_argument("--listen",
+                        type=str,
+                        metavar='<host:port>',
+                        default=DEFAULT_LISTEN_ADDRESS,
+                        help=f"Address of the HTTP endpoint of --serve.\
+                            Default: {DEFAULT_LISTEN_ADDRESS}")
+
+    parser.add_argument("--report",
+                        type=str,
+                        metavar='<file>',
+                        help="Write the timing and resource usage of each stage of the run\
+                            to this JSON file.")
+
+    parser.add_argument("--prometheus",
+                        type=str,
+                        metavar='<file>',
+                        help="Write the timing and resource usage of each stage of the run\
+                            to this file in the Prometheus text format.")
+
+    parser.add_argument("--data-dir",
+                        type=str,
+                        metavar='<directory>',
+                        help="Store the search results of each run as Arrow IPC files\
+                            in this directory. Requires pyarrow.")
+
+    parser.add_argument("--backfill",
+                        type=_parse_date,
+                        nargs=2,
+                        metavar=('<start>', '<end>'),
+                        help="Recompute the output of each date from <start> to <end>\
+                            (YYYY-MM-DD) from the snapshots of --data-dir and upload it\
+                            in batches, instead of searching. Requires --data-dir.")
+
+    parser.add_argument("--work-dir",
+                        type=str,
+                        metavar='<directory>',
+                        help="Base directory of the temporary workspace of each run.\
+                            Default: /dev/shm if writable, else the temporary directory.")
+
+    parser.add_argument("--keep-work-dir",
+                        action="store_true",
+                        help="Keep the workspace of each run for debugging\
+                            instead of removing it at the end of the run.")
+
+    parser.add_argument("--max-processes",
+                        type=int,
+                        metavar='<processes>',
+                        default=DEFAULT_MAX_PROCESSES,
+                        help=f"Maximum number of tool processes running at the same time.\
+                            Default: {DEFAULT_MAX_PROCESSES}")
+
+    parser.add_argument("--profile-handlers",
+                        type=str,
+                        metavar='<directory>',
+                        help="Profile the handlers of the adapters with cProfile and tracemalloc\
+                            and write a .pstats file and an allocation summary per handler\
+                            to this directory. Profiled handlers run one at a time.")
+
+    parser.add_argument("-j",
+                        "--jobs",
+                        type=int,
+                        metavar='<jobs>',
+                        default=_DEFAULT_JOBS,
+                        help=f"Maximum number of searches and adapters processed at the same time.\
+                            Default: {_DEFAULT_JOBS}")
+
     parser.add_argument("-v",
                         "--verbose",
                         action="store_true",
@@ -111,151 +317,269 @@ def add_parser() -> argparse.ArgumentParser:
     return parser
 
 
-def _import_adapter(adapter_path: str) -> AdapterInterface:
+def _expand_adapter_files(adapter_files: list) -> list:
     """
-    Import the adapter module from the given path.
+    Expand the adapter files given on the command line.
+    Directories are replaced by the Python files they contain and glob
+    patterns by the matching files. Each file is returned only once.
 
     Args:
-        adapter_path (str): The path to the adapter module.
+        adapter_files (list): The adapter files, directories and glob patterns.
 
     Returns:
-        AdapterInterface: Instance of an adapter class inherited from AdapterInterface.
+        list: The adapter files.
     """
-    adapter_name = "adapter"
-    adapter_instance = None
+    expanded_files = []
+    known_paths = set()
 
-    if not os.path.isfile(adapter_path):
-        LOG.error("The adapter file '%s' does not exist.", adapter_path)
-    else:
-        module_spec = importlib.util.spec_from_file_location(adapter_name,
-                                                             adapter_path)
-        adapter = importlib.util.module_from_spec(module_spec)
-        sys.modules[adapter_name] = adapter
-        module_spec.loader.exec_module(adapter)
-        adapter_instance = adapter.Adapter()
-
-        # Check all required attributes and methods of the adapter class.
-        if not isinstance(adapter_instance, AdapterInterface):
-            LOG.error("The adapter class must inherit from AdapterInterface.")
-            adapter_instance = None
+    for adapter_file in adapter_files:
+        if os.path.isdir(adapter_file):
+            matches = sorted(glob.glob(os.path.join(adapter_file, "*.py")))
+        elif any(character in adapter_file for character in "*?["):
+            matches = sorted(glob.glob(adapter_file))
+
+            if len(matches) == 0:
+                LOG.warning("No adapter file matches '%s'.", adapter_file)
         else:
-            LOG.info("Adapter class successfully imported.")
+            matches = [adapter_file]
 
-            # Check if the values of the output dictionary in the adapter class are unique.
-            output_list = list(adapter_instance.output.keys())
-            output_list_lowercase = [status.lower() for status in output_list]
+        for match in matches:
+            real_path = os.path.realpath(match)
 
-            number_unique_values = len(set(output_list_lowercase))
-            if number_unique_values != len(output_list):
-                LOG.error(
-                    "The keys in the output dictionary in the adapter class must be unique.")
-                adapter_instance = None
+            if real_path not in known_paths:
+                known_paths.add(real_path)
+                expanded_files.append(match)
 
-    return adapter_instance
+    return expanded_files
 
 
-def _process_jira(adapter: AdapterInterface) -> Ret:
+def _load_adapter(adapter_file: str) -> Tuple[Ret, Optional[AdapterInterface]]:
     """
-    Process the Jira query and search results.
+    Import a single adapter file.
+
+    Args:
+        adapter_file (str): The adapter file.
 
     Returns:
-        Ret: The return status.
+        Tuple[Ret, Optional[AdapterInterface]]: The return status and the adapter.
     """
     ret_status = Ret.OK
+    adapter = None
+
+    # Check if the adapter is a Python file.
+    if adapter_file.endswith(".py") is False:
+        ret_status = Ret.ERROR_INVALID_ARGUMENT
+        LOG.error("The adapter must be a Python file.")
+    else:
+        with measure("import_adapter", adapter_file):
+            adapter = load_adapter(adapter_file)
 
-    # Ignore Jira if filter is empty.
-    if adapter.jira_config.get("filter", "") != "":
-        # Overwrite the output directory with the temp directory.
-        adapter.jira_config["file"] = os.path.join(
-            _TEMP_DIR_NAME, "jira_search_results.json")
+        if adapter is None:
+            LOG.error("The adapter module could not be imported.")
+            ret_status = Ret.ERROR
 
-        LOG.info("Searching in Jira for '%s'...", adapter.jira_config["filter"])
+    return ret_status, adapter
+
+
+def _run_adapters(adapter_files: list,
+                  result_cache: Optional[ResultCache],
+                  jobs: int,
+                  outbox: Optional[Outbox],
+                  data_store: Optional[ColumnarStore]) -> list:
+    """
+    Load and run all adapters, see run_loaded_adapters().
 
-        jira_instance = Jira(adapter.jira_config)
-        if jira_instance.is_installed is False:
-            LOG.error("pyJiraCli is not installed!")
-            ret_status = Ret.ERROR_NOT_INSTALLED_JIRA
+    Args:
+        adapter_files (list): The adapter files.
+        result_cache (Optional[ResultCache]): The search result cache, None to disable caching.
+        jobs (int): Maximum number of searches and adapters processed at the same time.
+        outbox (Optional[Outbox]): The outbox, None to upload the output directly.
+        data_store (Optional[ColumnarStore]): Stores the search results, None to disable.
+
+    Returns:
+        list: The return status of each adapter, in the order of the adapter files.
+    """
+    loaded_adapters = [_load_adapter(adapter_file) for adapter_file in adapter_files]
+
+    return run_loaded_adapters(loaded_adapters, result_cache, jobs, outbox, data_store)
+
+
+def _get_aggregate_ret(adapter_files: list, adapter_results: list) -> Ret:
+    """
+    Report the return status of each adapter and get the overall status.
+
+    Args:
+        adapter_files (list): The adapter files.
+        adapter_results (list): The return status of each adapter.
+
+    Returns:
+        Ret: OK if all adapters succeeded, otherwise the status of the first failed adapter.
+    """
+    ret_status = Ret.OK
+
+    for adapter_file, adapter_ret in zip(adapter_files, adapter_results):
+        if Ret.OK == adapter_ret:
+            LOG.info("%s: %s", adapter_file, adapter_ret.name)
         else:
-            jira_results = jira_instance.search()
-            if adapter.handle_jira(jira_results) is False:
-                ret_status = Ret.ERROR_ADAPTER_HANDLER_JIRA
+            LOG.error("%s: %s", adapter_file, adapter_ret.name)
+
+            if Ret.OK == ret_status:
+                ret_status = adapter_ret
 
     return ret_status
 
 
-def _process_polarion(adapter: AdapterInterface) -> Ret:
+def _run_with_report(args: argparse.Namespace, run_function: Callable, *run_args) -> list:
+    """
+    Run the adapters and write the report of the run, if requested by
+    --report or --prometheus.
+
+    Args:
+        args (argparse.Namespace): The command line arguments.
+        run_function (Callable): _run_adapters(), run_loaded_adapters() or run_backfill().
+        run_args: The arguments of the run function.
+
+    Returns:
+        list: The return status of each adapter.
+    """
+    instrumentation = None
+
+    if (args.report is not None) or (args.prometheus is not None):
+        instrumentation = Instrumentation()
+        activate(instrumentation)
+
+    try:
+        adapter_results = run_function(*run_args)
+    finally:
+        if instrumentation is not None:
+            activate(None)
+            instrumentation.finish()
+
+            if args.report is not None:
+                instrumentation.write_report(args.report)
+
+            if args.prometheus is not None:
+                instrumentation.write_prometheus(args.prometheus)
+
+    return adapter_results
+
+
+def _serve_adapters(adapter_files: list, args: argparse.Namespace, run_adapters: Callable) -> Ret:
     """
-    Process the Polarion query and search results.
+    Load the adapters once and run them as long-running service.
+
+    Args:
+        adapter_files (list): The adapter files.
+        args (argparse.Namespace): The command line arguments.
+        run_adapters (Callable): Runs loaded adapters, see run_loaded_adapters().
 
     Returns:
         Ret: The return status.
     """
     ret_status = Ret.OK
+    adapters = []
 
-    # Ignore Polarion if query is empty.
-    if adapter.polarion_config.get("query", "") != "":
-        # Overwrite the output directory with the temp directory.
-        adapter.polarion_config["output"] = _TEMP_DIR_NAME
+    for adapter_file in adapter_files:
+        load_ret, adapter = _load_adapter(adapter_file)
 
-        LOG.info("Searching in Polarion: %s", adapter.polarion_config["query"])
+        if Ret.OK != load_ret:
+            LOG.error("%s: %s", adapter_file, load_ret.name)
+            ret_status = load_ret
+        else:
+            adapters.append((adapter_file, adapter))
 
-        polarion_instance = Polarion(adapter.polarion_config)
-        if polarion_instance.is_installed is False:
-            LOG.error("pyPolarionCli is not installed!")
-            ret_status = Ret.ERROR_NOT_INSTALLED_POLARION
+    if Ret.OK == ret_status:
+        try:
+            service = MetricService(adapters, run_adapters, args.schedule)
+        except ValueError as e:
+            LOG.error("Invalid schedule: %s", e)
+            ret_status = Ret.ERROR_INVALID_ARGUMENT
         else:
-            polarion_results = polarion_instance.search()
-            if adapter.handle_polarion(polarion_results) is False:
-                ret_status = Ret.ERROR_ADAPTER_HANDLER_POLARION
+            ret_status = serve(service, args.listen)
 
     return ret_status
 
 
-def _save_temp_file(output: dict) -> Ret:
+def _backfill_adapters(adapter_files: list,
+                       args: argparse.Namespace,
+                       data_store: Optional[ColumnarStore]) -> Ret:
     """
-    Save the output dictionary to a temporary file.
+    Recompute and upload the output of past dates, see run_backfill().
 
     Args:
-        output (dict): The output dictionary.
+        adapter_files (list): The adapter files.
+        args (argparse.Namespace): The command line arguments.
+        data_store (Optional[ColumnarStore]): The store of the snapshots.
 
     Returns:
         Ret: The return status.
     """
-    ret_status = Ret.OK
-
-    try:
-        # Write to the file.
-        with open(_TEMP_FILE_PATH, "w", encoding="UTF-8") as file:
-            json.dump(output, file, indent=2)
-    except Exception as e:  # pylint: disable=broad-except
-        LOG.error("An error occurred writing the temporary file: %s", e)
-        ret_status = Ret.ERROR
+    start, end = args.backfill
+
+    if data_store is None:
+        ret_status = Ret.ERROR_INVALID_ARGUMENT
+        LOG.error("--backfill requires --data-dir.")
+    elif args.serve is True:
+        ret_status = Ret.ERROR_INVALID_ARGUMENT
+        LOG.error("--backfill can not be combined with --serve.")
+    elif end < start:
+        ret_status = Ret.ERROR_INVALID_ARGUMENT
+        LOG.error("The end of the backfill is before its start.")
+    else:
+        loaded_adapters = [_load_adapter(adapter_file) for adapter_file in adapter_files]
+        adapter_results = _run_with_report(args, run_backfill, loaded_adapters, adapter_files,
+                                           data_store, get_dates(start, end), args.jobs)
+        ret_status = _get_aggregate_ret(adapter_files, adapter_results)
 
     return ret_status
 
 
-def _process_superset(adapter: AdapterInterface) -> Ret:
+def _run_main(adapter_files: list, args: argparse.Namespace) -> Ret:
     """
-    Process the Superset file upload.
+    Run the adapters once or as service, as given by the command line arguments.
+
+    Args:
+        adapter_files (list): The adapter files.
+        args (argparse.Namespace): The command line arguments.
 
     Returns:
         Ret: The return status.
     """
-    ret_status = Ret.OK
-
-    # Send the temporary file to the metric server using Superset.
-    superset_instance = Superset(adapter.superset_config)
-    if superset_instance.is_installed is False:
-        LOG.error("pySupersetCli is not installed!")
-        ret_status = Ret.ERROR_NOT_INSTALLED_SUPERSET
+    # The result cache is shared by all adapters. It is opt-in, as cached
+    # results may be outdated.
+    result_cache = None
+    if (args.no_cache is False) and ((args.cache is True) or (args.refresh is True)):
+        result_cache = ResultCache(ttl=args.cache_ttl, refresh=args.refresh)
+
+    # The outbox collects the output of all adapters.
+    outbox = None
+    if (args.outbox is True) or (args.flush is True):
+        outbox = Outbox(max_rows=args.outbox_max_rows,
+                        max_age=args.outbox_max_age,
+                        flush_all=args.flush)
+
+    # The data store keeps the search results of all runs.
+    data_store = None
+    if args.data_dir is not None:
+        data_store = ColumnarStore(args.data_dir)
+
+    if args.profile_handlers is not None:
+        set_profiler(HandlerProfiler(args.profile_handlers))
+
+    if (data_store is not None) and (data_store.is_available() is False):
+        ret_status = Ret.ERROR_INVALID_ARGUMENT
+        LOG.error("--data-dir requires pyarrow, install pyMetricCli[columnar].")
+    elif args.backfill is not None:
+        ret_status = _backfill_adapters(adapter_files, args, data_store)
+    elif args.serve is True:
+        ret_status = _serve_adapters(adapter_files, args,
+                                     lambda loaded_adapters: _run_with_report(
+                                         args, run_loaded_adapters, loaded_adapters,
+                                         result_cache, args.jobs, outbox, data_store))
     else:
-        ret = superset_instance.upload(_TEMP_FILE_PATH)
-
-        if 0 != ret:
-            ret_status = Ret.ERROR_SUPERSET_UPLOAD
-            LOG.error("Error while uploading to Superset!")
-        else:
-            LOG.info("Successfully uploaded to Superset!")
+        adapter_results = _run_with_report(args, _run_adapters, adapter_files,
+                                           result_cache, args.jobs, outbox, data_store)
+        ret_status = _get_aggregate_ret(adapter_files, adapter_results)
 
     return ret_status
 
@@ -279,8 +603,6 @@ def main() -> Ret:
         ret_status = Ret.ERROR_ARGPARSE
         parser.print_help()
     else:
-        adapter: AdapterInterface = None
-
         # If the verbose flag is set, change the default logging level.
         if args.verbose:
             logging.basicConfig(level=logging.INFO)
@@ -288,48 +610,22 @@ def main() -> Ret:
             for arg in vars(args):
                 LOG.info("* %s = %s", arg, vars(args)[arg])
 
-        # Check if temp directory exists, if not create it.
-        os.makedirs(_TEMP_DIR_NAME, exist_ok=True)
+        adapter_files = _expand_adapter_files(args.adapter_file)
+        get_engine().max_processes = max(1, args.max_processes)
+        set_workspace_options(args.work_dir, args.keep_work_dir)
 
-        # Check if the adapter is a Python file.
-        if args.adapter_file.endswith(".py") is False:
+        signal.signal(signal.SIGINT, _handle_signal)
+        signal.signal(signal.SIGTERM, _handle_signal)
+
+        if len(adapter_files) == 0:
             ret_status = Ret.ERROR_INVALID_ARGUMENT
-            LOG.error("The adapter must be a Python file.")
+            LOG.error("No adapter file found.")
         else:
-            adapter = _import_adapter(args.adapter_file)
-
-            if adapter is None:
-                LOG.error("The adapter module could not be imported.")
+            try:
+                ret_status = _run_main(adapter_files, args)
+            except KeyboardInterrupt:
                 ret_status = Ret.ERROR
-            else:
-                if Ret.OK != _process_jira(adapter=adapter):
-                    LOG.error("Error while processing Jira.")
-                    ret_status = Ret.ERROR_ADAPTER_HANDLER_JIRA
-
-                elif Ret.OK != _process_polarion(adapter=adapter):
-                    LOG.error("Error while processing Polarion.")
-                    ret_status = Ret.ERROR_ADAPTER_HANDLER_POLARION
-                else:
-                    # Save the output dictionary to a temporary file.
-                    LOG.info("Saving output to a temporary file...")
-
-                    # Get the output from the adapter.
-                    processed_output = adapter.output
-
-                    # Ensure the output always contains a date.
-                    processed_output["date"] = datetime.datetime.now(
-                    ).isoformat()
-
-                    # Save the output to a temporary file.
-                    if Ret.OK != _save_temp_file(output=processed_output):
-                        ret_status = Ret.ERROR
-                        LOG.error("Error while saving the temporary file.")
-                    elif Ret.OK != _process_superset(adapter=adapter):
-                        ret_status = Ret.ERROR_SUPERSET_UPLOAD
-                        LOG.error("Error while processing Superset.")
-
-        # Clean up the temporary directory if exists.
-        shutil.rmtree(_TEMP_DIR_NAME, ignore_errors=True)
+                LOG.error("Interrupted, the run was cancelled.")
 
     return ret_status
 
@@ -112,6 +112,34 @@ class AdapterInterface(ABC):
             bool: True if the search results were handled successfully, False otherwise.
         """
 
+    def handle_jira_item(self, _issue: dict) -> bool:
+        """
+        Handles a single issue of the JIRA search results.
+        Called for each issue instead of handle_jira() if "stream" is set in the
+        'jira_config'. Implement it to handle large searches with constant memory.
+
+        Args:
+            issue: A single issue of the search results.
+
+        Returns:
+            bool: True if the issue was handled successfully, False otherwise.
+        """
+        return False
+
+    def handle_polarion_item(self, _work_item: dict) -> bool:
+        """
+        Handles a single work item of the Polarion search results.
+        Called for each work item instead of handle_polarion() if "stream" is set in the
+        'polarion_config'. Implement it to handle large searches with constant memory.
+
+        Args:
+            work_item: A single work item of the search results.
+
+        Returns:
+            bool: True if the work item was handled successfully, False otherwise.
+        """
+        return False
+
 ################################################################################
 # Functions
 ################################################################################
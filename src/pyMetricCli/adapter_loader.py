@@ -0,0 +1,260 @@
+"""
+Loading of adapter files, with cached bytecode.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import sys
+import marshal
+import hashlib
+import logging
+import threading
+import importlib.util
+import importlib.machinery
+from typing import Optional
+
+from pyMetricCli.paths import get_cache_dir
+from pyMetricCli.adapter_interface import AdapterInterface
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+_CACHE_SUB_DIR_NAME = "adapters"
+
+# Header of a bytecode file: magic number, flags, source mtime and source size.
+_HEADER_SIZE = 16
+
+# Modules of this process, by adapter path.
+_modules: dict = {}
+_lock = threading.Lock()
+
+################################################################################
+# Classes
+################################################################################
+
+
+class _CachedBytecodeLoader(importlib.machinery.SourceFileLoader):
+    """
+    Source file loader which keeps the bytecode in the pyMetricCli cache
+    directory instead of a __pycache__ directory next to the adapter file.
+    Adapter files are usually not part of an installed package, so their
+    directory may be read-only or shared by several interpreters.
+    """
+
+    def get_code(self, fullname: str):
+        """
+        Get the code object of the adapter module, from the cached bytecode
+        if it matches the mtime and size of the source file.
+
+        Args:
+            fullname (str): The module name.
+
+        Returns:
+            types.CodeType: The code object.
+        """
+        source_path = self.get_filename(fullname)
+        bytecode_path = os.path.join(get_cache_dir(), _CACHE_SUB_DIR_NAME, f"{fullname}.pyc")
+        source_stats = self.path_stats(source_path)
+        header = importlib.util.MAGIC_NUMBER + \
+            (0).to_bytes(4, "little") + \
+            (int(source_stats["mtime"]) & 0xFFFFFFFF).to_bytes(4, "little") + \
+            (source_stats["size"] & 0xFFFFFFFF).to_bytes(4, "little")
+        code = None
+
+        try:
+            with open(bytecode_path, "rb") as file:
+                data = file.read()
+
+            if data[:_HEADER_SIZE] == header:
+                code = marshal.loads(data[_HEADER_SIZE:])
+        except (OSError, EOFError, ValueError, TypeError):
+            code = None
+
+        if code is None:
+            code = self.source_to_code(self.get_data(source_path), source_path)
+
+            if sys.dont_write_bytecode is False:
+                _write_file(bytecode_path, header + marshal.dumps(code))
+
+        return code
+
+################################################################################
+# Functions
+################################################################################
+
+
+def get_module_name(adapter_path: str) -> str:
+    """
+    Get the module name of an adapter file. Each adapter file gets its
+    own module, so several adapters can be loaded in one process.
+
+    Args:
+        adapter_path (str): The path to the adapter file.
+
+    Returns:
+        str: The module name.
+    """
+    path_hash = hashlib.sha1(os.path.abspath(adapter_path).encode("utf-8")).hexdigest()
+
+    return f"adapter_{path_hash[:12]}"
+
+
+def _write_file(file_path: str, data: bytes) -> None:
+    """
+    Write a cache file at once, so other processes never read a partial file.
+    Errors are only logged, as the cache is not essential.
+
+    Args:
+        file_path (str): Path to the file.
+        data (bytes): The content of the file.
+    """
+    temp_file_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+        with open(temp_file_path, "wb") as file:
+            file.write(data)
+
+        os.replace(temp_file_path, file_path)
+    except OSError as e:
+        LOG.warning("The adapter cache file %s could not be written: %s", file_path, e)
+
+
+def _validate_adapter(adapter_instance: AdapterInterface) -> bool:
+    """
+    Check the adapter instance: the adapter class must inherit from
+    AdapterInterface and the keys of its output must be unique, ignoring case.
+
+    Args:
+        adapter_instance (AdapterInterface): The adapter instance.
+
+    Returns:
+        bool: True if the adapter is valid, False otherwise.
+    """
+    is_valid = True
+
+    if not isinstance(adapter_instance, AdapterInterface):
+        LOG.error("The adapter class must inherit from AdapterInterface.")
+        is_valid = False
+    else:
+        output_list = list(adapter_instance.output.keys())
+        output_list_lowercase = [status.lower() for status in output_list]
+
+        if len(set(output_list_lowercase)) != len(output_list):
+            LOG.error("The keys in the output dictionary in the adapter class must be unique.")
+            is_valid = False
+
+    return is_valid
+
+
+def _import_module(adapter_path: str, module_name: str, file_stat: os.stat_result):
+    """
+    Import the module of an adapter file. A module imported before by this
+    process is reused, if the file has not changed since.
+
+    Args:
+        adapter_path (str): The absolute path to the adapter file.
+        module_name (str): The module name, see get_module_name().
+        file_stat (os.stat_result): The status of the adapter file.
+
+    Returns:
+        types.ModuleType: The adapter module.
+    """
+    file_key = (file_stat.st_mtime_ns, file_stat.st_size)
+
+    with _lock:
+        module, module_file_key = _modules.get(adapter_path, (None, None))
+
+    if (module is None) or (module_file_key != file_key):
+        loader = _CachedBytecodeLoader(module_name, adapter_path)
+        module_spec = importlib.util.spec_from_file_location(module_name, adapter_path,
+                                                             loader=loader)
+        module = importlib.util.module_from_spec(module_spec)
+        sys.modules[module_name] = module
+
+        try:
+            module_spec.loader.exec_module(module)
+        except BaseException:
+            sys.modules.pop(module_name, None)
+            raise
+
+        with _lock:
+            _modules[adapter_path] = (module, file_key)
+
+    return module
+
+
+def load_adapter(adapter_path: str) -> Optional[AdapterInterface]:
+    """
+    Load an adapter file and create an instance of its adapter class.
+    Errors of the adapter file, e.g. a syntax error or an exception raised
+    by the module or the constructor of the adapter class, are logged.
+
+    Args:
+        adapter_path (str): The path to the adapter file.
+
+    Returns:
+        Optional[AdapterInterface]: The adapter instance or None if the adapter is invalid.
+    """
+    adapter_instance = None
+
+    if not os.path.isfile(adapter_path):
+        LOG.error("The adapter file '%s' does not exist.", adapter_path)
+    else:
+        absolute_path = os.path.abspath(adapter_path)
+
+        try:
+            file_stat = os.stat(absolute_path)
+            module = _import_module(absolute_path, get_module_name(absolute_path), file_stat)
+            adapter_instance = module.Adapter()
+        except Exception as e:  # pylint: disable=broad-except
+            LOG.error("The adapter '%s' could not be loaded: %s", adapter_path, e)
+            adapter_instance = None
+
+        if adapter_instance is not None:
+            if _validate_adapter(adapter_instance) is True:
+                LOG.info("Adapter class successfully imported.")
+            else:
+                adapter_instance = None
+
+    return adapter_instance
+
+################################################################################
+# Main
+################################################################################
@@ -0,0 +1,717 @@
+"""
+Declarative aggregation of search results into the output of an adapter.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import math
+import logging
+import datetime
+import operator
+from typing import Iterable, Optional
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# Supported operations of a metric.
+OPERATIONS = ("count", "sum", "avg", "min", "max", "percentile")
+
+# Supported units of the date buckets.
+BUCKET_UNITS = ("day", "week", "month", "year")
+
+# Supported comparisons of the filter predicates.
+_COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda value, values: value in values,
+    "not in": lambda value, values: value not in values
+}
+
+################################################################################
+# Classes
+################################################################################
+
+
+class _Metric:  # pylint: disable=too-few-public-methods
+    """
+    A single metric declared by an adapter, see MetricAggregator.
+    """
+
+    def __init__(self, declaration: dict) -> None:
+        """
+        Initializes the metric from its declaration.
+
+        Args:
+            declaration (dict): The declaration of the metric.
+
+        Raises:
+            ValueError: If the declaration is invalid.
+        """
+        if not isinstance(declaration, dict):
+            raise ValueError(f"A metric must be a dictionary, not {declaration!r}.")
+
+        self.output = declaration.get("output")
+        self.operation = declaration.get("op", "count")
+        self.field = declaration.get("field")
+        self.group_by = declaration.get("group_by")
+        self.where = [tuple(predicate) for predicate in declaration.get("where", [])]
+        self.bucket = tuple(declaration["bucket"]) if "bucket" in declaration else None
+        self.q = declaration.get("q", 50)
+
+        if not isinstance(self.output, str):
+            raise ValueError(f"The metric {declaration!r} has no 'output' key.")
+
+        if self.operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{self.operation}' of metric '{self.output}'.")
+
+        if (self.operation != "count") and (self.field is None):
+            raise ValueError(f"The metric '{self.output}' requires a 'field'.")
+
+        if (self.operation == "percentile") and \
+                ((isinstance(self.q, (int, float)) is False) or not 0 <= self.q <= 100):
+            raise ValueError(f"The percentile 'q' of metric '{self.output}' must be 0 to 100.")
+
+        for predicate in self.where:
+            if (len(predicate) != 3) or (predicate[1] not in _COMPARISONS):
+                raise ValueError(f"Invalid predicate {predicate!r} of metric '{self.output}'.")
+
+        if (self.bucket is not None) and \
+                ((len(self.bucket) != 2) or (self.bucket[1] not in BUCKET_UNITS)):
+            raise ValueError(f"Invalid bucket {self.bucket!r} of metric '{self.output}'.")
+
+    def get_fields(self) -> set:
+        """
+        Get the fields of the items used by the metric.
+
+        Returns:
+            set: The paths of the fields.
+        """
+        fields = {predicate[0] for predicate in self.where}
+        fields.update(field for field in (self.field, self.group_by) if field is not None)
+
+        if self.bucket is not None:
+            fields.add(self.bucket[0])
+
+        return fields
+
+    def get_output_key(self, group: Optional[str], bucket: Optional[str]) -> str:
+        """
+        Get the output key of a group.
+
+        Args:
+            group (Optional[str]): The value of the 'group_by' field.
+            bucket (Optional[str]): The date bucket.
+
+        Returns:
+            str: The output key.
+        """
+        return self.output.format(group=group, bucket=bucket)
+
+
+class MetricAggregator:
+    """
+    Aggregates the issues or work items of a search into the output of an
+    adapter, as declared by the 'jira_metrics' or 'polarion_metrics' of the
+    adapter. Each metric is a dictionary with the keys:
+
+    - "output": The output key. "{group}" and "{bucket}" are replaced by the
+      value of the 'group_by' field and the date bucket, e.g. "status_{group}".
+    - "op": "count" (default), "sum", "avg", "min", "max" or "percentile".
+    - "field": The field to aggregate. Required unless counting.
+    - "q": The percentile, 0 to 100. Default: 50
+    - "group_by": Optional field to group by.
+    - "where": Optional list of predicates (field, comparison, value), all must
+      match. The comparisons are ==, !=, <, <=, >, >=, in and not in.
+      Numbers are compared as numbers, other values as text. Missing values
+      never match.
+    - "bucket": Optional tuple of a date field and "day", "week", "month" or "year".
+
+    Fields are given as paths of dictionary keys separated by dots, e.g.
+    "fields.status.name". The items are stored as columns of the used fields
+    only. All metrics are computed with NumPy if it is installed, otherwise
+    in pure Python.
+    """
+
+    def __init__(self, metrics: Optional[list]) -> None:
+        """
+        Initializes the aggregator.
+
+        Args:
+            metrics (Optional[list]): The declarations of the metrics.
+
+        Raises:
+            ValueError: If a declaration is invalid.
+        """
+        self._metrics = [_Metric(declaration) for declaration in (metrics or [])]
+        self._columns = {field: [] for metric in self._metrics for field in metric.get_fields()}
+        self._paths = {field: field.split(".") for field in self._columns}
+        self._item_count = 0
+
+    def is_empty(self) -> bool:
+        """
+        Check if no metrics are declared.
+
+        Returns:
+            bool: True if no metrics are declared, False otherwise.
+        """
+        return len(self._metrics) == 0
+
+    def add_item(self, item: dict) -> None:
+        """
+        Add an issue or work item.
+
+        Args:
+            item (dict): The issue or work item.
+        """
+        for field, column in self._columns.items():
+            column.append(_get_value(item, self._paths[field]))
+
+        self._item_count += 1
+
+    def add_items(self, items: Iterable[dict]) -> None:
+        """
+        Add all issues or work items.
+
+        Args:
+            items (Iterable[dict]): The issues or work items.
+        """
+        for item in items:
+            self.add_item(item)
+
+    def apply(self, output: dict) -> None:
+        """
+        Compute all metrics and write them to the output. Keys which are not
+        in the output are ignored, as the columns of the Superset table are fixed.
+        The keys are matched regardless of their case.
+
+        Args:
+            output (dict): The output of the adapter.
+        """
+        output_keys = {key.lower(): key for key in output}
+
+        if numpy is not None:
+            columns = _NumpyColumns(self._columns, self._item_count)
+        else:
+            columns = _PythonColumns(self._columns, self._item_count)
+
+        for metric in self._metrics:
+            for key, value in columns.compute(metric).items():
+                output_key = key if key in output else output_keys.get(key.lower())
+
+                if output_key is None:
+                    LOG.warning("The metric '%s' is not in the output and is ignored.", key)
+                else:
+                    output[output_key] = value
+
+
+class _PythonColumns:  # pylint: disable=too-few-public-methods
+    """
+    Computes metrics over columns in pure Python.
+    """
+
+    def __init__(self, columns: dict, item_count: int) -> None:
+        """
+        Initializes the columns.
+
+        Args:
+            columns (dict): The values of each field.
+            item_count (int): The number of items.
+        """
+        self._columns = columns
+        self._item_count = item_count
+        self._buckets: dict = {}
+
+    def _is_matching(self, metric: _Metric, index: int) -> bool:
+        """
+        Check if an item matches all predicates of a metric.
+
+        Args:
+            metric (_Metric): The metric.
+            index (int): The index of the item.
+
+        Returns:
+            bool: True if the item matches, False otherwise.
+        """
+        is_matching = True
+
+        for field, comparison, value in metric.where:
+            is_matching = _compare(self._columns[field][index], comparison, value)
+
+            if is_matching is False:
+                break
+
+        return is_matching
+
+    def compute(self, metric: _Metric) -> dict:
+        """
+        Compute a metric.
+
+        Args:
+            metric (_Metric): The metric.
+
+        Returns:
+            dict: The value of each output key.
+        """
+        groups: dict = {}
+
+        if metric.group_by is None and metric.bucket is None:
+            groups[(None, None)] = []
+
+        for index in range(self._item_count):
+            if self._is_matching(metric, index) is False:
+                continue
+
+            group = None if metric.group_by is None else \
+                _to_text(self._columns[metric.group_by][index])
+            bucket = None if metric.bucket is None else \
+                _get_bucket(self._columns[metric.bucket[0]][index], metric.bucket[1],
+                            self._buckets)
+            value = None if metric.field is None else \
+                _to_number(self._columns[metric.field][index])
+
+            is_complete = all(value is not None for field, value in
+                              ((metric.group_by, group), (metric.bucket, bucket),
+                               (metric.field, value)) if field is not None)
+
+            if is_complete is True:
+                groups.setdefault((group, bucket), []).append(value)
+
+        results = {}
+
+        for (group, bucket), values in groups.items():
+            result = _reduce(metric, values)
+
+            if result is not None:
+                results[metric.get_output_key(group, bucket)] = result
+
+        return results
+
+
+class _NumpyColumns:  # pylint: disable=too-few-public-methods
+    """
+    Computes metrics over columns with NumPy, vectorized over all items.
+    The columns are converted to arrays once and shared by the metrics.
+    """
+
+    def __init__(self, columns: dict, item_count: int) -> None:
+        """
+        Initializes the columns.
+
+        Args:
+            columns (dict): The values of each field.
+            item_count (int): The number of items.
+        """
+        self._columns = columns
+        self._item_count = item_count
+        self._arrays: dict = {}
+
+    def _get_numbers(self, field: str):
+        """
+        Get a field as array of numbers, NaN if missing.
+
+        Args:
+            field (str): The field.
+
+        Returns:
+            numpy.ndarray: The numbers.
+        """
+        key = (field, "number")
+
+        if key not in self._arrays:
+            self._arrays[key] = numpy.array(
+                [math.nan if (number := _to_number(value)) is None else number
+                 for value in self._columns[field]], dtype=float)
+
+        return self._arrays[key]
+
+    def _get_texts(self, field: str, unit: Optional[str] = None):
+        """
+        Get a field as array of texts, or of its date buckets if a unit is given.
+        Missing values are empty texts.
+
+        Args:
+            field (str): The field.
+            unit (Optional[str]): The unit of the date buckets.
+
+        Returns:
+            numpy.ndarray: The texts.
+        """
+        key = (field, unit or "text")
+
+        if key not in self._arrays:
+            buckets: dict = {}
+
+            if unit is None:
+                texts = [_to_text(value) or "" for value in self._columns[field]]
+            else:
+                texts = [_get_bucket(value, unit, buckets) or "" for value in self._columns[field]]
+
+            self._arrays[key] = numpy.array(texts, dtype=str)
+
+        return self._arrays[key]
+
+    def _get_mask(self, metric: _Metric):
+        """
+        Get the items which match all predicates of a metric and have all its fields.
+
+        Args:
+            metric (_Metric): The metric.
+
+        Returns:
+            numpy.ndarray: True for each matching item.
+        """
+        mask = numpy.ones(self._item_count, dtype=bool)
+
+        for field, comparison, value in metric.where:
+            if _is_number(value):
+                numbers = self._get_numbers(field)
+                mask &= ~numpy.isnan(numbers) & _COMPARISONS[comparison](numbers, value)
+            else:
+                texts = self._get_texts(field)
+
+                if comparison in ("in", "not in"):
+                    is_in = numpy.isin(texts, [_to_text(element) for element in value])
+                    mask &= (texts != "") & (is_in if comparison == "in" else ~is_in)
+                else:
+                    mask &= (texts != "") & _COMPARISONS[comparison](texts, _to_text(value))
+
+        if metric.group_by is not None:
+            mask &= self._get_texts(metric.group_by) != ""
+
+        if metric.bucket is not None:
+            mask &= self._get_texts(*metric.bucket) != ""
+
+        if metric.field is not None:
+            mask &= ~numpy.isnan(self._get_numbers(metric.field))
+
+        return mask
+
+    def _get_codes(self, field: Optional[str], selection, unit: Optional[str] = None) -> tuple:
+        """
+        Get the distinct values of a field and the index of each selected item within them.
+
+        Args:
+            field (Optional[str]): The field, None if not grouped by it.
+            selection (numpy.ndarray): The indices of the selected items.
+            unit (Optional[str]): The unit of the date buckets.
+
+        Returns:
+            tuple: The distinct values and the index of the value of each selected item.
+        """
+        if field is None:
+            codes = ([None], numpy.zeros(len(selection), dtype=int))
+        else:
+            codes = numpy.unique(self._get_texts(field, unit)[selection], return_inverse=True)
+
+        return codes
+
+    def compute(self, metric: _Metric) -> dict:
+        """
+        Compute a metric.
+
+        Args:
+            metric (_Metric): The metric.
+
+        Returns:
+            dict: The value of each output key.
+        """
+        selection = numpy.nonzero(self._get_mask(metric))[0]
+        groups, group_codes = self._get_codes(metric.group_by, selection)
+        buckets, bucket_codes = self._get_codes(
+            None if metric.bucket is None else metric.bucket[0],
+            selection,
+            None if metric.bucket is None else metric.bucket[1])
+        ids, codes = numpy.unique(group_codes * len(buckets) + bucket_codes, return_inverse=True)
+        values = None if metric.field is None else self._get_numbers(metric.field)[selection]
+        results = {}
+
+        if (len(selection) == 0) and (metric.group_by is None) and (metric.bucket is None):
+            # Without groups, there is always a result.
+            result = _reduce(metric, [])
+
+            if result is not None:
+                results[metric.get_output_key(None, None)] = result
+        else:
+            for group_id, result in zip(ids, _reduce_groups(metric, codes, len(ids), values)):
+                group = groups[group_id // len(buckets)]
+                bucket = buckets[group_id % len(buckets)]
+                results[metric.get_output_key(None if group is None else str(group),
+                                              None if bucket is None else str(bucket))] = result
+
+        return results
+
+################################################################################
+# Functions
+################################################################################
+
+
+def _get_value(item: dict, path: list):
+    """
+    Get the value of a field of an item.
+
+    Args:
+        item (dict): The issue or work item.
+        path (list): The keys of the field, e.g. ["fields", "status", "name"].
+
+    Returns:
+        Any: The value, None if missing.
+    """
+    value = item
+
+    for key in path:
+        if not isinstance(value, dict):
+            value = None
+            break
+
+        value = value.get(key)
+
+    return value
+
+
+def _is_number(value) -> bool:
+    """
+    Check if a value is a number, but not a boolean.
+
+    Args:
+        value (Any): The value.
+
+    Returns:
+        bool: True if the value is a number, False otherwise.
+    """
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _to_number(value) -> Optional[float]:
+    """
+    Convert a value to a number.
+
+    Args:
+        value (Any): The value, e.g. 3, 2.5 or "2.5".
+
+    Returns:
+        Optional[float]: The number, None if the value is missing or not a number.
+    """
+    number = None
+
+    if _is_number(value):
+        number = float(value)
+    elif isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            number = None
+
+    if (number is not None) and math.isnan(number):
+        number = None
+
+    return number
+
+
+def _to_text(value) -> Optional[str]:
+    """
+    Convert a value to text.
+
+    Args:
+        value (Any): The value.
+
+    Returns:
+        Optional[str]: The text, None if the value is missing or empty.
+    """
+    return None if value in (None, "") else str(value)
+
+
+def _get_bucket(value, unit: str, buckets: dict) -> Optional[str]:
+    """
+    Get the date bucket of a value, e.g. "2025-01" for the unit "month".
+
+    Args:
+        value (Any): The date or time in ISO 8601 format, e.g. "2025-01-31T10:00:00.000+0100".
+        unit (str): "day", "week", "month" or "year".
+        buckets (dict): The buckets of the values seen before, to convert each date once.
+
+    Returns:
+        Optional[str]: The bucket, None if the value is not a date.
+    """
+    key = (value[:10], unit) if isinstance(value, str) else None
+
+    if key not in buckets:
+        bucket = None
+
+        try:
+            date = datetime.date.fromisoformat(key[0])
+        except (TypeError, ValueError):
+            date = None
+
+        if date is None:
+            bucket = None
+        elif unit == "day":
+            bucket = date.isoformat()
+        elif unit == "week":
+            year, week, _ = date.isocalendar()
+            bucket = f"{year}-W{week:02d}"
+        elif unit == "month":
+            bucket = f"{date.year:04d}-{date.month:02d}"
+        else:
+            bucket = f"{date.year:04d}"
+
+        buckets[key] = bucket
+
+    return buckets[key]
+
+
+def _compare(value, comparison: str, expected) -> bool:
+    """
+    Check if a value matches a predicate.
+
+    Args:
+        value (Any): The value of the item.
+        comparison (str): The comparison, e.g. "==".
+        expected (Any): The value of the predicate.
+
+    Returns:
+        bool: True if the value matches, False otherwise.
+    """
+    if _is_number(expected):
+        value = _to_number(value)
+    elif comparison in ("in", "not in"):
+        expected = [_to_text(element) for element in expected]
+        value = _to_text(value)
+    else:
+        expected = _to_text(expected)
+        value = _to_text(value)
+
+    return (value is not None) and _COMPARISONS[comparison](value, expected)
+
+
+def _get_percentile(values: list, q: float) -> float:
+    """
+    Get a percentile of sorted values, interpolated linearly like NumPy.
+
+    Args:
+        values (list): The sorted values, at least one.
+        q (float): The percentile, 0 to 100.
+
+    Returns:
+        float: The percentile.
+    """
+    position = (len(values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _reduce(metric: _Metric, values: list):
+    """
+    Reduce the values of a group in pure Python.
+
+    Args:
+        metric (_Metric): The metric.
+        values (list): The values of the items, None for each item if the metric has no field.
+
+    Returns:
+        Any: The count as int, the other operations as float.
+            None if the operation is undefined for no values.
+    """
+    result = None
+
+    if metric.operation == "count":
+        result = len(values)
+    elif metric.operation == "sum":
+        result = float(math.fsum(values))
+    elif len(values) == 0:
+        result = None
+    elif metric.operation == "avg":
+        result = math.fsum(values) / len(values)
+    elif metric.operation == "min":
+        result = min(values)
+    elif metric.operation == "max":
+        result = max(values)
+    else:
+        result = _get_percentile(sorted(values), metric.q)
+
+    return result
+
+
+def _reduce_groups(metric: _Metric, codes, group_count: int, values) -> list:
+    """
+    Reduce the values of all groups at once with NumPy.
+
+    Args:
+        metric (_Metric): The metric.
+        codes (numpy.ndarray): The group index of each selected item.
+        group_count (int): The number of groups.
+        values (Optional[numpy.ndarray]): The values of the selected items, None if not needed.
+
+    Returns:
+        list: The result of each group, see _reduce().
+    """
+    counts = numpy.bincount(codes, minlength=group_count)
+
+    if metric.operation == "count":
+        results = [int(count) for count in counts]
+    elif metric.operation in ("sum", "avg"):
+        sums = numpy.bincount(codes, weights=values, minlength=group_count)
+
+        if metric.operation == "avg":
+            sums = sums / counts
+
+        results = [float(value) for value in sums]
+    elif metric.operation in ("min", "max"):
+        is_min = metric.operation == "min"
+        extremes = numpy.full(group_count, math.inf if is_min else -math.inf)
+        (numpy.minimum if is_min else numpy.maximum).at(extremes, codes, values)
+        results = [float(value) for value in extremes]
+    else:
+        order = numpy.lexsort((values, codes))
+        groups = numpy.split(values[order], numpy.cumsum(counts)[:-1])
+        results = [float(numpy.percentile(group, metric.q)) for group in groups]
+
+    return results
+
+################################################################################
+# Main
+################################################################################
@@ -0,0 +1,334 @@
+"""
+Backends to run the pyJiraCli, pyPolarionCli and pySupersetCli Tools.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import sys
+import io
+import logging
+import threading
+import functools
+import subprocess
+import traceback
+import importlib.metadata
+from typing import Callable, Optional
+
+from pyMetricCli.process_engine import get_engine, DEFAULT_TIMEOUT, DEFAULT_RETRIES
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+BACKEND_SUBPROCESS = "subprocess"
+BACKEND_IN_PROCESS = "in_process"
+
+# The tools parse sys.argv, which is process-wide. Therefore only one tool
+# can run in-process at a time, which serializes all in-process tool calls.
+_IN_PROCESS_LOCK = threading.Lock()
+
+################################################################################
+# Classes
+################################################################################
+
+
+class SubprocessBackend:  # pylint: disable=too-few-public-methods
+    """
+    Runs a tool as its own process using its command line executable.
+    The process is run by the shared process engine, which kills it after
+    the timeout and retries it after transient failures.
+    """
+
+    def __init__(self,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES,
+                 retry_timeout: bool = False) -> None:
+        """
+        Initializes the backend.
+
+        Args:
+            timeout (Optional[float]): Seconds until the tool is killed, None for no limit.
+            retries (int): Number of retries after a transient failure.
+            retry_timeout (bool): Whether a tool which timed out is retried.
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_timeout = retry_timeout
+
+    def run(self,
+            executable: str,
+            arguments: list,
+            pass_fds: tuple = ()) -> subprocess.CompletedProcess:
+        """
+        Run the tool with the given arguments.
+
+        Args:
+            executable (str): The name of the executable to run, e.g. "pyJiraCli".
+            arguments (list): List of arguments to pass to the tool.
+            pass_fds (tuple): File descriptors inherited by the tool, e.g. of a Handoff.
+
+        Returns:
+            subprocess.CompletedProcess[bytes]: The result of the command.
+            Includes return code, stdout and stderr.
+            See process_engine for the return codes of timeouts and cancellations.
+        """
+        args = [executable]  # The executable to run.
+        args.extend(arguments)  # Add the arguments to the command.
+        return get_engine().run(args, self.timeout, self.retries, pass_fds, self.retry_timeout)
+
+
+class _ThreadStream:
+    """
+    Stands in for sys.stdout or sys.stderr while a tool runs in-process.
+    The output of the thread running the tool is captured, the output of
+    all other threads passes through to the original stream.
+    """
+
+    def __init__(self, original, buffer: io.StringIO) -> None:
+        """
+        Initializes the stream for the calling thread.
+
+        Args:
+            original: The original stream, e.g. sys.stdout.
+            buffer (io.StringIO): The buffer for the output of the calling thread.
+        """
+        self._original = original
+        self._buffer = buffer
+        self._owner = threading.get_ident()
+
+    def write(self, text: str) -> int:
+        """
+        Write text to the buffer or the original stream, depending on the thread.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            int: The number of characters written.
+        """
+        if threading.get_ident() == self._owner:
+            return self._buffer.write(text)
+
+        return self._original.write(text)
+
+    def flush(self) -> None:
+        """
+        Flush the original stream.
+        """
+        self._original.flush()
+
+    def __getattr__(self, name: str):
+        return getattr(self._original, name)
+
+
+class InProcessBackend:  # pylint: disable=too-few-public-methods
+    """
+    Runs a tool inside the current Python interpreter by calling the
+    console script entry point of its installed package. This saves the
+    interpreter startup and the import of the tool package on every call.
+    If the entry point can not be found, the tool is run as subprocess.
+
+    The tools have no Python API besides their command line, so the
+    arguments are passed by sys.argv and the results are still exchanged
+    through their output files. Since sys.argv is process-wide, only one
+    tool runs in-process at a time, so concurrent searches and partitions
+    are run one after the other. A tool running in-process can not be
+    killed, so there is no timeout. Use the subprocess backend unless the
+    startup of the tools dominates, e.g. for many small searches.
+    """
+
+    def __init__(self, fallback: Optional[SubprocessBackend] = None) -> None:
+        self._fallback = SubprocessBackend() if fallback is None else fallback
+
+    def run(self,
+            executable: str,
+            arguments: list,
+            pass_fds: tuple = ()) -> subprocess.CompletedProcess:
+        """
+        Run the tool with the given arguments.
+
+        Args:
+            executable (str): The name of the executable to run, e.g. "pyJiraCli".
+            arguments (list): List of arguments to pass to the tool.
+            pass_fds (tuple): File descriptors inherited by the tool, e.g. of a Handoff.
+
+        Returns:
+            subprocess.CompletedProcess[bytes]: The result of the command.
+            Includes return code, stdout and stderr.
+        """
+        entry_point = find_entry_point(executable)
+
+        if entry_point is None:
+            LOG.warning("%s can not be run in-process, using a subprocess instead.", executable)
+            return self._fallback.run(executable, arguments, pass_fds)
+
+        args = [executable]
+        args.extend(arguments)
+
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        return_code = 0
+
+        with _IN_PROCESS_LOCK:
+            original_argv = sys.argv
+            original_stdout = sys.stdout
+            original_stderr = sys.stderr
+            sys.argv = list(args)
+            sys.stdout = _ThreadStream(original_stdout, stdout)
+            sys.stderr = _ThreadStream(original_stderr, stderr)
+
+            try:
+                result = entry_point()
+
+                # Entry points return their exit status or None on success.
+                if isinstance(result, int):
+                    return_code = result
+            except SystemExit as e:
+                return_code = _exit_code_to_int(e.code)
+            except Exception:  # pylint: disable=broad-except
+                stderr.write(traceback.format_exc())
+                return_code = 1
+            finally:
+                sys.argv = original_argv
+                sys.stdout = original_stdout
+                sys.stderr = original_stderr
+
+        return subprocess.CompletedProcess(args,
+                                           return_code,
+                                           stdout.getvalue().encode("utf-8"),
+                                           stderr.getvalue().encode("utf-8"))
+
+################################################################################
+# Functions
+################################################################################
+
+
+def _exit_code_to_int(code) -> int:
+    """
+    Convert the code of a SystemExit exception to a process return code.
+
+    Args:
+        code: The code passed to sys.exit().
+
+    Returns:
+        int: The return code.
+    """
+    if code is None:
+        return_code = 0
+    elif isinstance(code, int):
+        return_code = code
+    else:
+        # sys.exit() with a message, which is printed and results in 1.
+        return_code = 1
+
+    return return_code
+
+
+@functools.lru_cache(maxsize=None)
+def find_entry_point(executable: str) -> Optional[Callable]:
+    """
+    Find the console script entry point of the given executable.
+    The result is cached for the process, as scanning the entry points
+    of all installed packages is slow.
+
+    Args:
+        executable (str): The name of the console script, e.g. "pyJiraCli".
+
+    Returns:
+        Optional[Callable]: The entry point function or None if not found.
+    """
+    entry_point_function = None
+
+    try:
+        all_entry_points = importlib.metadata.entry_points()
+
+        # Python < 3.10 returns a dictionary of groups.
+        if isinstance(all_entry_points, dict):
+            console_scripts = all_entry_points.get("console_scripts", [])
+        else:
+            console_scripts = all_entry_points.select(group="console_scripts")
+
+        for entry_point in console_scripts:
+            if entry_point.name == executable:
+                entry_point_function = entry_point.load()
+                break
+    except Exception as e:  # pylint: disable=broad-except
+        LOG.error("An error occurred loading the entry point of %s: %s", executable, e)
+        entry_point_function = None
+
+    return entry_point_function
+
+
+def get_backend(config: dict, is_upload: bool = False):
+    """
+    Get the backend selected in the given tool configuration.
+    The backend is selected by the "backend" key, which can be
+    "subprocess" (default) or "in_process".
+    The "timeout" key sets the seconds until a tool process is killed
+    (default 3600, null for no limit) and the "retries" key the number
+    of retries after a transient failure (default 2).
+    A timeout is only retried if "retry_timeout" is True, as each retry
+    waits for the whole timeout again. An upload may have taken effect
+    although its tool failed, so uploads are not retried by default and
+    never after a timeout.
+
+    Args:
+        config (dict): The tool configuration of the adapter.
+        is_upload (bool): Whether the tool uploads data instead of searching.
+
+    Returns:
+        SubprocessBackend or InProcessBackend: The selected backend.
+    """
+    backend_name = config.get("backend", BACKEND_SUBPROCESS)
+    default_retries = 0 if is_upload is True else DEFAULT_RETRIES
+    subprocess_backend = SubprocessBackend(config.get("timeout", DEFAULT_TIMEOUT),
+                                           config.get("retries", default_retries),
+                                           retry_timeout=(is_upload is False) and
+                                           (config.get("retry_timeout") is True))
+
+    if backend_name == BACKEND_IN_PROCESS:
+        backend = InProcessBackend(subprocess_backend)
+    else:
+        if backend_name != BACKEND_SUBPROCESS:
+            LOG.warning("Unknown backend '%s', using '%s'.", backend_name, BACKEND_SUBPROCESS)
+
+        backend = subprocess_backend
+
+    return backend
+
+################################################################################
+# Main
+################################################################################
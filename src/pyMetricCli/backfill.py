@@ -0,0 +1,306 @@
+"""
+Backfill of the output of past dates from the snapshots of the data directory.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import copy
+import signal
+import logging
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from pyMetricCli.ret import Ret
+from pyMetricCli.adapter_interface import AdapterInterface
+from pyMetricCli.adapter_loader import load_adapter
+from pyMetricCli.columnar_store import ColumnarStore, read_results
+from pyMetricCli.pipeline import handle_search_results, flush_outbox
+from pyMetricCli.outbox import Outbox
+from pyMetricCli.paths import get_cache_dir
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# The backfill has its own outbox, so it does not upload the rows of regular runs.
+_OUTBOX_SUB_DIR_NAME = "backfill_outbox"
+
+# Initial output of each adapter in this process, by adapter file.
+# The output is usually a class attribute, so it is shared by all instances.
+_initial_outputs: dict = {}
+
+################################################################################
+# Classes
+################################################################################
+
+################################################################################
+# Functions
+################################################################################
+
+
+def get_dates(start: datetime.date, end: datetime.date) -> list:
+    """
+    Get all dates of a range.
+
+    Args:
+        start (datetime.date): The first date.
+        end (datetime.date): The last date, included.
+
+    Returns:
+        list: The dates, oldest first. Empty if end is before start.
+    """
+    return [start + datetime.timedelta(days=offset)
+            for offset in range((end - start).days + 1)]
+
+
+def _init_worker() -> None:
+    """
+    Initialize a worker process: the signal handlers of the main process
+    are not used, SIGINT is left to the main process and SIGTERM ends the worker.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+
+def _reset_output(adapter_file: str, adapter: AdapterInterface) -> None:
+    """
+    Reset the output of an adapter to its initial values, so the output
+    of a date does not depend on the dates replayed before by this process.
+
+    Args:
+        adapter_file (str): The adapter file.
+        adapter (AdapterInterface): The adapter.
+    """
+    initial_output = _initial_outputs.setdefault(adapter_file, copy.deepcopy(adapter.output))
+
+    adapter.output.clear()
+    adapter.output.update(copy.deepcopy(initial_output))
+
+
+def _replay_search(data_store: ColumnarStore,
+                   tool: str,
+                   config: dict,
+                   day: datetime.date) -> Optional[Tuple[Ret, Optional[dict]]]:
+    """
+    Read the search results of a date from the latest snapshot of that date.
+
+    Args:
+        data_store (ColumnarStore): The store of the snapshots.
+        tool (str): "jira" or "polarion".
+        config (dict): The configuration of the search.
+        day (datetime.date): The date.
+
+    Returns:
+        Optional[Tuple[Ret, Optional[dict]]]: The outcome of the search as in a run,
+            None if there is no snapshot of the date.
+    """
+    query_key = "filter" if tool == "jira" else "query"
+    search = (Ret.OK, None)
+
+    if config.get(query_key, "") != "":
+        snapshot = data_store.find_snapshot(tool, config,
+                                            datetime.datetime.combine(day, datetime.time.max))
+
+        if (snapshot is None) or (snapshot[0].date() != day):
+            search = None
+        else:
+            search = (Ret.OK, read_results(snapshot[1]))
+
+    return search
+
+
+def _backfill_date(adapter_files: list, data_dir: str, day: datetime.date) -> list:
+    """
+    Let the adapters handle the search results of a date. Runs in a worker
+    process, so the adapters are loaded by the process itself.
+
+    Args:
+        adapter_files (list): The adapter files.
+        data_dir (str): The data directory with the snapshots.
+        day (datetime.date): The date.
+
+    Returns:
+        list: The return status and the output row of each adapter.
+            The row is None if the adapter failed or a snapshot is missing,
+            which is an error.
+    """
+    data_store = ColumnarStore(data_dir)
+    outcomes = []
+
+    for adapter_file in adapter_files:
+        ret_status = Ret.OK
+        row = None
+        adapter = load_adapter(adapter_file)
+
+        if adapter is None:
+            ret_status = Ret.ERROR
+        else:
+            jira_search = _replay_search(data_store, "jira", adapter.jira_config, day)
+            polarion_search = _replay_search(data_store, "polarion",
+                                             adapter.polarion_config, day)
+
+            if (jira_search is None) or (polarion_search is None):
+                LOG.warning("No snapshot of the searches of %s on %s, skipped.",
+                            adapter_file, day.isoformat())
+                ret_status = Ret.ERROR
+            else:
+                _reset_output(adapter_file, adapter)
+                ret_status = handle_search_results(adapter, jira_search, polarion_search)
+
+                if Ret.OK == ret_status:
+                    row = copy.deepcopy(adapter.output)
+                    row["date"] = datetime.datetime.combine(day, datetime.time()).isoformat()
+
+        outcomes.append((ret_status, row))
+
+    return outcomes
+
+
+def _add_rows(outbox: Outbox,
+              adapters: list,
+              outcomes: list,
+              failures: dict,
+              day: datetime.date) -> int:
+    """
+    Add the output rows of a date to the outbox and record failed adapters.
+
+    Args:
+        outbox (Outbox): The outbox.
+        adapters (list): The index, the file and the instance of each backfilled adapter.
+        outcomes (list): The outcome of _backfill_date() for the date.
+        failures (dict): The failed dates and their return status by adapter index,
+            updated in place.
+        day (datetime.date): The date.
+
+    Returns:
+        int: The number of added rows.
+    """
+    row_count = 0
+
+    for (index, _, adapter), (ret_status, row) in zip(adapters, outcomes):
+        if row is not None:
+            if outbox.add(adapter.superset_config, row) is True:
+                row_count += 1
+            else:
+                ret_status = Ret.ERROR
+
+        if Ret.OK != ret_status:
+            failures.setdefault(index, []).append((day, ret_status))
+
+    return row_count
+
+
+def _report_failures(loaded_adapters: list, adapter_files: list, failures: dict) -> list:
+    """
+    Log the dates each adapter failed on and get the return status of each
+    adapter: the status of its load or else of its first failed date.
+
+    Args:
+        loaded_adapters (list): The outcome of _load_adapter() for each adapter.
+        adapter_files (list): The adapter files.
+        failures (dict): The failed dates and their return status by adapter index.
+
+    Returns:
+        list: The return status of each adapter, in the order of the loaded adapters.
+    """
+    adapter_results = [ret_status for ret_status, _ in loaded_adapters]
+
+    for index, failed_dates in sorted(failures.items()):
+        LOG.error("%s failed or had no snapshot on %d dates: %s", adapter_files[index],
+                  len(failed_dates), ", ".join(day.isoformat() for day, _ in failed_dates))
+        adapter_results[index] = failed_dates[0][1]
+
+    return adapter_results
+
+
+def run_backfill(loaded_adapters: list,
+                 adapter_files: list,
+                 data_store: ColumnarStore,
+                 dates: list,
+                 jobs: int) -> list:
+    """
+    Recompute the output of the adapters for past dates from the snapshots
+    of the data directory and upload it. The output of a date is computed
+    from the latest snapshot of each search on that date and stamped with
+    the date instead of the current time.
+    The dates are processed in parallel by worker processes. The rows are
+    added to an outbox of the backfill in the order of the dates and uploaded
+    by one pySupersetCli call per table, see flush_outbox(), unless the
+    'superset_config' sets "outbox_batch" to False; rows which could not be
+    uploaded stay in that outbox for the next backfill. A date without snapshot is an error of
+    the adapter.
+
+    Args:
+        loaded_adapters (list): The outcome of _load_adapter() for each adapter.
+        adapter_files (list): The adapter files.
+        data_store (ColumnarStore): The store of the snapshots.
+        dates (list): The dates, see get_dates().
+        jobs (int): Maximum number of dates processed at the same time.
+
+    Returns:
+        list: The return status of each adapter, in the order of the loaded adapters.
+    """
+    adapters = [(index, adapter_files[index], adapter)
+                for index, (ret_status, adapter) in enumerate(loaded_adapters)
+                if Ret.OK == ret_status]
+    outbox = Outbox(os.path.join(get_cache_dir(), _OUTBOX_SUB_DIR_NAME), flush_all=True)
+    failures: dict = {}
+    row_count = 0
+
+    with ProcessPoolExecutor(max_workers=max(1, jobs), initializer=_init_worker) as executor:
+        futures = [executor.submit(_backfill_date, [adapter[1] for adapter in adapters],
+                                   data_store.directory, day)
+                   for day in dates]
+
+        for day, future in zip(dates, futures):
+            try:
+                outcomes = future.result()
+            except Exception as e:  # pylint: disable=broad-except
+                LOG.error("The backfill of %s failed: %s", day.isoformat(), e)
+                outcomes = [(Ret.ERROR, None)] * len(adapters)
+
+            row_count += _add_rows(outbox, adapters, outcomes, failures, day)
+
+    LOG.info("Backfilled %d rows for %d dates.", row_count, len(dates))
+    flush_outbox(outbox, [adapter for _, _, adapter in adapters])
+
+    return _report_failures(loaded_adapters, adapter_files, failures)
+
+################################################################################
+# Main
+################################################################################
@@ -0,0 +1,551 @@
+"""
+Columnar storage of fetched search results as Arrow IPC files.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import logging
+import datetime
+import threading
+from typing import Iterable, Optional, Tuple
+
+from pyMetricCli.result_cache import ResultCache
+from pyMetricCli.serializer import dumps, loads
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+_FILE_EXTENSION = ".arrow"
+
+# Format of the fetch time in the file names, sortable.
+_TIME_FORMAT = "%Y%m%dT%H%M%S%f"
+
+# Key of the pyMetricCli metadata in the schema metadata.
+_METADATA_KEY = b"pymetriccli"
+
+# Types of the values of a column stored natively, if all its values have the same type.
+_SCALAR_TYPES = (str, bool, int, float)
+
+# Prefix of the columns storing which items have a value in a column,
+# no field path can start with it, see _escape_key().
+_PRESENCE_PREFIX = "\\present:"
+
+################################################################################
+# Classes
+################################################################################
+
+
+class ColumnarStore:
+    """
+    Stores the search results of each run as Arrow IPC file, one column per
+    field of the issues or work items. Nested fields are flattened to paths
+    of keys separated by dots, e.g. "fields.status.name", which are also the
+    field paths of the metric declarations. Dots and backslashes in keys are
+    escaped by a backslash. Lists, empty dictionaries and values of mixed
+    types are stored as JSON text, so they are read as they were written.
+    Explicit null values are kept apart from missing fields.
+
+    The files are written uncompressed, so they can be memory-mapped and
+    only the needed columns are read. Layout:
+    <directory>/<tool>/<search key>/<fetch time>.arrow
+
+    Requires the optional pyarrow package.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        Initializes the store.
+
+        Args:
+            directory (str): The data directory.
+        """
+        self.directory = directory
+
+    @staticmethod
+    def is_available() -> bool:
+        """
+        Check if pyarrow is installed.
+
+        Returns:
+            bool: True if the store can be used, False otherwise.
+        """
+        return pyarrow is not None
+
+    def _get_search_dir(self, tool: str, search_key: str) -> str:
+        """
+        Get the directory of the snapshots of a search.
+
+        Args:
+            tool (str): "jira" or "polarion".
+            search_key (str): The search key, see get_search_key().
+
+        Returns:
+            str: Path to the directory.
+        """
+        return os.path.join(self.directory, tool, search_key)
+
+    def write(self,  # pylint: disable=too-many-arguments
+              tool: str,
+              config: dict,
+              header: dict,
+              items: Iterable[dict],
+              items_key: str) -> Optional[str]:
+        """
+        Write the search results of a run as snapshot.
+
+        Args:
+            tool (str): "jira" or "polarion".
+            config (dict): The configuration of the search.
+            header (dict): The values of the search results besides the items.
+            items (Iterable[dict]): The issues or work items.
+            items_key (str): Key of the item list in the search results.
+
+        Returns:
+            Optional[str]: Path to the snapshot, None if it could not be written.
+        """
+        fetched = datetime.datetime.now()
+        search_key = get_search_key(tool, config)
+        file_path = os.path.join(self._get_search_dir(tool, search_key),
+                                 fetched.strftime(_TIME_FORMAT) + _FILE_EXTENSION)
+        table = _to_table(items, {"tool": tool,
+                                  "search_key": search_key,
+                                  "fetched": fetched.isoformat(),
+                                  "items_key": items_key,
+                                  "header": header})
+        temp_file_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+            with pyarrow.OSFile(temp_file_path, "wb") as sink:
+                with pyarrow.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+            os.replace(temp_file_path, file_path)
+        except (OSError, pyarrow.ArrowException) as e:
+            LOG.error("The snapshot %s could not be written: %s", file_path, e)
+            file_path = None
+
+        return file_path
+
+    def list_snapshots(self, tool: str, search_key: str) -> list:
+        """
+        List the snapshots of a search, oldest first.
+
+        Args:
+            tool (str): "jira" or "polarion".
+            search_key (str): The search key, see get_search_key().
+
+        Returns:
+            list: Tuples of the fetch time and the path of each snapshot.
+        """
+        snapshots = []
+        search_dir = self._get_search_dir(tool, search_key)
+
+        try:
+            file_names = os.listdir(search_dir)
+        except OSError:
+            file_names = []
+
+        for file_name in file_names:
+            if file_name.endswith(_FILE_EXTENSION):
+                try:
+                    fetched = datetime.datetime.strptime(file_name[:-len(_FILE_EXTENSION)],
+                                                         _TIME_FORMAT)
+                except ValueError:
+                    continue
+
+                snapshots.append((fetched, os.path.join(search_dir, file_name)))
+
+        return sorted(snapshots)
+
+    def find_snapshot(self, tool: str, config: dict,
+                      time: datetime.datetime) -> Optional[Tuple[datetime.datetime, str]]:
+        """
+        Find the latest snapshot of a search fetched at or before the given time.
+
+        Args:
+            tool (str): "jira" or "polarion".
+            config (dict): The configuration of the search.
+            time (datetime.datetime): The time.
+
+        Returns:
+            Optional[Tuple[datetime.datetime, str]]: The fetch time and the path
+                of the snapshot, None if there is none.
+        """
+        snapshot = None
+
+        for fetched, file_path in self.list_snapshots(tool, get_search_key(tool, config)):
+            if fetched > time:
+                break
+
+            snapshot = (fetched, file_path)
+
+        return snapshot
+
+################################################################################
+# Functions
+################################################################################
+
+
+def get_search_key(tool: str, config: dict) -> str:
+    """
+    Get the key of a search in the store. It depends on the server (or
+    profile) and the filter or query, but not on the fields, as searches of
+    several adapters are merged with the union of their fields.
+
+    Args:
+        tool (str): "jira" or "polarion".
+        config (dict): The configuration of the search.
+
+    Returns:
+        str: The search key.
+    """
+    server = config.get("profile", config.get("server"))
+
+    if tool == "jira":
+        search_key = ResultCache.make_key(tool=tool, server=server, filter=config["filter"])
+    else:
+        search_key = ResultCache.make_key(tool=tool, server=server,
+                                          project=config["project"], query=config["query"])
+
+    return search_key
+
+
+def _escape_key(key) -> str:
+    """
+    Escape the dots and backslashes of a key, so it is one element of a field path.
+
+    Args:
+        key: The key of a dictionary.
+
+    Returns:
+        str: The escaped key.
+    """
+    return str(key).replace("\\", "\\\\").replace(".", "\\.")
+
+
+def _split_path(name: str) -> list:
+    """
+    Split a field path into its unescaped keys, see _escape_key().
+
+    Args:
+        name (str): The field path, e.g. "fields.status.name".
+
+    Returns:
+        list: The keys, e.g. ["fields", "status", "name"].
+    """
+    keys = [""]
+    is_escaped = False
+
+    for character in name:
+        if is_escaped is True:
+            keys[-1] += character
+            is_escaped = False
+        elif character == "\\":
+            is_escaped = True
+        elif character == ".":
+            keys.append("")
+        else:
+            keys[-1] += character
+
+    return keys
+
+
+def _flatten(item: dict, prefix: str, row: dict) -> None:
+    """
+    Flatten the nested dictionaries of an item.
+
+    Args:
+        item (dict): The item or a nested dictionary of it.
+        prefix (str): The path of the nested dictionary, e.g. "fields.".
+        row (dict): The flattened values by path, updated in place.
+    """
+    for key, value in item.items():
+        if isinstance(value, dict) and (len(value) > 0):
+            _flatten(value, f"{prefix}{_escape_key(key)}.", row)
+        else:
+            row[f"{prefix}{_escape_key(key)}"] = value
+
+
+def _get_columns(items: Iterable[dict]) -> Tuple[dict, dict, int]:
+    """
+    Get the columns of the items. Missing fields are None.
+
+    Args:
+        items (Iterable[dict]): The issues or work items.
+
+    Returns:
+        Tuple[dict, dict, int]: The values of each column, the indexes of
+            the items missing each column and the number of items.
+    """
+    columns = {}
+    missing = {}
+    item_count = 0
+
+    for item in items:
+        row = {}
+        _flatten(item, "", row)
+
+        for name, value in row.items():
+            column = columns.get(name)
+
+            if column is None:
+                column = columns[name] = [None] * item_count
+                missing[name] = list(range(item_count))
+
+            column.append(value)
+
+        item_count += 1
+
+        for name, column in columns.items():
+            if len(column) < item_count:
+                column.append(None)
+                missing[name].append(item_count - 1)
+
+    return columns, missing, item_count
+
+
+def _is_scalar_column(values: list) -> bool:
+    """
+    Check whether a column can be stored natively: all its values are None or
+    have the same scalar type. Lists and dictionaries are not stored natively,
+    as Arrow adds missing keys of dictionaries in lists as None, and neither
+    are mixed types, as Arrow converts e.g. mixed numbers to floats.
+
+    Args:
+        values (list): The values of the column.
+
+    Returns:
+        bool: True if the column can be stored natively, False for JSON text.
+    """
+    value_types = {type(value) for value in values if value is not None}
+
+    return (len(value_types) <= 1) and all(value_type in _SCALAR_TYPES
+                                          for value_type in value_types)
+
+
+def _to_json_array(values: list):
+    """
+    Convert the values of a column to JSON text.
+
+    Args:
+        values (list): The values of the column.
+
+    Returns:
+        pyarrow.Array: The JSON text of each value, None for None.
+    """
+    return pyarrow.array([None if value is None else dumps(value).decode("utf-8")
+                          for value in values], pyarrow.string())
+
+
+def _to_table(items: Iterable[dict], metadata: dict):
+    """
+    Convert the items to a table with one column per field.
+
+    A null value of a column is a missing field, unless the column is one
+    of the "null_columns", whose null values are all explicit null values.
+    If a column has both, a boolean column named with _PRESENCE_PREFIX
+    tells which items have the field.
+
+    Args:
+        items (Iterable[dict]): The issues or work items.
+        metadata (dict): The pyMetricCli metadata of the table. The number of
+            items and the columns stored as JSON text or with explicit null
+            values are added.
+
+    Returns:
+        pyarrow.Table: The table.
+    """
+    columns, missing, metadata["item_count"] = _get_columns(items)
+    metadata["json_columns"] = []
+    metadata["null_columns"] = []
+    names = []
+    arrays = []
+
+    for name, values in columns.items():
+        array = None
+
+        if _is_scalar_column(values) is True:
+            try:
+                array = pyarrow.array(values)
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, OverflowError):
+                # E.g. an integer beyond 64 bit.
+                array = None
+
+        if array is None:
+            array = _to_json_array(values)
+            metadata["json_columns"].append(name)
+
+        arrays.append(array)
+
+        names.append(name)
+
+        if arrays[-1].null_count > len(missing[name]):
+            if len(missing[name]) == 0:
+                metadata["null_columns"].append(name)
+            else:
+                presence = [True] * len(values)
+
+                for index in missing[name]:
+                    presence[index] = False
+
+                arrays.append(pyarrow.array(presence, pyarrow.bool_()))
+                names.append(_PRESENCE_PREFIX + name)
+
+    return pyarrow.table(arrays, names=names, metadata={_METADATA_KEY: dumps(metadata)})
+
+
+def _read_table(file_path: str, columns: Optional[list] = None) -> Tuple:
+    """
+    Read a snapshot memory-mapped. The table refers to the mapped file, so
+    only the pages of the values which are accessed are read from disk,
+    e.g. those of the selected columns.
+
+    Args:
+        file_path (str): Path to the snapshot.
+        columns (Optional[list]): The columns to read, None for all.
+            Columns not in the snapshot are skipped.
+
+    Returns:
+        Tuple[pyarrow.Table, dict]: The table and the pyMetricCli metadata.
+    """
+    with pyarrow.memory_map(file_path, "r") as source:
+        table = pyarrow.ipc.open_file(source).read_all()
+
+    metadata = loads(table.schema.metadata[_METADATA_KEY])
+
+    if columns is not None:
+        table = table.select([name for name in columns if name in table.column_names])
+
+    return table, metadata
+
+
+def read_columns(file_path: str, columns: list) -> Tuple[dict, int]:
+    """
+    Read columns of a snapshot, e.g. the fields used by declared metrics.
+
+    Args:
+        file_path (str): Path to the snapshot.
+        columns (list): The field paths, e.g. ["fields.status.name"].
+            Fields missing in the snapshot are None for all items.
+
+    Returns:
+        Tuple[dict, int]: The values of each column and the number of items.
+    """
+    table, metadata = _read_table(file_path, columns)
+    values = {}
+
+    for name in columns:
+        if name not in table.column_names:
+            values[name] = [None] * metadata["item_count"]
+        elif name in metadata["json_columns"]:
+            values[name] = [None if value is None else loads(value)
+                            for value in table.column(name).to_pylist()]
+        else:
+            values[name] = table.column(name).to_pylist()
+
+    return values, metadata["item_count"]
+
+
+def _to_item(row: dict, paths: dict, json_columns: set, null_columns: set) -> dict:
+    """
+    Convert a row of a snapshot to the nested dictionaries of an item.
+
+    Args:
+        row (dict): The values of the row by column name.
+        paths (dict): The keys of each field column, see _split_path().
+        json_columns (set): The columns stored as JSON text.
+        null_columns (set): The columns whose null values are explicit null values.
+
+    Returns:
+        dict: The item.
+    """
+    item = {}
+
+    for name, path in paths.items():
+        value = row[name]
+
+        if (value is None) and (name not in null_columns) and \
+                (row.get(_PRESENCE_PREFIX + name) is not True):
+            continue
+
+        if (name in json_columns) and (value is not None):
+            value = loads(value)
+
+        parent = item
+        for key in path[:-1]:
+            parent = parent.setdefault(key, {})
+
+        parent[path[-1]] = value
+
+    return item
+
+
+def read_results(file_path: str) -> dict:
+    """
+    Read a snapshot as search results, as passed to the handlers of the adapters.
+    Missing fields of an item are left out, explicit null values are kept.
+
+    Args:
+        file_path (str): Path to the snapshot.
+
+    Returns:
+        dict: The search results.
+    """
+    table, metadata = _read_table(file_path)
+    paths = {name: _split_path(name) for name in table.column_names
+             if not name.startswith(_PRESENCE_PREFIX)}
+    json_columns = set(metadata["json_columns"])
+    null_columns = set(metadata.get("null_columns", []))
+
+    results = dict(metadata["header"])
+    results[metadata["items_key"]] = [_to_item(row, paths, json_columns, null_columns)
+                                      for row in table.to_pylist()]
+
+    return results
+
+################################################################################
+# Main
+################################################################################
@@ -0,0 +1,305 @@
+"""
+Process-wide cache of the credentials of pyProfileMgr profiles.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import time
+import logging
+import threading
+from typing import Optional
+
+from pyProfileMgr.profile_data import ProfileType
+from pyProfileMgr.profile_mgr import ProfileMgr
+from pyProfileMgr.ret import Ret
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# Environment variable to overwrite the directory of the pyProfileMgr profiles.
+PROFILE_DIR_ENV = "PYMETRICCLI_PROFILE_DIR"
+
+_DEFAULT_PROFILE_DIR_NAME = ".pyProfileMgr"
+
+# Seconds a profile is cached if its files are not found, so changes can not be detected.
+_UNTRACKED_PROFILE_TTL = 60
+
+# The resolver shared by all wrappers of this process.
+_resolver: Optional["CredentialResolver"] = None
+_resolver_lock = threading.Lock()
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Credentials:  # pylint: disable=too-few-public-methods
+    """
+    The server and the credentials of a tool, from a profile or a configuration.
+    """
+
+    def __init__(self, server: str, user: str = "", password: str = "", token: str = "") -> None:
+        """
+        Initializes the credentials.
+
+        Args:
+            server (str): The server URL.
+            user (str): The user name.
+            password (str): The password.
+            token (str): The API token, preferred over user and password by the tools.
+        """
+        self.server = server
+        self.user = user
+        self.password = password
+        self.token = token
+
+
+class CredentialResolver:
+    """
+    Loads each pyProfileMgr profile once and keeps its credentials in memory,
+    so profiles are not read and decrypted again for every search and upload.
+    A profile is loaded again if the modification time or the size of one of
+    its files changed. If its files are not found in the profile directory,
+    it is loaded again after _UNTRACKED_PROFILE_TTL seconds. The credentials
+    are never written to a file or passed on the command line of a tool.
+    """
+
+    def __init__(self, profile_dir: Optional[str] = None) -> None:
+        """
+        Initializes the resolver.
+
+        Args:
+            profile_dir (Optional[str]): The directory of the pyProfileMgr profiles,
+                used to detect changed profiles. Defaults to get_profile_dir().
+        """
+        self.profile_dir = get_profile_dir() if profile_dir is None else profile_dir
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+
+    def _get_signature(self, profile_name: str) -> Optional[tuple]:
+        """
+        Get the modification times and sizes of the files of a profile.
+
+        Args:
+            profile_name (str): The profile name.
+
+        Returns:
+            Optional[tuple]: The signature, None if the profile files are not found.
+        """
+        profile_path = os.path.join(self.profile_dir, profile_name)
+        signature = []
+
+        for directory, _, file_names in os.walk(profile_path):
+            for file_name in sorted(file_names):
+                try:
+                    file_stat = os.stat(os.path.join(directory, file_name))
+                except OSError:
+                    continue
+
+                signature.append((directory, file_name, file_stat.st_mtime_ns, file_stat.st_size))
+
+        if os.path.isfile(profile_path):
+            file_stat = os.stat(profile_path)
+            signature.append((profile_path, "", file_stat.st_mtime_ns, file_stat.st_size))
+
+        return tuple(signature) if len(signature) > 0 else None
+
+    def resolve(self, profile_name: str, profile_type: ProfileType) -> Optional[Credentials]:
+        """
+        Get the credentials of a profile, loaded from the cache if unchanged.
+
+        Args:
+            profile_name (str): The profile name.
+            profile_type (ProfileType): The expected type of the profile.
+
+        Returns:
+            Optional[Credentials]: The credentials, None if the profile could not
+                be loaded or has another type.
+        """
+        signature = self._get_signature(profile_name)
+
+        # Concurrent searches of the same profile wait for a single load.
+        with self._lock:
+            entry = self._entries.get(profile_name)
+
+            if _is_outdated(entry, signature) is True:
+                entry = _load_profile(profile_name)
+
+                if entry is not None:
+                    entry = (signature, time.monotonic()) + entry
+                    self._entries[profile_name] = entry
+
+        credentials = None
+
+        if entry is not None:
+            if entry[2] != profile_type:
+                print(f"The profile type is not '{profile_type.value}'.")
+            else:
+                credentials = entry[3]
+
+        return credentials
+
+    def invalidate(self, profile_name: Optional[str] = None) -> None:
+        """
+        Remove a profile from the cache, so it is loaded again.
+
+        Args:
+            profile_name (Optional[str]): The profile name, None for all profiles.
+        """
+        with self._lock:
+            if profile_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(profile_name, None)
+
+################################################################################
+# Functions
+################################################################################
+
+
+def get_profile_dir() -> str:
+    """
+    Get the directory of the pyProfileMgr profiles.
+    The directory can be set by the PYMETRICCLI_PROFILE_DIR environment variable.
+
+    Returns:
+        str: Path to the profile directory.
+    """
+    profile_dir = os.environ.get(PROFILE_DIR_ENV, "")
+
+    if profile_dir == "":
+        profile_dir = os.path.join(os.path.expanduser("~"), _DEFAULT_PROFILE_DIR_NAME)
+
+    return profile_dir
+
+
+def _is_outdated(entry: Optional[tuple], signature: Optional[tuple]) -> bool:
+    """
+    Check if a cached profile must be loaded again.
+
+    Args:
+        entry (Optional[tuple]): The cached signature, load time, type and credentials.
+        signature (Optional[tuple]): The current signature of the profile files.
+
+    Returns:
+        bool: True if the profile is not cached, changed or cached too long
+            without signature, False otherwise.
+    """
+    is_outdated = True
+
+    if (entry is not None) and (entry[0] == signature):
+        is_outdated = (signature is None) and \
+            (time.monotonic() - entry[1] > _UNTRACKED_PROFILE_TTL)
+
+    return is_outdated
+
+
+def _load_profile(profile_name: str) -> Optional[tuple]:
+    """
+    Load a profile with pyProfileMgr.
+
+    Args:
+        profile_name (str): The profile name.
+
+    Returns:
+        Optional[tuple]: The profile type and the credentials, None on error.
+    """
+    profile_mgr = ProfileMgr()
+    entry = None
+
+    if profile_mgr.load(profile_name) != Ret.CODE.RET_OK:
+        print("Error loading profile:", profile_name)
+    else:
+        profile = profile_mgr.loaded_profile
+        # Both 'profile_type' and 'type' are accepted as name of the type attribute.
+        profile_type = getattr(profile, "profile_type", getattr(profile, "type", None))
+        entry = (profile_type, Credentials(profile.server_url,
+                                           getattr(profile, "user", "") or "",
+                                           getattr(profile, "password", "") or "",
+                                           getattr(profile, "token", "") or ""))
+        LOG.info("Profile '%s' loaded.", profile_name)
+
+    return entry
+
+
+def get_resolver() -> CredentialResolver:
+    """
+    Get the credential resolver shared by all wrappers of this process.
+
+    Returns:
+        CredentialResolver: The resolver.
+    """
+    global _resolver  # pylint: disable=global-statement
+
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = CredentialResolver()
+
+        return _resolver
+
+
+def resolve_credentials(config: dict, profile_type: ProfileType) -> Optional[Credentials]:
+    """
+    Get the credentials of a tool configuration. If a profile name is given
+    by "profile", the credentials of the profile are used, see CredentialResolver.
+    Otherwise they are taken from "server", "username" (or "user"),
+    "password" and "token" of the configuration.
+    The wrappers pass the name of a profile to the tools instead of its
+    credentials, which would be visible in the process list. They use the
+    credentials of a profile only to check that it can be used.
+
+    Args:
+        config (dict): The configuration, e.g. the 'polarion_config' of an adapter.
+        profile_type (ProfileType): The expected type of the profile.
+
+    Returns:
+        Optional[Credentials]: The credentials, None if the profile could not be used.
+    """
+    if "profile" in config:
+        credentials = get_resolver().resolve(config["profile"], profile_type)
+    else:
+        credentials = Credentials(config["server"],
+                                  config.get("username", config.get("user", "")),
+                                  config.get("password", ""),
+                                  config.get("token", ""))
+
+    return credentials
+
+################################################################################
+# Main
+################################################################################
@@ -0,0 +1,221 @@
+"""
+Cron-style schedules for the service mode.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import datetime
+
+################################################################################
+# Variables
+################################################################################
+
+# Shortcuts for frequently used schedules.
+_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *"
+}
+
+# Minimum and maximum value of minute, hour, day of month, month and day of week.
+_FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+# Limit of the search for the next time, e.g. for "0 0 30 2 *", which never matches.
+_MAX_SEARCH_DAYS = 5 * 366
+
+################################################################################
+# Classes
+################################################################################
+
+
+class CronSchedule:
+    """
+    A schedule in cron syntax: "minute hour day-of-month month day-of-week".
+    Each field is "*", a number, a range "a-b" or a list of them separated by
+    commas, optionally with a step "/n". Sunday is 0 or 7. As in cron, a time
+    matches if the day of month or the day of week matches, if both are restricted.
+    The aliases @hourly, @daily, @midnight, @weekly, @monthly, @yearly and
+    @annually are supported as well.
+    """
+
+    def __init__(self, expression: str) -> None:
+        """
+        Initializes the schedule.
+
+        Args:
+            expression (str): The cron expression, e.g. "*/15 * * * *".
+
+        Raises:
+            ValueError: If the expression is invalid.
+        """
+        self.expression = expression
+        fields = _ALIASES.get(expression.strip(), expression).split()
+
+        if len(fields) != len(_FIELD_RANGES):
+            raise ValueError(f"Invalid cron expression '{expression}', 5 fields are required.")
+
+        self._minutes, self._hours, self._days, self._months, self._weekdays = [
+            _parse_field(field, minimum, maximum)
+            for field, (minimum, maximum) in zip(fields, _FIELD_RANGES)]
+
+        # Sunday may be given as 7.
+        if 7 in self._weekdays:
+            self._weekdays = (self._weekdays - {7}) | {0}
+
+        # If both are restricted, either the day of month or the day of week must match.
+        self._is_any_day_matching = (fields[2].startswith("*") is False) and \
+            (fields[4].startswith("*") is False)
+
+    def _is_day_matching(self, time: datetime.datetime) -> bool:
+        """
+        Check if the day of a time matches the schedule.
+
+        Args:
+            time (datetime.datetime): The time.
+
+        Returns:
+            bool: True if the day matches, False otherwise.
+        """
+        # Python counts from Monday (0), cron from Sunday (0).
+        weekday = (time.weekday() + 1) % 7
+        is_day = time.day in self._days
+        is_weekday = weekday in self._weekdays
+
+        if self._is_any_day_matching is True:
+            is_matching = is_day or is_weekday
+        else:
+            is_matching = is_day and is_weekday
+
+        return is_matching
+
+    def matches(self, time: datetime.datetime) -> bool:
+        """
+        Check if a time matches the schedule, with a granularity of minutes.
+
+        Args:
+            time (datetime.datetime): The time.
+
+        Returns:
+            bool: True if the time matches, False otherwise.
+        """
+        return (time.minute in self._minutes) and \
+            (time.hour in self._hours) and \
+            (time.month in self._months) and \
+            self._is_day_matching(time)
+
+    def get_next_time(self, after: datetime.datetime) -> datetime.datetime:
+        """
+        Get the next time matching the schedule.
+
+        Args:
+            after (datetime.datetime): The time after which to search.
+
+        Returns:
+            datetime.datetime: The next matching time, at full minutes.
+
+        Raises:
+            ValueError: If the schedule never matches.
+        """
+        time = after.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = time + datetime.timedelta(days=_MAX_SEARCH_DAYS)
+
+        # Skip whole days and hours which do not match, to keep the search short.
+        while time < limit:
+            if (time.month not in self._months) or (self._is_day_matching(time) is False):
+                time = time.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif time.hour not in self._hours:
+                time = time.replace(minute=0) + datetime.timedelta(hours=1)
+            elif time.minute not in self._minutes:
+                time += datetime.timedelta(minutes=1)
+            else:
+                return time
+
+        raise ValueError(f"The cron expression '{self.expression}' never matches.")
+
+################################################################################
+# Functions
+################################################################################
+
+
+def _parse_field(field: str, minimum: int, maximum: int) -> set:
+    """
+    Parse a field of a cron expression.
+
+    Args:
+        field (str): The field, e.g. "1-5", "*/10" or "0,30".
+        minimum (int): The minimum value of the field.
+        maximum (int): The maximum value of the field.
+
+    Returns:
+        set: The values of the field.
+
+    Raises:
+        ValueError: If the field is invalid.
+    """
+    values = set()
+
+    for part in field.split(","):
+        step = 1
+
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+
+            if step < 1:
+                raise ValueError(f"Invalid step in cron field '{field}'.")
+
+        if part == "*":
+            first, last = minimum, maximum
+        elif "-" in part:
+            first_text, last_text = part.split("-", 1)
+            first, last = int(first_text), int(last_text)
+        else:
+            first = int(part)
+            # A single value with a step runs to the maximum, e.g. "5/15".
+            last = maximum if step > 1 else first
+
+        if (first < minimum) or (last > maximum) or (first > last):
+            raise ValueError(f"Value out of range in cron field '{field}'.")
+
+        values.update(range(first, last + 1, step))
+
+    return values
+
+################################################################################
+# Main
+################################################################################
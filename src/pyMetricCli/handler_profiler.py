@@ -0,0 +1,317 @@
+"""
+Profiling of the adapter handlers with cProfile and tracemalloc.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import re
+import time
+import pstats
+import hashlib
+import logging
+import cProfile
+import threading
+import contextlib
+import tracemalloc
+from typing import Iterator, Optional
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# Number of allocation sites listed in the summary.
+DEFAULT_TOP_ALLOCATIONS = 20
+
+# Directory of the pyMetricCli package, to attribute costs to pyMetricCli.
+_PACKAGE_DIR = os.path.normcase(os.path.dirname(os.path.abspath(__file__)))
+
+# The profiler of the active run, None if disabled.
+_active: Optional["HandlerProfiler"] = None
+
+################################################################################
+# Classes
+################################################################################
+
+
+class HandlerProfiler:  # pylint: disable=too-few-public-methods
+    """
+    Profiles the handlers of the adapters. For each handler it writes
+    "<adapter>_<hash>_<handler>.pstats", which can be viewed e.g. with
+    "python -m pstats" or snakeviz, and "<adapter>_<hash>_<handler>.txt"
+    with the time and the memory attributed to the adapter, to pyMetricCli
+    and to other code, and the top allocation sites.
+
+    cProfile and tracemalloc are process-wide, so profiled handlers run one
+    at a time. The files are replaced on each run of a handler.
+    """
+
+    def __init__(self, directory: str, top_allocations: int = DEFAULT_TOP_ALLOCATIONS) -> None:
+        """
+        Initializes the profiler.
+
+        Args:
+            directory (str): The directory of the profile files.
+            top_allocations (int): Number of allocation sites listed in the summary.
+        """
+        self.directory = directory
+        self.top_allocations = top_allocations
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def profile(self, adapter_file: str, handler_name: str) -> Iterator[None]:
+        """
+        Profile a handler call and write its profile files.
+
+        Args:
+            adapter_file (str): The adapter file.
+            handler_name (str): The name of the handler, e.g. "handle_jira".
+
+        Yields:
+            None
+        """
+        with self._lock:
+            is_tracing = tracemalloc.is_tracing()
+            snapshot_before = None
+
+            if is_tracing is True:
+                snapshot_before = tracemalloc.take_snapshot()
+            else:
+                tracemalloc.start()
+
+            tracemalloc.reset_peak()
+            profile = cProfile.Profile()
+            start_wall = time.perf_counter()
+            profile.enable()
+
+            try:
+                yield
+            finally:
+                profile.disable()
+                wall = time.perf_counter() - start_wall
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+
+                if is_tracing is False:
+                    tracemalloc.stop()
+
+                self._write(adapter_file, handler_name, profile,
+                            _get_allocations(snapshot, snapshot_before),
+                            (wall, peak))
+
+    def _write(self,  # pylint: disable=too-many-arguments
+               adapter_file: str,
+               handler_name: str,
+               profile: cProfile.Profile,
+               allocations: list,
+               totals: tuple) -> None:
+        """
+        Write the profile files of a handler call.
+
+        Args:
+            adapter_file (str): The adapter file.
+            handler_name (str): The name of the handler.
+            profile (cProfile.Profile): The profile of the call.
+            allocations (list): The allocation statistics, largest first.
+            totals (tuple): The wall time in seconds and the peak of the traced memory in bytes.
+        """
+        wall, peak = totals
+        file_path = os.path.join(self.directory, _get_file_name(adapter_file, handler_name))
+        stats = pstats.Stats(profile)
+        time_by_origin, size_by_origin = _get_cost_by_origin(stats, allocations, adapter_file)
+        lines = [f"Adapter: {adapter_file}",
+                 f"Handler: {handler_name}",
+                 f"Wall time: {wall:.3f} s",
+                 f"Peak traced memory: {peak / 1024:.1f} KiB",
+                 "",
+                 "Own time of the called functions by origin:"]
+        lines += [f"  {origin}: {own_time:.3f} s"
+                  for origin, own_time in sorted(time_by_origin.items())]
+        lines += ["", "Memory allocated and still held after the handler by origin:"]
+        lines += [f"  {origin}: {size / 1024:.1f} KiB"
+                  for origin, size in sorted(size_by_origin.items())]
+        lines += ["", f"Top {self.top_allocations} allocation sites:"]
+        lines += [f"  {statistic}" for statistic in allocations[:self.top_allocations]]
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            stats.dump_stats(f"{file_path}.pstats")
+
+            with open(f"{file_path}.txt", "w", encoding="utf-8") as file:
+                file.write("\n".join(lines) + "\n")
+        except OSError as e:
+            LOG.error("The profile of %s could not be written: %s", handler_name, e)
+        else:
+            LOG.info("Profile of %s written to %s.pstats", handler_name, file_path)
+
+################################################################################
+# Functions
+################################################################################
+
+
+def set_profiler(profiler: Optional[HandlerProfiler]) -> None:
+    """
+    Set the profiler used by profile_handler().
+
+    Args:
+        profiler (Optional[HandlerProfiler]): The profiler, None to disable.
+    """
+    global _active  # pylint: disable=global-statement
+    _active = profiler
+
+
+@contextlib.contextmanager
+def profile_handler(adapter_file: str, handler_name: str) -> Iterator[None]:
+    """
+    Profile a handler call, if a profiler is set.
+
+    Args:
+        adapter_file (str): The adapter file.
+        handler_name (str): The name of the handler, e.g. "handle_jira".
+
+    Yields:
+        None
+    """
+    profiler = _active
+
+    if profiler is None:
+        yield
+    else:
+        with profiler.profile(adapter_file, handler_name):
+            yield
+
+
+def _get_file_name(adapter_file: str, handler_name: str) -> str:
+    """
+    Get the base name of the profile files of a handler. A hash of the
+    adapter path tells apart adapters with the same file name.
+
+    Args:
+        adapter_file (str): The adapter file.
+        handler_name (str): The name of the handler.
+
+    Returns:
+        str: The file name without extension.
+    """
+    stem = os.path.splitext(os.path.basename(adapter_file))[0]
+    stem = re.sub(r"[^A-Za-z0-9_.-]", "_", stem)
+    path_hash = hashlib.sha256(adapter_file.encode("utf-8")).hexdigest()[:8]
+
+    return f"{stem}_{path_hash}_{handler_name}"
+
+
+def _get_origin(file_name: str, adapter_file: str) -> str:
+    """
+    Get the origin of a function or allocation site.
+
+    Args:
+        file_name (str): The source file of the function, "~" for built-in functions.
+        adapter_file (str): The adapter file.
+
+    Returns:
+        str: "adapter", "pyMetricCli" or "other".
+    """
+    file_name = os.path.normcase(os.path.abspath(file_name)) if file_name != "~" else file_name
+
+    if file_name == os.path.normcase(os.path.abspath(adapter_file)):
+        origin = "adapter"
+    elif file_name.startswith(_PACKAGE_DIR + os.sep):
+        origin = "pyMetricCli"
+    else:
+        origin = "other"
+
+    return origin
+
+
+def _get_cost_by_origin(stats: pstats.Stats, allocations: list, adapter_file: str) -> tuple:
+    """
+    Sum up the own time of the functions and the allocated memory by origin,
+    see _get_origin().
+
+    Args:
+        stats (pstats.Stats): The profile of a handler call.
+        allocations (list): The allocation statistics of the call.
+        adapter_file (str): The adapter file.
+
+    Returns:
+        tuple: The time in seconds and the memory in bytes, each as dictionary by origin.
+    """
+    time_by_origin = {}
+    size_by_origin = {}
+
+    # pylint: disable=no-member
+    for (file_name, _, _), (_, _, own_time, _, _) in stats.stats.items():
+        origin = _get_origin(file_name, adapter_file)
+        time_by_origin[origin] = time_by_origin.get(origin, 0.0) + own_time
+
+    for statistic in allocations:
+        origin = _get_origin(statistic.traceback[0].filename, adapter_file)
+        # Of a StatisticDiff only the growth during the call is attributed.
+        size = getattr(statistic, "size_diff", statistic.size)
+        size_by_origin[origin] = size_by_origin.get(origin, 0) + size
+
+    return time_by_origin, size_by_origin
+
+
+def _get_allocations(snapshot: tracemalloc.Snapshot,
+                     snapshot_before: Optional[tracemalloc.Snapshot]) -> list:
+    """
+    Get the allocations of a handler call by source line, largest first.
+
+    Args:
+        snapshot (tracemalloc.Snapshot): The snapshot after the call.
+        snapshot_before (Optional[tracemalloc.Snapshot]): The snapshot before the call,
+            None if tracing was started for the call.
+
+    Returns:
+        list: The tracemalloc statistics, StatisticDiff if snapshot_before is given.
+    """
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+               tracemalloc.Filter(False, __file__)]
+    snapshot = snapshot.filter_traces(filters)
+
+    if snapshot_before is not None:
+        allocations = [statistic for statistic in
+                       snapshot.compare_to(snapshot_before.filter_traces(filters), "lineno")
+                       if statistic.size_diff > 0]
+    else:
+        allocations = snapshot.statistics("lineno")
+
+    return allocations
+
+################################################################################
+# Main
+################################################################################
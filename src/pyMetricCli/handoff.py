@@ -0,0 +1,177 @@
+"""
+Hand-off of files between pyMetricCli and the tools without disk I/O.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import shutil
+import logging
+import tempfile
+from typing import Optional
+
+from pyMetricCli.serializer import dump_file, load_file
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# The file is kept in an anonymous memory file (Linux), else like HANDOFF_TMPFS.
+HANDOFF_MEMORY = "memory"
+
+# The file is kept in a temporary directory in the tmpfs, else like HANDOFF_FILE.
+HANDOFF_TMPFS = "tmpfs"
+
+# The file is kept at its given path.
+HANDOFF_FILE = "file"
+
+# Directory of the tmpfs, which is kept in memory.
+_TMPFS_DIR = "/dev/shm"
+
+# Directory of the paths of the file descriptors of this process.
+_PROC_FD_DIR = "/proc/self/fd"
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Handoff:
+    """
+    A file or directory through which a tool receives its input or hands
+    over its results. Depending on the mode, it is kept in memory instead of
+    the given path, which may be on a network file system:
+    - "memory": An anonymous memory file, passed to the tool as inherited
+      file descriptor with its path /proc/self/fd/<fd>. Requires Linux and
+      a tool which opens this path like a regular file, else "tmpfs" is
+      used. Directories always use "tmpfs".
+    - "tmpfs": A temporary directory in /dev/shm, else "file" is used.
+    - "file" (default): The given path.
+    The file or directory is removed when the hand-off is closed, except in
+    "file" mode.
+    """
+
+    def __init__(self, path: str, mode: Optional[str] = None, is_directory: bool = False) -> None:
+        """
+        Initializes the hand-off.
+
+        Args:
+            path (str): The path of the file or directory on disk.
+            mode (Optional[str]): "memory", "tmpfs" or "file". Defaults to "file".
+            is_directory (bool): True if the tool writes to a directory, False for a file.
+        """
+        if mode is None:
+            mode = HANDOFF_FILE
+        elif mode not in (HANDOFF_MEMORY, HANDOFF_TMPFS, HANDOFF_FILE):
+            LOG.warning("Unknown hand-off '%s', using '%s'.", mode, HANDOFF_FILE)
+            mode = HANDOFF_FILE
+
+        self.path = path
+        self.pass_fds: tuple = ()
+        self._fd: Optional[int] = None
+        self._temp_dir: Optional[str] = None
+
+        if (mode == HANDOFF_MEMORY) and (is_directory is False) and (_is_memfd_available()):
+            try:
+                self._fd = os.memfd_create(os.path.basename(path))
+            except OSError as e:
+                LOG.warning("No memory file available, using %s: %s", _TMPFS_DIR, e)
+
+        if self._fd is not None:
+            self.path = os.path.join(_PROC_FD_DIR, str(self._fd))
+            self.pass_fds = (self._fd,)
+        elif (mode in (HANDOFF_MEMORY, HANDOFF_TMPFS)) and (os.path.isdir(_TMPFS_DIR)):
+            try:
+                self._temp_dir = tempfile.mkdtemp(prefix="pyMetricCli_", dir=_TMPFS_DIR)
+            except OSError as e:
+                LOG.warning("No temporary directory in %s, using %s: %s", _TMPFS_DIR, path, e)
+            else:
+                self.path = self._temp_dir if is_directory is True else \
+                    os.path.join(self._temp_dir, os.path.basename(path))
+
+    def __enter__(self) -> "Handoff":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def write_json(self, content) -> None:
+        """
+        Write content as compact JSON to the file.
+
+        Args:
+            content: The content, e.g. a dictionary.
+        """
+        dump_file(content, self.path)
+
+    def read_json(self):
+        """
+        Read the JSON content of the file.
+
+        Returns:
+            The content, e.g. a dictionary.
+        """
+        return load_file(self.path)
+
+    def close(self) -> None:
+        """
+        Release the memory file or remove the temporary directory.
+        """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+
+################################################################################
+# Functions
+################################################################################
+
+
+def _is_memfd_available() -> bool:
+    """
+    Check if anonymous memory files can be passed to the tools by path.
+
+    Returns:
+        bool: True on Linux, False otherwise.
+    """
+    return hasattr(os, "memfd_create") and os.path.isdir(_PROC_FD_DIR)
+
+################################################################################
+# Main
+################################################################################
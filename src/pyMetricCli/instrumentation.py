@@ -0,0 +1,332 @@
+"""
+Timing and resource instrumentation of the stages of a run.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import time
+import logging
+import datetime
+import threading
+import contextlib
+from typing import Iterator, Optional
+
+from pyMetricCli.serializer import dumps
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+_PROMETHEUS_PREFIX = "pymetriccli"
+
+# Values of a stage record which are exported as Prometheus metrics, with their help text.
+_PROMETHEUS_STAGE_METRICS = {
+    "wall": ("stage_wall_seconds", "Wall time of the stage."),
+    "cpu": ("stage_cpu_seconds", "CPU time of the thread running the stage."),
+    "subprocess_cpu": ("stage_subprocess_cpu_seconds",
+                       "CPU time of the tool processes finished during the stage."),
+    "bytes_read": ("stage_read_bytes", "Bytes read by the stage."),
+    "bytes_written": ("stage_written_bytes", "Bytes written or uploaded by the stage."),
+    "items": ("stage_items", "Issues or work items processed by the stage.")
+}
+
+# The instrumentation of the active run, None if disabled.
+_active: Optional["Instrumentation"] = None
+
+################################################################################
+# Classes
+################################################################################
+
+
+class StageRecord:  # pylint: disable=too-few-public-methods, too-many-instance-attributes
+    """
+    The measurements of a single stage, e.g. the Jira search of an adapter.
+    The counters can be set while the stage is running.
+    """
+
+    def __init__(self, stage: str, adapter: str) -> None:
+        """
+        Initializes the record.
+
+        Args:
+            stage (str): The name of the stage, e.g. "jira_search".
+            adapter (str): The adapter file, empty if the stage is shared by adapters.
+        """
+        self.stage = stage
+        self.adapter = adapter
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.subprocess_cpu = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.items: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        """
+        Get the record as dictionary.
+
+        Returns:
+            dict: The record, serializable to JSON.
+        """
+        return dict(vars(self))
+
+
+class Instrumentation:
+    """
+    Collects the stage records of a run. Activate it with activate(),
+    the stages are measured with measure().
+    """
+
+    def __init__(self) -> None:
+        self.started = datetime.datetime.now()
+        self.wall = 0.0
+        self.records: list = []
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, record: StageRecord) -> None:
+        """
+        Add the record of a finished stage.
+
+        Args:
+            record (StageRecord): The stage record.
+        """
+        with self._lock:
+            self.records.append(record)
+
+    def finish(self) -> None:
+        """
+        Finish the run, which sets its wall time.
+        """
+        self.wall = time.perf_counter() - self._start
+
+    def to_dict(self) -> dict:
+        """
+        Get the report of the run, with the records and their totals per stage.
+
+        Returns:
+            dict: The report, serializable to JSON.
+        """
+        totals = {}
+
+        with self._lock:
+            records = [record.to_dict() for record in self.records]
+
+        for record in records:
+            total = totals.setdefault(record["stage"], {"count": 0})
+            total["count"] += 1
+
+            for key in _PROMETHEUS_STAGE_METRICS:
+                if record[key] is not None:
+                    total[key] = total.get(key, 0) + record[key]
+
+        return {"started": self.started.isoformat(),
+                "wall": self.wall,
+                "stages": records,
+                "totals": totals}
+
+    def write_report(self, file_path: str) -> bool:
+        """
+        Write the report as JSON file.
+
+        Args:
+            file_path (str): Path to the report file.
+
+        Returns:
+            bool: True if the report was written, False otherwise.
+        """
+        return _write_file(file_path, dumps(self.to_dict(), pretty=True).decode("utf-8"))
+
+    def write_prometheus(self, file_path: str) -> bool:
+        """
+        Write the report in the Prometheus text format, e.g. for the
+        textfile collector of the node exporter. The file is replaced at
+        once, so the collector never reads a partial file.
+        Records of the same stage and adapter, e.g. several searches shared
+        by adapters, are summed up, as each label set must be unique.
+
+        Args:
+            file_path (str): Path to the metrics file, usually with extension ".prom".
+
+        Returns:
+            bool: True if the file was written, False otherwise.
+        """
+        lines = [f"# HELP {_PROMETHEUS_PREFIX}_run_wall_seconds Wall time of the run.",
+                 f"# TYPE {_PROMETHEUS_PREFIX}_run_wall_seconds gauge",
+                 f"{_PROMETHEUS_PREFIX}_run_wall_seconds {self.wall}",
+                 f"# HELP {_PROMETHEUS_PREFIX}_run_timestamp_seconds Start time of the run.",
+                 f"# TYPE {_PROMETHEUS_PREFIX}_run_timestamp_seconds gauge",
+                 f"{_PROMETHEUS_PREFIX}_run_timestamp_seconds {self.started.timestamp()}"]
+        samples = {}
+
+        for record in self.to_dict()["stages"]:
+            labels = f'stage="{_escape_label(record["stage"])}",' \
+                f'adapter="{_escape_label(record["adapter"])}"'
+            sample = samples.setdefault(labels, {})
+
+            for key in _PROMETHEUS_STAGE_METRICS:
+                if record[key] is not None:
+                    sample[key] = sample.get(key, 0) + record[key]
+
+        for key, (name, help_text) in _PROMETHEUS_STAGE_METRICS.items():
+            lines.append(f"# HELP {_PROMETHEUS_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {_PROMETHEUS_PREFIX}_{name} gauge")
+
+            for labels, sample in samples.items():
+                if key in sample:
+                    lines.append(f"{_PROMETHEUS_PREFIX}_{name}{{{labels}}} {sample[key]}")
+
+        return _write_file(file_path, "\n".join(lines) + "\n")
+
+################################################################################
+# Functions
+################################################################################
+
+
+def activate(instrumentation: Optional[Instrumentation]) -> None:
+    """
+    Set the instrumentation which records the stages measured with measure().
+
+    Args:
+        instrumentation (Optional[Instrumentation]): The instrumentation, None to disable.
+    """
+    global _active  # pylint: disable=global-statement
+    _active = instrumentation
+
+
+def _get_subprocess_cpu() -> float:
+    """
+    Get the CPU time of all finished child processes.
+
+    Returns:
+        float: The CPU time in seconds. Always 0 on Windows.
+    """
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+@contextlib.contextmanager
+def measure(stage: str, adapter: str = "") -> Iterator[StageRecord]:
+    """
+    Measure a stage, if an instrumentation is active.
+    The counters of the yielded record can be set within the stage.
+
+    Args:
+        stage (str): The name of the stage, e.g. "jira_search".
+        adapter (str): The adapter file, empty if the stage is shared by adapters.
+
+    Yields:
+        StageRecord: The record of the stage.
+    """
+    instrumentation = _active
+    record = StageRecord(stage, adapter)
+
+    if instrumentation is None:
+        yield record
+    else:
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        start_subprocess_cpu = _get_subprocess_cpu()
+
+        try:
+            yield record
+        finally:
+            record.wall = time.perf_counter() - start_wall
+            record.cpu = time.thread_time() - start_cpu
+            record.subprocess_cpu = _get_subprocess_cpu() - start_subprocess_cpu
+            instrumentation.add(record)
+
+
+def get_file_size(file_path: str) -> int:
+    """
+    Get the size of a file.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        int: The size in bytes, 0 if the file does not exist.
+    """
+    try:
+        size = os.path.getsize(file_path)
+    except OSError:
+        size = 0
+
+    return size
+
+
+def _escape_label(value: str) -> str:
+    """
+    Escape a label value for the Prometheus text format.
+
+    Args:
+        value (str): The label value.
+
+    Returns:
+        str: The escaped label value.
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _write_file(file_path: str, content: str) -> bool:
+    """
+    Write a file at once, by writing a temporary file and replacing the file.
+
+    Args:
+        file_path (str): Path to the file.
+        content (str): The content of the file.
+
+    Returns:
+        bool: True if the file was written, False otherwise.
+    """
+    is_written = True
+    temp_file_path = f"{file_path}.{os.getpid()}.tmp"
+
+    try:
+        with open(temp_file_path, "w", encoding="utf-8") as file:
+            file.write(content)
+
+        os.replace(temp_file_path, file_path)
+    except OSError as e:
+        LOG.error("The file %s could not be written: %s", file_path, e)
+        is_written = False
+
+    return is_written
+
+################################################################################
+# Main
+################################################################################
@@ -35,9 +35,23 @@ Wrapper for the pyJiraCli Tool.
 # Imports
 ################################################################################
 
+import os
+import re
+import datetime
 import subprocess
-import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from pyProfileMgr.profile_data import ProfileType
+
+from pyMetricCli.backend import get_backend
+from pyMetricCli.credentials import resolve_credentials
+from pyMetricCli.handoff import Handoff
+from pyMetricCli.json_stream import SearchResultFile
+from pyMetricCli.result_cache import ResultCache
+from pyMetricCli.snapshot_store import SnapshotStore, to_utc_timestamp
+from pyMetricCli.tools import is_tool_installed, get_field_arguments
 
 ################################################################################
 # Variables
@@ -45,6 +59,20 @@ import logging
 
 LOG: logging.Logger = logging.getLogger(__name__)
 
+# Key of the issue list in the search results of pyJiraCli.
+ISSUES_KEY = "issues"
+
+# Default seconds between two full searches in incremental mode.
+_DEFAULT_FULL_SYNC_INTERVAL = 24 * 60 * 60
+
+# Minutes subtracted from the watermark, to cover clock differences to the server.
+_WATERMARK_OVERLAP_MINUTES = 5
+
+_ORDER_BY_PATTERN = re.compile(r"\s*\border\s+by\b", re.IGNORECASE)
+
+# Format of the dates of the created ranges in JQL.
+_JQL_DATE_FORMAT = "%Y-%m-%d"
+
 ################################################################################
 # Classes
 ################################################################################
@@ -55,61 +83,313 @@ class Jira:  # pylint: disable=too-few-public-methods
     Wrapper for the pyJiraCli Tool.
     """
 
-    def __init__(self, jira_config: dict) -> None:
+    def __init__(self, jira_config: dict, result_cache: Optional[ResultCache] = None) -> None:
         self.config = jira_config
+        self._result_cache = result_cache
+        # True if the results of the last search were taken from the result cache.
+        self.is_cached = False
+        self._backend = get_backend(self.config)
         self.is_installed = self.__check_if_is_installed()
 
-    def __run_pyjiracli(self, arguments) -> subprocess.CompletedProcess:
+    def __run_pyjiracli(self, arguments, pass_fds: tuple = ()) -> subprocess.CompletedProcess:
         """
-        Wrapper to run pyJiraCli command line.
+        Wrapper to run pyJiraCli with the backend selected in the configuration.
 
         Args:
             arguments (list): List of arguments to pass to pyJiraCli.
+            pass_fds (tuple): File descriptors inherited by pyJiraCli.
 
         Returns:
             subprocess.CompletedProcess[bytes]: The result of the command.
             Includes return code, stdout and stderr.
         """
-        # pylint: disable=duplicate-code
-        args = ["pyJiraCli"]  # The executable to run.
-        args.extend(arguments)  # Add the arguments to the command.
-        return subprocess.run(args, capture_output=True, check=False, shell=False)
+        return self._backend.run("pyJiraCli", arguments, pass_fds)
 
     def __check_if_is_installed(self) -> bool:
         """
         Checks if the pyJiraCli Tool is installed.
+        Uses the cached tool detection instead of running the tool.
 
         Returns:
             bool: True if pyJiraCli is installed, False otherwise.
         """
-        is_installed = True
-        try:
-            ret = self.__run_pyjiracli(["--help"])
-            ret.check_returncode()
-        except subprocess.CalledProcessError:
+        is_installed = is_tool_installed("pyJiraCli")
+        if is_installed is False:
             print("pyJiraCli is not installed!")
-            is_installed = False
         return is_installed
 
+    def _get_cache_key(self) -> str:
+        """
+        Get the key of the search in the result cache.
+
+        Returns:
+            str: The cache key.
+        """
+        return ResultCache.make_key(tool="jira",
+                                    server=self.config.get("profile", self.config.get("server")),
+                                    filter=self.config["filter"],
+                                    fields=sorted(self.config["fields"]),
+                                    max=str(self.config["max"]))
+
     def search(self) -> dict:
         """
         Search in Jira using the search command of pyJiraCli.
+        If a result cache is available, a valid cached result is used instead.
+        The time to live can be set by "cache_ttl" in the 'jira_config'.
+        If "incremental" is set in the 'jira_config', only the issues updated
+        since the last search are fetched, see __search_incremental().
 
         Returns:
             dict: Search results.
         """
+        output = None
+        cache_key = None
+
+        if self._result_cache is not None:
+            cache_key = self._get_cache_key()
+            output = self._result_cache.get(cache_key, self.config.get("cache_ttl"))
+
+        self.is_cached = output is not None
+
+        if output is None:
+            if self.config.get("incremental") is True:
+                output = self.__search_incremental()
+            elif self.__is_partitioned() is True:
+                output = self.__search_partitioned()
+            else:
+                output = self.__search_pyjiracli(self.config["filter"], self.config["max"])
+
+            # Only successful searches are cached.
+            if (cache_key is not None) and output:
+                self._result_cache.put(cache_key, output)
+
+        return output
+
+    def search_stream(self):
+        """
+        Search in Jira like search(), but keep the results in their file,
+        so they can be read issue by issue, see SearchResultFile.
+        A valid cached result is used if available, but streamed results are
+        not cached, as this would require to load them completely.
+        Incremental and partitioned searches always return the complete results.
+
+        Returns:
+            dict or SearchResultFile: Search results. Empty dict on error.
+        """
+        output = None
+
+        if self._result_cache is not None:
+            output = self._result_cache.get(self._get_cache_key(), self.config.get("cache_ttl"))
+
+        self.is_cached = output is not None
+
+        if output is None:
+            if (self.config.get("incremental") is True) or (self.__is_partitioned() is True):
+                output = self.search()
+            elif self.__run_search(self.config["filter"], self.config["max"]) is True:
+                output = SearchResultFile(self.config["file"], ISSUES_KEY)
+            else:
+                output = {}
+
+        return output
+
+    def _get_snapshot_key(self) -> str:
+        """
+        Get the key of the search in the snapshot store.
+        In contrast to the cache key, it does not depend on the maximum number of results.
+
+        Returns:
+            str: The snapshot key.
+        """
+        return ResultCache.make_key(tool="jira",
+                                    server=self.config.get("profile", self.config.get("server")),
+                                    filter=self.config["filter"],
+                                    fields=sorted(self.config["fields"]))
+
+    def __search_incremental(self) -> dict:
+        """
+        Search only the issues updated since the last search and merge
+        them into the local snapshot of all issues.
+        A full search is done if there is no snapshot yet and every
+        "full_sync_interval" seconds (default: one day, 0 for never).
+        Only the full search removes deleted issues or issues which no
+        longer match the filter.
+
+        Returns:
+            dict: Search results with all issues of the snapshot.
+        """
+        output = {}
+
+        if str(self.config["max"]) != "0":
+            LOG.warning("Incremental search requires 'max' 0, searching all issues.")
+
+        store = SnapshotStore(self._get_snapshot_key(), _get_issue_key, _get_issue_updated)
+        store.load()
+
+        is_full = store.is_full_sync_due(self.config.get("full_sync_interval",
+                                                         _DEFAULT_FULL_SYNC_INTERVAL))
+        jql_filter = self.config["filter"]
+
+        if is_full is False:
+            jql_filter = _add_jql_condition(jql_filter,
+                                            _get_updated_since_condition(store.watermark))
+
+        LOG.info("Incremental Jira search (full: %s): %s", is_full, jql_filter)
+
+        results = self.__search_pyjiracli(jql_filter, "0", ["updated"])
+
+        if results:
+            output = store.merge(results, ISSUES_KEY, is_full)
+
+        return output
+
+    def __is_partitioned(self) -> bool:
+        """
+        Check if the search is split into partitions, see __search_partitioned().
+
+        Returns:
+            bool: True if "partitions" is greater than 1, all issues are searched
+                and the order of the filter can be kept.
+        """
+        is_partitioned = False
+
+        if int(self.config.get("partitions", 1)) > 1:
+            if str(self.config["max"]) != "0":
+                LOG.warning("Partitioned search requires 'max' 0, searching in one go.")
+            elif _get_created_order(self.config["filter"]) is None:
+                LOG.warning("Partitioned search can only keep an ORDER BY created, "
+                            "searching in one go.")
+            else:
+                is_partitioned = True
+
+        return is_partitioned
+
+    def __search_partitioned(self) -> dict:
+        """
+        Search all issues in disjoint partitions by their creation date,
+        fetched concurrently by "partitions" pyJiraCli processes.
+        Two searches for the oldest and the newest issue determine the range
+        of the creation dates, which is split into ranges of equal length.
+        The first range has no lower and the last range no upper bound, so
+        each issue is in exactly one partition, regardless of the time zone.
+        The issues of the partitions are merged in the order of the ranges,
+        oldest first, or newest first if the filter is ordered by "created DESC".
+        Within a partition the order of the filter applies.
+
+        Returns:
+            dict: Search results with the issues of all partitions. Empty dict on error.
+        """
+        output = {}
+        partition_count = int(self.config["partitions"])
+
+        with ThreadPoolExecutor(max_workers=partition_count,
+                                thread_name_prefix="jira_partition") as executor:
+            probes = [executor.submit(self.__search_pyjiracli,
+                                      _set_jql_order(self.config["filter"], f"created {order}"),
+                                      1, ["created"],
+                                      _get_partition_file(self.config["file"], order.lower()))
+                      for order in ("ASC", "DESC")]
+            oldest_issues, newest_issues = [probe.result().get(ISSUES_KEY, [])
+                                            for probe in probes]
+
+            if (len(oldest_issues) == 0) or (len(newest_issues) == 0):
+                output = probes[0].result()
+            else:
+                conditions = _get_created_conditions(_get_issue_created(oldest_issues[0]),
+                                                     _get_issue_created(newest_issues[0]),
+                                                     partition_count)
+
+                LOG.info("Searching %s issues in Jira in %d partitions.",
+                         probes[0].result().get("total", "all"), len(conditions))
+
+                futures = [executor.submit(self.__search_pyjiracli,
+                                           _add_jql_condition(self.config["filter"], condition),
+                                           "0", None,
+                                           _get_partition_file(self.config["file"], str(index)))
+                           for index, condition in enumerate(conditions)]
+                partitions = [future.result() for future in futures]
+
+                if _get_created_order(self.config["filter"]) == "DESC":
+                    partitions.reverse()
+
+                if all(partitions):
+                    output = _merge_partitions(partitions)
+
+        return output
+
+    def __search_pyjiracli(self,
+                           jql_filter: str,
+                           max_results,
+                           extra_fields: list = None,
+                           file_path: Optional[str] = None) -> dict:
+        """
+        Run the search command of pyJiraCli and load its results.
+        The results are handed over as set by "handoff" in the 'jira_config',
+        by default in the given file, see Handoff.
 
+        Args:
+            jql_filter (str): The JQL filter of the search.
+            max_results: Maximum number of issues, 0 for all.
+            extra_fields (list): Fields to add if the fields are restricted.
+            file_path (Optional[str]): The result file, defaults to the file
+                given in the 'jira_config'.
+
+        Returns:
+            dict: Search results.
+        """
         output = {}
+
+        if file_path is None:
+            file_path = self.config["file"]
+
+        with Handoff(file_path, self.config.get("handoff")) as handoff:
+            if self.__run_search(jql_filter, max_results, extra_fields, handoff) is True:
+
+                try:
+                    output = handoff.read_json()
+                except Exception as e:  # pylint: disable=broad-except
+                    LOG.error("An error occurred loading the Jira results from file: %s", e)
+
+        return output
+
+    def __run_search(self,
+                     jql_filter: str,
+                     max_results,
+                     extra_fields: list = None,
+                     handoff: Optional[Handoff] = None) -> bool:
+        """
+        Run the search command of pyJiraCli, which writes the results to the
+        given file.
+
+        Args:
+            jql_filter (str): The JQL filter of the search.
+            max_results: Maximum number of issues, 0 for all.
+            extra_fields (list): Fields to add if the fields are restricted.
+            handoff (Optional[Handoff]): The result file, defaults to the file
+                given in the 'jira_config'.
+
+        Returns:
+            bool: True if the search was successful, False otherwise.
+        """
+        is_successful = False
+
+        # Check the profile if a profile name has been given in the 'jira_config'.
+        if ("profile" in self.config) and \
+                (resolve_credentials(self.config, ProfileType.JIRA) is None):
+            return is_successful
+
         command_list: list = [
             "search",
-            self.config["filter"],
+            jql_filter,
             "--file",
-            self.config["file"],
+            self.config["file"] if handoff is None else handoff.path,
             "--max",
-            self.config["max"],
+            str(max_results),
         ]
 
         # Append profile arg if profile is set in the 'jira_config'.
+        # The token of the profile is not passed, as it would be visible
+        # in the process list.
         if "profile" in self.config:
             command_list += [
                 "--profile",
@@ -124,30 +404,243 @@ class Jira:  # pylint: disable=too-few-public-methods
                 self.config["token"],
             ]
 
-        for field in self.config["fields"]:
-            command_list.append("--field")
-            command_list.append(field)
+        command_list += get_field_arguments(self.config["fields"], extra_fields)
 
-        ret = self.__run_pyjiracli(command_list)
+        ret = self.__run_pyjiracli(command_list, () if handoff is None else handoff.pass_fds)
 
         if 0 != ret.returncode:
             print("Error while running pyJiraCli!")
             print(ret.stderr)
         else:
+            is_successful = True
 
-            try:
-                with open(self.config["file"], "r", encoding="utf-8") as file:
-                    output = json.load(file)
-            except Exception as e:  # pylint: disable=broad-except
-                LOG.error("An error occurred loading the Jira results from file: %s", e)
-
-        return output
+        return is_successful
 
 
 ################################################################################
 # Functions
 ################################################################################
 
+
+def _add_jql_condition(jql_filter: str, condition: str) -> str:
+    """
+    Restrict a JQL filter by an additional condition.
+    An ORDER BY clause of the filter is kept at the end.
+
+    Args:
+        jql_filter (str): The JQL filter.
+        condition (str): The JQL condition, e.g. 'updated >= -60m'.
+
+    Returns:
+        str: The restricted JQL filter.
+    """
+    order_by = ""
+    match = _ORDER_BY_PATTERN.search(jql_filter)
+
+    if match is not None:
+        order_by = " " + jql_filter[match.start():].strip()
+        jql_filter = jql_filter[:match.start()]
+
+    if jql_filter.strip() == "":
+        restricted_filter = f"{condition}{order_by}"
+    else:
+        restricted_filter = f"({jql_filter}) AND {condition}{order_by}"
+
+    return restricted_filter
+
+
+def _set_jql_order(jql_filter: str, order_by: str) -> str:
+    """
+    Replace the ORDER BY clause of a JQL filter.
+
+    Args:
+        jql_filter (str): The JQL filter.
+        order_by (str): The new order, e.g. 'created ASC'.
+
+    Returns:
+        str: The JQL filter with the new order.
+    """
+    match = _ORDER_BY_PATTERN.search(jql_filter)
+
+    if match is not None:
+        jql_filter = jql_filter[:match.start()]
+
+    return f"{jql_filter.strip()} ORDER BY {order_by}".strip()
+
+
+def _get_created_order(jql_filter: str) -> Optional[str]:
+    """
+    Get the order of the creation date of the issues found by a JQL filter,
+    which the partitions of a search must be merged in to keep the order of the filter.
+
+    Args:
+        jql_filter (str): The JQL filter.
+
+    Returns:
+        Optional[str]: "ASC" if the filter has no ORDER BY clause or is ordered
+            by "created" first, "DESC" if by "created DESC" first, None if it
+            is ordered by another field first.
+    """
+    order = "ASC"
+    match = _ORDER_BY_PATTERN.search(jql_filter)
+
+    if match is not None:
+        first_key = jql_filter[match.end():].split(",")[0].split()
+
+        if (len(first_key) == 0) or (first_key[0].lower() != "created"):
+            order = None
+        elif (len(first_key) > 1) and (first_key[1].upper() == "DESC"):
+            order = "DESC"
+
+    return order
+
+
+def _get_created_conditions(oldest: Optional[datetime.date],
+                            newest: Optional[datetime.date],
+                            count: int) -> list:
+    """
+    Get the JQL conditions of disjoint ranges of the creation date, which
+    together cover all issues. The ranges from the oldest to the newest
+    date have equal length, at least one day.
+
+    Args:
+        oldest (Optional[datetime.date]): Creation date of the oldest issue.
+        newest (Optional[datetime.date]): Creation date of the newest issue.
+        count (int): The number of ranges. A single range is used if a date is not known.
+
+    Returns:
+        list: The JQL conditions, oldest range first.
+    """
+    boundaries = []
+
+    if (oldest is not None) and (newest is not None):
+        days = (newest - oldest).days + 1
+
+        for index in range(1, count):
+            boundary = oldest + datetime.timedelta(days=days * index // count)
+
+            if (boundary > oldest) and (boundary not in boundaries):
+                boundaries.append(boundary)
+
+    dates = [f'"{boundary.strftime(_JQL_DATE_FORMAT)}"' for boundary in boundaries]
+    conditions = [f"created < {dates[0]}"] if len(dates) > 0 else ["created IS NOT EMPTY"]
+    conditions += [f"created >= {start} AND created < {end}"
+                   for start, end in zip(dates[:-1], dates[1:])]
+
+    if len(dates) > 0:
+        conditions.append(f"created >= {dates[-1]}")
+
+    return conditions
+
+
+def _get_partition_file(file_path: str, name: str) -> str:
+    """
+    Get the result file of a partition of a search.
+
+    Args:
+        file_path (str): The result file of the search.
+        name (str): The name of the partition, e.g. its index.
+
+    Returns:
+        str: The result file of the partition.
+    """
+    root, extension = os.path.splitext(file_path)
+
+    return f"{root}_partition_{name}{extension}"
+
+
+def _merge_partitions(partitions: list) -> dict:
+    """
+    Merge the search results of the partitions of a search, in their order.
+
+    Args:
+        partitions (list): The search results of each partition.
+
+    Returns:
+        dict: The search results of the first partition with the issues of
+            all partitions. The total is the sum of the totals.
+    """
+    output = partitions[0]
+    issues = output.setdefault(ISSUES_KEY, [])
+
+    for partition in partitions[1:]:
+        issues.extend(partition.get(ISSUES_KEY, []))
+
+    if all(isinstance(partition.get("total"), int) for partition in partitions):
+        output["total"] = sum(partition["total"] for partition in partitions)
+
+    return output
+
+
+def _get_updated_since_condition(watermark: str) -> str:
+    """
+    Get the JQL condition for issues updated since the watermark.
+    A relative time is used, because JQL interprets absolute dates in the
+    time zone of the user, which is not known here.
+
+    Args:
+        watermark (str): The UTC timestamp of the last update, see to_utc_timestamp().
+
+    Returns:
+        str: The JQL condition.
+    """
+    watermark_time = datetime.datetime.fromisoformat(watermark)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    minutes = int((now - watermark_time).total_seconds() // 60) + _WATERMARK_OVERLAP_MINUTES
+
+    return f"updated >= -{max(minutes, _WATERMARK_OVERLAP_MINUTES)}m"
+
+
+def _get_issue_key(issue: dict) -> str:
+    """
+    Get the unique key of an issue, e.g. "PROJ-1".
+
+    Args:
+        issue (dict): The issue of the search results.
+
+    Returns:
+        str: The issue key.
+    """
+    return str(issue.get("key", issue.get("id")))
+
+
+def _get_issue_created(issue: dict) -> Optional[datetime.date]:
+    """
+    Get the creation date of an issue.
+
+    Args:
+        issue (dict): The issue of the search results.
+
+    Returns:
+        Optional[datetime.date]: The UTC date or None if not available.
+    """
+    fields = issue.get("fields", issue)
+
+    if not isinstance(fields, dict):
+        fields = issue
+
+    created = to_utc_timestamp(fields.get("created"))
+
+    return None if created is None else datetime.datetime.fromisoformat(created).date()
+
+
+def _get_issue_updated(issue: dict) -> Optional[str]:
+    """
+    Get the time of the last update of an issue.
+
+    Args:
+        issue (dict): The issue of the search results.
+
+    Returns:
+        Optional[str]: The UTC timestamp or None if not available.
+    """
+    fields = issue.get("fields", issue)
+
+    if not isinstance(fields, dict):
+        fields = issue
+
+    return to_utc_timestamp(fields.get("updated"))
+
 ################################################################################
 # Main
 ################################################################################
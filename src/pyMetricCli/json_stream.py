@@ -0,0 +1,149 @@
+"""
+Incremental reading of the search result files of pyJiraCli and pyPolarionCli.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import logging
+from typing import Iterator
+
+from pyMetricCli.snapshot_store import find_items_key
+from pyMetricCli.serializer import load_file
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+################################################################################
+# Classes
+################################################################################
+
+
+class SearchResultFile:
+    """
+    Search results which stay in their file until they are read.
+    The items can be read one by one, so the memory usage does not depend
+    on the number of items. This requires the optional ijson package,
+    otherwise the whole file is loaded at once.
+    """
+
+    def __init__(self, file_path: str, items_key: str) -> None:
+        """
+        Initializes the search result file.
+
+        Args:
+            file_path (str): Path to the JSON file with the search results.
+            items_key (str): Key of the item list in the search results.
+        """
+        self.file_path = file_path
+        self.items_key = items_key
+
+    def load(self) -> dict:
+        """
+        Load the complete search results.
+
+        Returns:
+            dict: Search results. Empty if the file could not be read.
+        """
+        results = {}
+
+        try:
+            results = load_file(self.file_path)
+        except Exception as e:  # pylint: disable=broad-except
+            LOG.error("An error occurred loading the search results from file: %s", e)
+
+        return results
+
+    def iter_items(self) -> Iterator[dict]:
+        """
+        Read the items of the search results one by one.
+        With ijson the item list must be stored under the items key.
+
+        Yields:
+            dict: The next item.
+        """
+        if ijson is None:
+            results = self.load()
+            yield from results.get(find_items_key(results, self.items_key), [])
+        else:
+            with open(self.file_path, "rb") as file:
+                yield from ijson.items(file, f"{self.items_key}.item", use_float=True)
+
+################################################################################
+# Functions
+################################################################################
+
+
+def iter_result_items(results, items_key: str) -> Iterator[dict]:
+    """
+    Read the items of search results, which are either loaded or still in their file.
+
+    Args:
+        results (dict or SearchResultFile): The search results.
+        items_key (str): Expected key of the item list in the search results.
+
+    Yields:
+        dict: The next item.
+    """
+    if isinstance(results, SearchResultFile):
+        yield from results.iter_items()
+    else:
+        yield from results.get(find_items_key(results, items_key), [])
+
+
+def load_results(results) -> dict:
+    """
+    Get search results, which are either loaded or still in their file, as dictionary.
+
+    Args:
+        results (dict or SearchResultFile): The search results.
+
+    Returns:
+        dict: The search results.
+    """
+    if isinstance(results, SearchResultFile):
+        results = results.load()
+
+    return results
+
+################################################################################
+# Main
+################################################################################
@@ -0,0 +1,530 @@
+"""
+Local outbox which collects the output rows of many runs and adapters
+and uploads them to Superset when a threshold is reached.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import time
+import uuid
+import logging
+import threading
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+from pyMetricCli.paths import get_cache_dir, make_private_dir
+from pyMetricCli.handoff import Handoff
+from pyMetricCli.result_cache import ResultCache
+from pyMetricCli.serializer import dumps, loads
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# Default number of rows of a group which triggers an upload.
+DEFAULT_MAX_ROWS = 100
+
+# Default age in seconds of the oldest row of a group which triggers an upload.
+DEFAULT_MAX_AGE = 60 * 60
+
+_OUTBOX_SUB_DIR_NAME = "outbox"
+_ROWS_FILE_EXTENSION = ".jsonl"
+_LOCK_FILE_EXTENSION = ".lock"
+_CLAIMED_FILE_EXTENSION = ".flushing"
+
+# Seconds between attempts to get a lock on platforms without blocking locks.
+_LOCK_RETRY_INTERVAL = 0.05
+
+################################################################################
+# Classes
+################################################################################
+
+
+class _FileLock:
+    """
+    Exclusive lock on a file, shared by all threads and processes.
+    The lock is released when it is released explicitly or the process ends,
+    also if it ends unexpectedly.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes the lock. The file is created when the lock is acquired.
+
+        Args:
+            path (str): Path to the locked file.
+        """
+        self.path = path
+        self._file = None
+
+    def __enter__(self) -> "_FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """
+        Acquire the lock.
+
+        Args:
+            blocking (bool): True to wait for the lock, False to give up if it is held.
+
+        Returns:
+            bool: True if the lock was acquired, False otherwise.
+        """
+        self._file = open(self.path, "a+b")  # pylint: disable=consider-using-with
+
+        try:
+            _lock_file(self._file.fileno(), blocking)
+        except OSError:
+            self._file.close()
+            self._file = None
+
+            if blocking is True:
+                raise
+
+        return self._file is not None
+
+    def release(self) -> None:
+        """
+        Release the lock, if acquired.
+        """
+        if self._file is not None:
+            _unlock_file(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+
+class Outbox:
+    """
+    Collects output rows on disk, grouped by Superset server, database and table.
+    A group is uploaded, if it has reached the maximum number of rows or its
+    oldest row the maximum age. If the upload fails, the rows are kept for
+    the next attempt.
+    Only the rows are stored, never credentials. So a group can only be
+    uploaded with the Superset configuration of an adapter of the current run.
+
+    Several processes can use the same outbox. Each group has a lock file,
+    which is held while rows are added, claimed for an upload or put back.
+    Rows are claimed by renaming the rows file, so rows added during an
+    upload go to a new file. Claimed rows left by a process which ended
+    during an upload are put back by the next process checking the group,
+    so rows uploaded by that process before it ended may be uploaded again.
+    """
+
+    def __init__(self,
+                 directory: Optional[str] = None,
+                 max_rows: int = DEFAULT_MAX_ROWS,
+                 max_age: int = DEFAULT_MAX_AGE,
+                 flush_all: bool = False) -> None:
+        """
+        Initializes the outbox.
+
+        Args:
+            directory (Optional[str]): Directory of the outbox files.
+                Defaults to a sub directory of the pyMetricCli cache directory.
+            max_rows (int): Number of rows of a group which triggers an upload.
+            max_age (int): Age in seconds of the oldest row which triggers an upload.
+            flush_all (bool): If True, each group is uploaded regardless of the thresholds.
+        """
+        if directory is None:
+            directory = os.path.join(get_cache_dir(), _OUTBOX_SUB_DIR_NAME)
+
+        self.directory = directory
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self.flush_all = flush_all
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_group_key(superset_config: dict) -> str:
+        """
+        Get the key of the group the rows of a Superset configuration belong to.
+
+        Args:
+            superset_config (dict): The Superset configuration of an adapter.
+
+        Returns:
+            str: The group key.
+        """
+        return ResultCache.make_key(server=superset_config.get("profile",
+                                                               superset_config.get("server")),
+                                    database=str(superset_config["database"]),
+                                    table=superset_config["table"])
+
+    def _get_rows_path(self, group_key: str) -> str:
+        """
+        Get the path of the file storing the rows of a group.
+
+        Args:
+            group_key (str): The group key.
+
+        Returns:
+            str: Path to the rows file.
+        """
+        return os.path.join(self.directory, group_key + _ROWS_FILE_EXTENSION)
+
+    def _lock_group(self, group_key: str) -> _FileLock:
+        """
+        Get the lock of a group, which must be held to change its files.
+
+        Args:
+            group_key (str): The group key.
+
+        Returns:
+            _FileLock: The lock, not yet acquired.
+        """
+        make_private_dir(self.directory)
+
+        return _FileLock(self._get_rows_path(group_key) + _LOCK_FILE_EXTENSION)
+
+    def _recover_claimed_rows(self, group_key: str) -> None:
+        """
+        Put back the rows claimed by uploads whose process ended before
+        the upload finished. The lock of the group must be held.
+
+        Args:
+            group_key (str): The group key.
+        """
+        prefix = group_key + _ROWS_FILE_EXTENSION + "."
+
+        for file_name in sorted(os.listdir(self.directory)):
+            if file_name.startswith(prefix) and file_name.endswith(_CLAIMED_FILE_EXTENSION):
+                claimed_path = os.path.join(self.directory, file_name)
+                claim_lock = _FileLock(claimed_path)
+
+                # The claim of a running upload is locked by its process.
+                if claim_lock.acquire(blocking=False) is True:
+                    claim_lock.release()
+
+                    LOG.warning("Recovering the rows of an interrupted upload %s.", claimed_path)
+                    _restore_entries(self._get_rows_path(group_key), _read_entries(claimed_path))
+                    os.remove(claimed_path)
+
+    def add(self, superset_config: dict, row: dict) -> bool:
+        """
+        Add an output row to its group.
+
+        Args:
+            superset_config (dict): The Superset configuration of the adapter.
+            row (dict): The output row.
+
+        Returns:
+            bool: True if the row was stored, False otherwise.
+        """
+        is_added = True
+        group_key = self.get_group_key(superset_config)
+
+        try:
+            # The id identifies the row if it is put back after a failed upload.
+            line = dumps({"id": uuid.uuid4().hex,
+                          "queued": time.time(),
+                          "row": row}).decode("utf-8")
+
+            with self._lock, self._lock_group(group_key):
+                with open(self._get_rows_path(group_key), "a", encoding="utf-8") as file:
+                    file.write(line + "\n")
+        except (OSError, TypeError, ValueError) as e:
+            LOG.error("The row could not be added to the outbox: %s", e)
+            is_added = False
+
+        return is_added
+
+    def is_flush_due(self, group_key: str) -> bool:
+        """
+        Check if a group shall be uploaded.
+
+        Args:
+            group_key (str): The group key.
+
+        Returns:
+            bool: True if the group has rows and a threshold is reached
+                or all groups shall be uploaded, False otherwise.
+        """
+        is_due = False
+
+        try:
+            with self._lock, self._lock_group(group_key):
+                self._recover_claimed_rows(group_key)
+                entries = _read_entries(self._get_rows_path(group_key))
+        except OSError as e:
+            LOG.warning("The outbox could not be read: %s", e)
+            entries = []
+
+        if len(entries) > 0:
+            if (self.flush_all is True) or (len(entries) >= self.max_rows):
+                is_due = True
+            elif self.max_age <= (time.time() - min(entry.get("queued", 0)
+                                                    for entry in entries)):
+                is_due = True
+
+        return is_due
+
+    def _claim_entries(self, group_key: str, claim_lock: _FileLock) -> Optional[list]:
+        """
+        Claim all rows of a group for an upload by renaming its rows file.
+        The claim stays locked until it is released, see _recover_claimed_rows().
+
+        Args:
+            group_key (str): The group key.
+            claim_lock (_FileLock): The lock of the claimed rows file.
+
+        Returns:
+            Optional[list]: The claimed entries, None if there are none.
+        """
+        entries = None
+
+        with self._lock, self._lock_group(group_key):
+            self._recover_claimed_rows(group_key)
+
+            try:
+                # Rows added meanwhile, also by other processes, go to a new file.
+                os.replace(self._get_rows_path(group_key), claim_lock.path)
+            except FileNotFoundError:
+                return entries
+
+            entries = _read_entries(claim_lock.path)
+            claim_lock.acquire()
+
+        return entries
+
+    def flush(self,  # pylint: disable=too-many-arguments
+              group_key: str,
+              upload: Callable[[str, tuple], int],
+              temp_dir: str,
+              handoff_mode: Optional[str] = None,
+              is_batch: bool = True) -> bool:
+        """
+        Upload all rows of a group as one file with a list of rows, so a
+        single upload is needed, or each row as its own file. Only the rows
+        not uploaded are kept, e.g. after an error.
+
+        Args:
+            group_key (str): The group key.
+            upload (Callable[[str, tuple], int]): Uploads the given file, which may require
+                the given file descriptors to be inherited, see Handoff. Returns 0 on success.
+            temp_dir (str): Directory for the upload file.
+            handoff_mode (Optional[str]): The hand-off of the upload file, see Handoff.
+            is_batch (bool): True to upload all rows as one list, which requires a
+                pySupersetCli accepting a list of rows. False to upload each row.
+                Default: True
+
+        Returns:
+            bool: True if the rows were uploaded or there were none, False otherwise.
+        """
+        rows_path = self._get_rows_path(group_key)
+        claim_lock = _FileLock(f"{rows_path}.{os.getpid()}.{threading.get_ident()}"
+                               f"{_CLAIMED_FILE_EXTENSION}")
+
+        try:
+            entries = self._claim_entries(group_key, claim_lock)
+        except OSError as e:
+            LOG.error("The outbox %s could not be read: %s", rows_path, e)
+            return False
+
+        if entries is None:
+            return True
+
+        LOG.info("Uploading %d rows from the outbox.", len(entries))
+
+        uploaded_count = _upload_entries(entries, upload,
+                                         os.path.join(temp_dir, f"outbox_{group_key}.json"),
+                                         handoff_mode, is_batch)
+
+        with self._lock, self._lock_group(group_key):
+            claim_lock.release()
+
+            if uploaded_count < len(entries):
+                _restore_entries(rows_path, entries[uploaded_count:])
+
+            os.remove(claim_lock.path)
+
+        return uploaded_count == len(entries)
+
+################################################################################
+# Functions
+################################################################################
+
+
+def _lock_file(file_descriptor: int, blocking: bool) -> None:
+    """
+    Lock an open file exclusively.
+
+    Args:
+        file_descriptor (int): The file descriptor of the file.
+        blocking (bool): True to wait for the lock, False to fail if it is held.
+
+    Raises:
+        OSError: If the lock is held and blocking is False.
+    """
+    if fcntl is not None:
+        fcntl.flock(file_descriptor, fcntl.LOCK_EX if blocking is True else
+                    fcntl.LOCK_EX | fcntl.LOCK_NB)
+    elif msvcrt is not None:
+        os.lseek(file_descriptor, 0, os.SEEK_SET)
+
+        while True:
+            try:
+                msvcrt.locking(file_descriptor, msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if blocking is False:
+                    raise
+
+                time.sleep(_LOCK_RETRY_INTERVAL)
+
+
+def _unlock_file(file_descriptor: int) -> None:
+    """
+    Unlock a file locked by _lock_file().
+
+    Args:
+        file_descriptor (int): The file descriptor of the file.
+    """
+    if fcntl is not None:
+        fcntl.flock(file_descriptor, fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        os.lseek(file_descriptor, 0, os.SEEK_SET)
+        msvcrt.locking(file_descriptor, msvcrt.LK_UNLCK, 1)
+
+
+def _upload_entries(entries: list,
+                    upload: Callable[[str, tuple], int],
+                    upload_path: str,
+                    handoff_mode: Optional[str],
+                    is_batch: bool) -> int:
+    """
+    Upload the rows of entries, each row as its own file or all as one list.
+    The upload stops at the first error.
+
+    Args:
+        entries (list): The entries, oldest first.
+        upload (Callable[[str, tuple], int]): Uploads the given file, see Outbox.flush().
+        upload_path (str): Path of the upload file.
+        handoff_mode (Optional[str]): The hand-off of the upload file, see Handoff.
+        is_batch (bool): True to upload all rows as one list, False to upload each row.
+
+    Returns:
+        int: The number of uploaded entries, the first ones of the given entries.
+    """
+    uploads = [entries] if is_batch is True else [[entry] for entry in entries]
+    uploaded_count = 0
+
+    try:
+        for upload_entries in uploads:
+            rows = [entry.get("row") for entry in upload_entries]
+
+            with Handoff(upload_path, handoff_mode) as handoff:
+                handoff.write_json(rows if is_batch is True else rows[0])
+
+                if upload(handoff.path, handoff.pass_fds) != 0:
+                    break
+
+            uploaded_count += len(upload_entries)
+    except OSError as e:
+        LOG.error("The outbox upload file could not be written: %s", e)
+
+    return uploaded_count
+
+
+def _read_entries(rows_path: str) -> list:
+    """
+    Read the entries of a rows file. Invalid lines are skipped.
+
+    Args:
+        rows_path (str): Path to the rows file.
+
+    Returns:
+        list: The entries, oldest first.
+    """
+    entries = []
+
+    try:
+        with open(rows_path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entries.append(loads(line))
+                except ValueError:
+                    LOG.warning("Skipping an invalid row in the outbox %s.", rows_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        LOG.warning("The outbox %s could not be read: %s", rows_path, e)
+
+    return entries
+
+
+def _restore_entries(rows_path: str, entries: list) -> None:
+    """
+    Put entries back into the outbox, before the rows added meanwhile.
+    Entries already in the outbox are skipped, so putting them back twice,
+    e.g. after the process ended in between, does not duplicate them.
+    The lock of the group must be held.
+
+    Args:
+        rows_path (str): Path to the rows file of the group.
+        entries (list): The entries to put back, oldest first.
+    """
+    current_entries = _read_entries(rows_path)
+    current_ids = {entry.get("id") for entry in current_entries} - {None}
+    restored_entries = [entry for entry in entries if entry.get("id") not in current_ids]
+    temp_file_path = f"{rows_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        with open(temp_file_path, "w", encoding="utf-8") as file:
+            for entry in restored_entries + current_entries:
+                file.write(dumps(entry).decode("utf-8") + "\n")
+
+        os.replace(temp_file_path, rows_path)
+        LOG.warning("%d rows are kept in the outbox %s.", len(restored_entries), rows_path)
+    except OSError as e:
+        LOG.error("The rows could not be put back into the outbox %s: %s", rows_path, e)
+
+################################################################################
+# Main
+################################################################################
@@ -0,0 +1,98 @@
+"""
+Locations of the files which pyMetricCli keeps between runs.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import sys
+
+################################################################################
+# Variables
+################################################################################
+
+# Environment variable to overwrite the default cache directory.
+CACHE_DIR_ENV = "PYMETRICCLI_CACHE_DIR"
+
+_APP_DIR_NAME = "pyMetricCli"
+
+# Permissions of directories which may contain search results: owner only.
+_PRIVATE_DIR_MODE = 0o700
+
+################################################################################
+# Classes
+################################################################################
+
+################################################################################
+# Functions
+################################################################################
+
+
+def get_cache_dir() -> str:
+    """
+    Get the directory for cached data of pyMetricCli.
+    The directory can be set by the PYMETRICCLI_CACHE_DIR environment variable.
+    Otherwise the user specific cache directory of the platform is used.
+    The directory is not created by this function.
+
+    Returns:
+        str: Path to the cache directory.
+    """
+    cache_dir = os.environ.get(CACHE_DIR_ENV, "")
+
+    if cache_dir == "":
+        if sys.platform.startswith("win"):
+            base_dir = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+        else:
+            base_dir = os.environ.get("XDG_CACHE_HOME",
+                                      os.path.join(os.path.expanduser("~"), ".cache"))
+
+        cache_dir = os.path.join(base_dir, _APP_DIR_NAME)
+
+    return cache_dir
+
+
+def make_private_dir(directory: str) -> None:
+    """
+    Create a directory which only the current user can access, as it may
+    contain search results. Existing directories are kept unchanged.
+
+    Args:
+        directory (str): Path to the directory.
+    """
+    os.makedirs(directory, mode=_PRIVATE_DIR_MODE, exist_ok=True)
+
+################################################################################
+# Main
+################################################################################
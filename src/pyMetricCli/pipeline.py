@@ -0,0 +1,836 @@
+"""
+The run pipeline: searches of the adapters, handling of the results and upload to Superset.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import copy
+import logging
+import datetime
+import inspect
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from pyMetricCli.ret import Ret
+from pyMetricCli.jira import Jira, ISSUES_KEY
+from pyMetricCli.polarion import Polarion, WORK_ITEMS_KEY
+from pyMetricCli.superset import Superset
+from pyMetricCli.adapter_interface import AdapterInterface
+from pyMetricCli.result_cache import ResultCache
+from pyMetricCli.query_planner import QueryPlanner, PlannedSearch
+from pyMetricCli.json_stream import SearchResultFile, iter_result_items, load_results
+from pyMetricCli.snapshot_store import find_items_key
+from pyMetricCli.columnar_store import ColumnarStore
+from pyMetricCli.instrumentation import measure, get_file_size
+from pyMetricCli.handler_profiler import profile_handler
+from pyMetricCli.aggregation import MetricAggregator
+from pyMetricCli.handoff import Handoff
+from pyMetricCli.outbox import Outbox
+from pyMetricCli.workspace import Workspace
+from pyMetricCli.serializer import dump_file
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+_TEMP_FILE_NAME = "superset_input.json"
+
+# Key of the item list in the search results, by source.
+_ITEMS_KEYS = {"jira": ISSUES_KEY, "polarion": WORK_ITEMS_KEY}
+
+################################################################################
+# Classes
+################################################################################
+
+################################################################################
+# Functions
+################################################################################
+
+
+def _get_adapter_name(adapter: AdapterInterface) -> str:
+    """
+    Get the name of an adapter for logs and reports.
+
+    Args:
+        adapter (AdapterInterface): The adapter.
+
+    Returns:
+        str: The path of the adapter file.
+    """
+    try:
+        adapter_name = inspect.getfile(type(adapter))
+    except TypeError:
+        adapter_name = type(adapter).__name__
+
+    return adapter_name
+
+
+def _count_items(results, items_key: str) -> Optional[int]:
+    """
+    Count the issues or work items of loaded search results.
+
+    Args:
+        results (dict or SearchResultFile): The search results.
+        items_key (str): Expected key of the item list in the search results.
+
+    Returns:
+        Optional[int]: The number of items, None if the results are not loaded.
+    """
+    item_count = None
+
+    if isinstance(results, dict):
+        item_count = sum(1 for _ in iter_result_items(results, items_key))
+
+    return item_count
+
+
+def _search_jira(jira_config: dict,
+                 result_cache: Optional[ResultCache],
+                 temp_dir: str,
+                 data_store: Optional[ColumnarStore] = None) -> Tuple[Ret, Optional[dict]]:
+    """
+    Run a Jira search.
+
+    Args:
+        jira_config (dict): The Jira configuration of the search.
+        result_cache (Optional[ResultCache]): The search result cache, None to disable caching.
+        temp_dir (str): The temporary directory of the search.
+        data_store (Optional[ColumnarStore]): Stores the search results, None to disable.
+
+    Returns:
+        Tuple[Ret, Optional[dict]]: The return status and the search results.
+            The results stay in their file if "stream" is set, see Jira.search_stream().
+    """
+    ret_status = Ret.OK
+    jira_results = None
+
+    # Overwrite the output directory with the temp directory.
+    jira_config["file"] = os.path.join(temp_dir, "jira_search_results.json")
+
+    LOG.info("Searching in Jira for '%s'...", jira_config["filter"])
+
+    with measure("jira_search") as record:
+        jira_instance = Jira(jira_config, result_cache)
+        if jira_instance.is_installed is False:
+            LOG.error("pyJiraCli is not installed!")
+            ret_status = Ret.ERROR_NOT_INSTALLED_JIRA
+        elif jira_config.get("stream") is True:
+            jira_results = jira_instance.search_stream()
+        else:
+            jira_results = jira_instance.search()
+
+        record.bytes_read = get_file_size(jira_config["file"])
+        record.items = _count_items(jira_results, ISSUES_KEY)
+
+    # Cached results are already stored with the run which fetched them.
+    if (data_store is not None) and (jira_results not in (None, {})) and \
+            (jira_instance.is_cached is False):
+        _store_results(data_store, "jira", jira_config, jira_results)
+
+    return ret_status, jira_results
+
+
+def _search_polarion(polarion_config: dict,
+                     result_cache: Optional[ResultCache],
+                     temp_dir: str,
+                     data_store: Optional[ColumnarStore] = None) -> Tuple[Ret, Optional[dict]]:
+    """
+    Run a Polarion search.
+
+    Args:
+        polarion_config (dict): The Polarion configuration of the search.
+        result_cache (Optional[ResultCache]): The search result cache, None to disable caching.
+        temp_dir (str): The temporary directory of the search.
+        data_store (Optional[ColumnarStore]): Stores the search results, None to disable.
+
+    Returns:
+        Tuple[Ret, Optional[dict]]: The return status and the search results.
+            The results stay in their file if "stream" is set, see Polarion.search_stream().
+    """
+    ret_status = Ret.OK
+    polarion_results = None
+
+    # Overwrite the output directory with the temp directory.
+    polarion_config["output"] = temp_dir
+
+    LOG.info("Searching in Polarion: %s", polarion_config["query"])
+
+    with measure("polarion_search") as record:
+        polarion_instance = Polarion(polarion_config, result_cache)
+        if polarion_instance.is_installed is False:
+            LOG.error("pyPolarionCli is not installed!")
+            ret_status = Ret.ERROR_NOT_INSTALLED_POLARION
+        elif polarion_config.get("stream") is True:
+            polarion_results = polarion_instance.search_stream()
+        else:
+            polarion_results = polarion_instance.search()
+
+        record.bytes_read = get_file_size(os.path.join(
+            temp_dir, f"{polarion_config['project']}_search_results.json"))
+        record.items = _count_items(polarion_results, WORK_ITEMS_KEY)
+
+    # Cached results are already stored with the run which fetched them.
+    if (data_store is not None) and (polarion_results not in (None, {})) and \
+            (polarion_instance.is_cached is False):
+        _store_results(data_store, "polarion", polarion_config, polarion_results)
+
+    return ret_status, polarion_results
+
+
+def _store_results(data_store: ColumnarStore, tool: str, config: dict, results) -> None:
+    """
+    Store search results in the data directory.
+
+    Args:
+        data_store (ColumnarStore): The store.
+        tool (str): "jira" or "polarion".
+        config (dict): The configuration of the search.
+        results (dict or SearchResultFile): The search results.
+    """
+    items_key = _ITEMS_KEYS[tool]
+    header = {}
+
+    if isinstance(results, dict):
+        items_key = find_items_key(results, items_key)
+        header = {key: value for key, value in results.items() if key != items_key}
+
+    with measure(f"{tool}_store") as record:
+        try:
+            file_path = data_store.write(tool, config, header,
+                                         iter_result_items(results, items_key), items_key)
+        except Exception as e:  # pylint: disable=broad-except
+            LOG.error("The %s search results could not be stored: %s", tool, e)
+            file_path = None
+
+        if file_path is not None:
+            record.bytes_written = get_file_size(file_path)
+
+
+def _distribute_search_results(searches: list,
+                               planned_search: PlannedSearch,
+                               search: Tuple[Ret, Optional[dict]]) -> None:
+    """
+    Pass the outcome of a planned search to all adapters which need it.
+    Each adapter gets its own copy of loaded results, as handlers may modify them.
+    Results in a file are read separately by each adapter.
+
+    Args:
+        searches (list): The search outcome of each adapter, updated in place.
+        planned_search (PlannedSearch): The planned search.
+        search (Tuple[Ret, Optional[dict]]): The outcome of the planned search.
+    """
+    ret_status, results = search
+    last_position = len(planned_search.adapter_indices) - 1
+
+    for position, adapter_index in enumerate(planned_search.adapter_indices):
+        # The last adapter may use the original results.
+        if isinstance(results, dict) and (position < last_position):
+            searches[adapter_index] = (ret_status, copy.deepcopy(results))
+        else:
+            searches[adapter_index] = (ret_status, results)
+
+
+def _submit_searches(executor: ThreadPoolExecutor,
+                     planned_searches: list,
+                     search_function: Callable,
+                     work_dir: str,
+                     result_cache: Optional[ResultCache]) -> list:
+    """
+    Submit the planned searches of a tool to the executor.
+    Each search gets its own temporary directory.
+
+    Args:
+        executor (ThreadPoolExecutor): The executor running the searches.
+        planned_searches (list): The planned searches of the tool.
+        search_function (Callable): _search_jira() or _search_polarion().
+        work_dir (str): Directory of the temporary directories of the searches.
+        result_cache (Optional[ResultCache]): The search result cache, None to disable caching.
+
+    Returns:
+        list: Tuples of each planned search and the future of its outcome.
+    """
+    futures = []
+
+    for index, planned_search in enumerate(planned_searches):
+        temp_dir = os.path.join(work_dir, str(index))
+        os.makedirs(temp_dir, exist_ok=True)
+
+        future = executor.submit(search_function, planned_search.config, result_cache, temp_dir)
+        futures.append((planned_search, future))
+
+    return futures
+
+
+def _get_outcome(future: Future, failed_outcome, description: str):
+    """
+    Get the outcome of a search or an adapter run by an executor.
+    An exception is logged and results in the given failed outcome,
+    so it does not stop the other searches and adapters.
+
+    Args:
+        future (Future): The future of the search or the adapter.
+        failed_outcome: The outcome if an exception was raised.
+        description (str): Description of the search or the adapter for the log.
+
+    Returns:
+        The outcome of the future or the failed outcome.
+    """
+    try:
+        outcome = future.result()
+    except Exception as e:  # pylint: disable=broad-except
+        LOG.error("%s failed: %s", description, e)
+        outcome = failed_outcome
+
+    return outcome
+
+
+def _fetch_search_results(planner: QueryPlanner,  # pylint: disable=too-many-arguments
+                          adapter_count: int,
+                          result_cache: Optional[ResultCache],
+                          jobs: int,
+                          data_store: Optional[ColumnarStore],
+                          workspace: Workspace) -> Tuple[list, list]:
+    """
+    Run all distinct Jira and Polarion searches of the plan concurrently
+    and distribute the results to the adapters which need them.
+
+    Args:
+        planner (QueryPlanner): The planned searches.
+        adapter_count (int): The number of adapters.
+        result_cache (Optional[ResultCache]): The search result cache, None to disable caching.
+        jobs (int): Maximum number of searches running at the same time.
+        data_store (Optional[ColumnarStore]): Stores the search results, None to disable.
+        workspace (Workspace): The workspace of the run.
+
+    Returns:
+        Tuple[list, list]: The Jira and the Polarion search outcome of each adapter,
+            see _search_jira() and _search_polarion(). The search results are None
+            if an adapter does not search.
+    """
+    jira_searches = [(Ret.OK, None)] * adapter_count
+    polarion_searches = [(Ret.OK, None)] * adapter_count
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="search") as executor:
+        jira_futures = _submit_searches(executor, planner.jira_searches,
+                                        functools.partial(_search_jira, data_store=data_store),
+                                        workspace.get_dir("jira"), result_cache)
+        polarion_futures = _submit_searches(executor, planner.polarion_searches,
+                                            functools.partial(_search_polarion,
+                                                              data_store=data_store),
+                                            workspace.get_dir("polarion"), result_cache)
+
+        for planned_search, future in jira_futures:
+            _distribute_search_results(jira_searches, planned_search,
+                                       _get_outcome(future, (Ret.ERROR, None), "Jira search"))
+
+        for planned_search, future in polarion_futures:
+            _distribute_search_results(polarion_searches, planned_search,
+                                       _get_outcome(future, (Ret.ERROR, None), "Polarion search"))
+
+    return jira_searches, polarion_searches
+
+
+def _handle_items(handle_item: Callable[[dict], bool], results, items_key: str, record) -> bool:
+    """
+    Pass the items of the search results one by one to an item handler of an adapter.
+
+    Args:
+        handle_item (Callable[[dict], bool]): The item handler of the adapter.
+        results (dict or SearchResultFile): The search results.
+        items_key (str): Expected key of the item list in the search results.
+        record (StageRecord): The record of the stage, counting the items.
+
+    Returns:
+        bool: True if all items were handled successfully, False otherwise.
+    """
+    is_handled = True
+    record.items = 0
+
+    if isinstance(results, SearchResultFile):
+        record.bytes_read = get_file_size(results.file_path)
+
+    try:
+        for item in iter_result_items(results, items_key):
+            record.items += 1
+
+            if handle_item(item) is False:
+                is_handled = False
+                break
+    except Exception as e:  # pylint: disable=broad-except
+        LOG.error("An error occurred reading the search results: %s", e)
+        is_handled = False
+
+    return is_handled
+
+
+def _get_item_handler(adapter: AdapterInterface,
+                      source: str,
+                      aggregator: MetricAggregator) -> Callable[[dict], bool]:
+    """
+    Get the item handler of an adapter for streamed search results.
+    If the adapter declares metrics, each item is added to the aggregator
+    first. Such adapters need not implement the item handler.
+
+    Args:
+        adapter (AdapterInterface): The adapter.
+        source (str): "jira" or "polarion".
+        aggregator (MetricAggregator): The aggregator of the declared metrics.
+
+    Returns:
+        Callable[[dict], bool]: The item handler.
+    """
+    handle_item = getattr(adapter, f"handle_{source}_item")
+
+    if aggregator.is_empty() is False:
+        adapter_handle_item = handle_item
+        is_implemented = getattr(type(adapter), f"handle_{source}_item") is not \
+            getattr(AdapterInterface, f"handle_{source}_item")
+
+        def aggregate_item(item: dict) -> bool:
+            aggregator.add_item(item)
+            return (is_implemented is False) or adapter_handle_item(item)
+
+        handle_item = aggregate_item
+
+    return handle_item
+
+
+def _handle_results(adapter: AdapterInterface, source: str, results, record) -> bool:
+    """
+    Pass the search results of a source to the handlers of an adapter.
+    The metrics declared by '<source>_metrics' of the adapter are written to
+    its output before handle_<source>() is called. If "stream" is set in the
+    '<source>_config', each item is passed to handle_<source>_item() instead
+    and the metrics are written after the last item.
+
+    Args:
+        adapter (AdapterInterface): The adapter handling the search results.
+        source (str): "jira" or "polarion".
+        results (dict or SearchResultFile): The search results.
+        record (StageRecord): The record of the stage.
+
+    Returns:
+        bool: True if the search results were handled successfully, False otherwise.
+    """
+    adapter_name = _get_adapter_name(adapter)
+    items_key = _ITEMS_KEYS[source]
+
+    try:
+        aggregator = MetricAggregator(getattr(adapter, f"{source}_metrics", None))
+    except ValueError as e:
+        LOG.error("The %s_metrics of the adapter are invalid: %s", source, e)
+        return False
+
+    try:
+        if getattr(adapter, f"{source}_config").get("stream") is True:
+            with profile_handler(adapter_name, f"handle_{source}_item"):
+                is_handled = _handle_items(_get_item_handler(adapter, source, aggregator),
+                                           results, items_key, record)
+
+            if is_handled is True:
+                aggregator.apply(adapter.output)
+        else:
+            results = load_results(results)
+            record.items = _count_items(results, items_key)
+
+            if aggregator.is_empty() is False:
+                aggregator.add_items(iter_result_items(results, items_key))
+                aggregator.apply(adapter.output)
+
+            with profile_handler(adapter_name, f"handle_{source}"):
+                is_handled = getattr(adapter, f"handle_{source}")(results)
+    except Exception as e:  # pylint: disable=broad-except
+        # An error of one adapter must not stop the other adapters.
+        LOG.error("The adapter %s failed handling the %s search results: %s",
+                  adapter_name, source, e)
+        is_handled = False
+
+    return is_handled
+
+
+def _process_jira(adapter: AdapterInterface, jira_search: Tuple[Ret, Optional[dict]]) -> Ret:
+    """
+    Process the Jira search results, see _handle_results().
+
+    Args:
+        adapter (AdapterInterface): The adapter handling the search results.
+        jira_search (Tuple[Ret, Optional[dict]]): The outcome of _search_jira().
+
+    Returns:
+        Ret: The return status.
+    """
+    ret_status, jira_results = jira_search
+
+    if (Ret.OK == ret_status) and (jira_results is not None):
+        with measure("jira_handle", _get_adapter_name(adapter)) as record:
+            is_handled = _handle_results(adapter, "jira", jira_results, record)
+
+        if is_handled is False:
+            ret_status = Ret.ERROR_ADAPTER_HANDLER_JIRA
+
+    return ret_status
+
+
+def _process_polarion(adapter: AdapterInterface,
+                      polarion_search: Tuple[Ret, Optional[dict]]) -> Ret:
+    """
+    Process the Polarion search results, see _handle_results().
+
+    Args:
+        adapter (AdapterInterface): The adapter handling the search results.
+        polarion_search (Tuple[Ret, Optional[dict]]): The outcome of _search_polarion().
+
+    Returns:
+        Ret: The return status.
+    """
+    ret_status, polarion_results = polarion_search
+
+    if (Ret.OK == ret_status) and (polarion_results is not None):
+        with measure("polarion_handle", _get_adapter_name(adapter)) as record:
+            is_handled = _handle_results(adapter, "polarion", polarion_results, record)
+
+        if is_handled is False:
+            ret_status = Ret.ERROR_ADAPTER_HANDLER_POLARION
+
+    return ret_status
+
+
+def save_temp_file(output: dict, temp_file_path: str) -> Ret:
+    """
+    Save the output dictionary to a temporary file as compact JSON.
+
+    Args:
+        output (dict): The output dictionary.
+        temp_file_path (str): The path of the temporary file, e.g. of a Handoff.
+
+    Returns:
+        Ret: The return status.
+    """
+    ret_status = Ret.OK
+
+    try:
+        # Write to the file.
+        dump_file(output, temp_file_path)
+    except Exception as e:  # pylint: disable=broad-except
+        LOG.error("An error occurred writing the temporary file: %s", e)
+        ret_status = Ret.ERROR
+
+    return ret_status
+
+
+def _process_superset(adapter: AdapterInterface,
+                      temp_file_path: str,
+                      pass_fds: tuple = ()) -> Ret:
+    """
+    Process the Superset file upload.
+
+    Args:
+        adapter (AdapterInterface): The adapter providing the Superset configuration.
+        temp_file_path (str): The path of the temporary file to upload.
+        pass_fds (tuple): File descriptors pySupersetCli needs to read the file, see Handoff.
+
+    Returns:
+        Ret: The return status.
+    """
+    ret_status = Ret.OK
+
+    # Send the temporary file to the metric server using Superset.
+    superset_instance = Superset(adapter.superset_config)
+    if superset_instance.is_installed is False:
+        LOG.error("pySupersetCli is not installed!")
+        ret_status = Ret.ERROR_NOT_INSTALLED_SUPERSET
+    else:
+        with measure("superset_upload", _get_adapter_name(adapter)) as record:
+            record.bytes_written = get_file_size(temp_file_path)
+            ret = superset_instance.upload(temp_file_path, pass_fds)
+
+        if 0 != ret:
+            ret_status = Ret.ERROR_SUPERSET_UPLOAD
+            LOG.error("Error while uploading to Superset!")
+        else:
+            LOG.info("Successfully uploaded to Superset!")
+
+    return ret_status
+
+
+def handle_search_results(adapter: AdapterInterface,
+                          jira_search: Tuple[Ret, Optional[dict]],
+                          polarion_search: Tuple[Ret, Optional[dict]]) -> Ret:
+    """
+    Let the adapter handle the Jira and the Polarion search results,
+    always in this order.
+
+    Args:
+        adapter (AdapterInterface): The adapter handling the search results.
+        jira_search (Tuple[Ret, Optional[dict]]): The outcome of the Jira search.
+        polarion_search (Tuple[Ret, Optional[dict]]): The outcome of the Polarion search.
+
+    Returns:
+        Ret: The return status.
+    """
+    ret_status = Ret.OK
+
+    if Ret.OK != _process_jira(adapter=adapter, jira_search=jira_search):
+        LOG.error("Error while processing Jira.")
+        ret_status = Ret.ERROR_ADAPTER_HANDLER_JIRA
+
+    elif Ret.OK != _process_polarion(adapter=adapter,
+                                     polarion_search=polarion_search):
+        LOG.error("Error while processing Polarion.")
+        ret_status = Ret.ERROR_ADAPTER_HANDLER_POLARION
+
+    return ret_status
+
+
+def _upload_output(adapter: AdapterInterface, output: dict, temp_dir: str) -> Ret:
+    """
+    Upload the output of an adapter to Superset. The output is handed over
+    as set by "handoff" in the 'superset_config', by default as file in the workspace.
+
+    Args:
+        adapter (AdapterInterface): The adapter providing the Superset configuration.
+        output (dict): The output of the adapter.
+        temp_dir (str): The temporary directory of the adapter.
+
+    Returns:
+        Ret: The return status.
+    """
+    ret_status = Ret.OK
+
+    with Handoff(os.path.join(temp_dir, _TEMP_FILE_NAME),
+                 adapter.superset_config.get("handoff")) as handoff:
+        # Save the output dictionary to a temporary file.
+        LOG.info("Saving output to a temporary file...")
+
+        with measure("save_temp_file", _get_adapter_name(adapter)) as record:
+            save_ret = save_temp_file(output=output, temp_file_path=handoff.path)
+            record.bytes_written = get_file_size(handoff.path)
+
+        if Ret.OK != save_ret:
+            ret_status = Ret.ERROR
+            LOG.error("Error while saving the temporary file.")
+        elif Ret.OK != _process_superset(adapter, handoff.path, handoff.pass_fds):
+            ret_status = Ret.ERROR_SUPERSET_UPLOAD
+            LOG.error("Error while processing Superset.")
+
+    return ret_status
+
+
+def _process_adapter(adapter: AdapterInterface,
+                     jira_search: Tuple[Ret, Optional[dict]],
+                     polarion_search: Tuple[Ret, Optional[dict]],
+                     temp_dir: str,
+                     outbox: Optional[Outbox]) -> Ret:
+    """
+    Let the adapter handle the search results and upload its output.
+    With an outbox, the output is only added to the outbox, see flush_outbox().
+
+    Args:
+        adapter (AdapterInterface): The adapter to process.
+        jira_search (Tuple[Ret, Optional[dict]]): The outcome of the Jira search.
+        polarion_search (Tuple[Ret, Optional[dict]]): The outcome of the Polarion search.
+        temp_dir (str): The temporary directory of the adapter.
+        outbox (Optional[Outbox]): The outbox, None to upload the output directly.
+
+    Returns:
+        Ret: The return status.
+    """
+    ret_status = handle_search_results(adapter, jira_search, polarion_search)
+
+    if Ret.OK == ret_status:
+        # Get the output from the adapter.
+        processed_output = adapter.output
+
+        # Ensure the output always contains a date.
+        processed_output["date"] = datetime.datetime.now(
+        ).isoformat()
+
+        if outbox is not None:
+            if outbox.add(adapter.superset_config, processed_output) is False:
+                ret_status = Ret.ERROR
+                LOG.error("Error while adding the output to the outbox.")
+        else:
+            ret_status = _upload_output(adapter, processed_output, temp_dir)
+
+    return ret_status
+
+
+def flush_outbox(outbox: Outbox, adapters: list) -> None:
+    """
+    Upload the tables of the outbox used by the adapters, if due.
+    Each table is uploaded with the Superset configuration of the first
+    adapter using it, as the outbox does not store credentials. Its rows
+    are uploaded as one list, unless that configuration sets "outbox_batch"
+    to False for a pySupersetCli which only accepts single rows.
+    A failed upload is not an error of the adapters, the rows are kept
+    for the next run.
+
+    Args:
+        outbox (Outbox): The outbox.
+        adapters (list): The successfully loaded adapters of this run.
+    """
+    superset_configs = {}
+
+    for adapter in adapters:
+        superset_configs.setdefault(Outbox.get_group_key(adapter.superset_config),
+                                    adapter.superset_config)
+
+    due_group_keys = [group_key for group_key in superset_configs
+                      if outbox.is_flush_due(group_key) is True]
+
+    if len(due_group_keys) == 0:
+        return
+
+    with Workspace("outbox") as workspace:
+        for group_key in due_group_keys:
+            superset_config = superset_configs[group_key]
+            superset_instance = Superset(superset_config)
+
+            with measure("outbox_flush") as record:
+                if superset_instance.is_installed is False:
+                    is_flushed = None
+                else:
+                    is_flushed = outbox.flush(group_key, superset_instance.upload,
+                                              workspace.path, superset_config.get("handoff"),
+                                              superset_config.get("outbox_batch") is not False)
+                    record.bytes_written = get_file_size(
+                        os.path.join(workspace.path, f"outbox_{group_key}.json"))
+
+            if is_flushed is None:
+                LOG.warning("pySupersetCli is not installed, the outbox is kept.")
+            elif is_flushed is False:
+                LOG.warning("Error while uploading the outbox to table '%s'.",
+                            superset_config["table"])
+            else:
+                LOG.info("Successfully uploaded the outbox to table '%s'.",
+                         superset_config["table"])
+
+
+def _plan_searches(loaded_adapters: list, adapter_results: list) -> QueryPlanner:
+    """
+    Plan the searches of all loaded adapters, see QueryPlanner.
+
+    Args:
+        loaded_adapters (list): The outcome of _load_adapter() for each adapter.
+        adapter_results (list): The return status of each adapter, set to
+            Ret.ERROR in place if the searches of an adapter are invalid.
+
+    Returns:
+        QueryPlanner: The planned searches.
+    """
+    planner = QueryPlanner()
+
+    for index, (ret_status, adapter) in enumerate(loaded_adapters):
+        if Ret.OK == ret_status:
+            try:
+                planner.add_adapter(index, adapter)
+            except Exception as e:  # pylint: disable=broad-except
+                LOG.error("The searches of the adapter %s are invalid: %s",
+                          _get_adapter_name(adapter), e)
+                adapter_results[index] = Ret.ERROR
+
+    return planner
+
+
+def run_loaded_adapters(loaded_adapters: list,
+                        result_cache: Optional[ResultCache],
+                        jobs: int,
+                        outbox: Optional[Outbox],
+                        data_store: Optional[ColumnarStore] = None) -> list:
+    """
+    Run all loaded adapters. Identical searches of several adapters are run only
+    once, see QueryPlanner. Afterwards the adapters handle the results and
+    upload their output, limited to the given number at the same time.
+    The run gets its own workspace, removed at its end, see Workspace.
+    Each search and each adapter gets its own temporary directory in it.
+    With an outbox, the due tables of the outbox are uploaded at last.
+
+    Args:
+        loaded_adapters (list): The outcome of _load_adapter() for each adapter.
+        result_cache (Optional[ResultCache]): The search result cache, None to disable caching.
+        jobs (int): Maximum number of searches and adapters processed at the same time.
+        outbox (Optional[Outbox]): The outbox, None to upload the output directly.
+        data_store (Optional[ColumnarStore]): Stores the search results, None to disable.
+
+    Returns:
+        list: The return status of each adapter, in the order of the loaded adapters.
+    """
+    adapter_results = [ret_status for ret_status, _ in loaded_adapters]
+    planner = _plan_searches(loaded_adapters, adapter_results)
+
+    LOG.info("%d adapters need %d distinct Jira and %d distinct Polarion searches.",
+             len(loaded_adapters), len(planner.jira_searches), len(planner.polarion_searches))
+
+    with Workspace("run") as workspace:
+        jira_searches, polarion_searches = _fetch_search_results(planner,
+                                                                 len(loaded_adapters),
+                                                                 result_cache,
+                                                                 jobs,
+                                                                 data_store,
+                                                                 workspace)
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs),
+                                thread_name_prefix="adapter") as executor:
+            futures = []
+
+            for index, (_, adapter) in enumerate(loaded_adapters):
+                if Ret.OK == adapter_results[index]:
+                    futures.append(executor.submit(_process_adapter,
+                                                   adapter,
+                                                   jira_searches[index],
+                                                   polarion_searches[index],
+                                                   workspace.get_dir("adapter", str(index)),
+                                                   outbox))
+                else:
+                    futures.append(None)
+
+            for index, future in enumerate(futures):
+                if future is not None:
+                    adapter_results[index] = _get_outcome(
+                        future, Ret.ERROR,
+                        f"The adapter {_get_adapter_name(loaded_adapters[index][1])}")
+
+    if outbox is not None:
+        flush_outbox(outbox, [adapter for ret_status, adapter in loaded_adapters
+                               if Ret.OK == ret_status])
+
+    return adapter_results
+
+################################################################################
+# Main
+################################################################################
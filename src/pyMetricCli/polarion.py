@@ -36,13 +36,22 @@ Wrapper for the pyPolarionCli Tool.
 ################################################################################
 
 import os
+import datetime
 import subprocess
-import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
 from pyProfileMgr.profile_data import ProfileType
-from pyProfileMgr.profile_mgr import ProfileMgr
-from pyProfileMgr.ret import Ret
+
+from pyMetricCli.backend import get_backend
+from pyMetricCli.handoff import Handoff
+from pyMetricCli.credentials import resolve_credentials
+from pyMetricCli.json_stream import SearchResultFile
+from pyMetricCli.tools import is_tool_installed, get_field_arguments
+from pyMetricCli.result_cache import ResultCache
+from pyMetricCli.snapshot_store import SnapshotStore, to_utc_timestamp, find_items_key
+from pyMetricCli.serializer import load_file
 
 
 ################################################################################
@@ -51,6 +60,23 @@ from pyProfileMgr.ret import Ret
 
 LOG: logging.Logger = logging.getLogger(__name__)
 
+# Key of the work item list in the search results of pyPolarionCli.
+WORK_ITEMS_KEY = "workitems"
+
+# Default seconds between two full searches in incremental mode.
+_DEFAULT_FULL_SYNC_INTERVAL = 24 * 60 * 60
+
+# Polarion queries dates with a granularity of days in the time zone of the server.
+# Therefore one day is subtracted from the watermark.
+_WATERMARK_OVERLAP = datetime.timedelta(days=1)
+
+_QUERY_DATE_FORMAT = "%Y%m%d"
+_QUERY_MIN_DATE = "00010101"
+_QUERY_MAX_DATE = "30000101"
+
+# Default number of partitions of a query searched at the same time.
+_DEFAULT_PARTITION_WORKERS = 4
+
 
 ################################################################################
 # Classes
@@ -62,13 +88,17 @@ class Polarion:  # pylint: disable=too-few-public-methods
     Wrapper for the pyPolarionCli Tool.
     """
 
-    def __init__(self, polarion_config: dict) -> None:
+    def __init__(self, polarion_config: dict, result_cache: Optional[ResultCache] = None) -> None:
         self.config = polarion_config
+        self._result_cache = result_cache
+        # True if the results of the last search were taken from the result cache.
+        self.is_cached = False
+        self._backend = get_backend(self.config)
         self.is_installed = self._check_if_is_installed()
 
     def _run_pypolarioncli(self, arguments) -> subprocess.CompletedProcess:
         """
-        Wrapper to run pyPolarionCli command line.
+        Wrapper to run pyPolarionCli with the backend selected in the configuration.
 
         Args:
             arguments (list): List of arguments to pass to pyPolarionCli.
@@ -77,92 +107,299 @@ class Polarion:  # pylint: disable=too-few-public-methods
             subprocess.CompletedProcess[bytes]: The result of the command.
             Includes return code, stdout and stderr.
         """
-        args = ["pyPolarionCli"]  # The executable to run.
-        args.extend(arguments)  # Add the arguments to the command.
-
-        return subprocess.run(args,
-                              capture_output=True,
-                              check=False,
-                              shell=False)
+        return self._backend.run("pyPolarionCli", arguments)
 
     def _check_if_is_installed(self) -> bool:
         """
         Checks if the pyPolarionCli Tool is installed.
+        Uses the cached tool detection instead of running the tool.
 
         Returns:
             bool: True if pyPolarionCli is installed, False otherwise.
         """
         # pylint: disable=duplicate-code
-        is_installed = True
-        try:
-            ret = self._run_pypolarioncli(["--help"])
-            ret.check_returncode()
-        except subprocess.CalledProcessError:
+        is_installed = is_tool_installed("pyPolarionCli")
+        if is_installed is False:
             print("pyPolarionCli is not installed!")
-            is_installed = False
         return is_installed
 
+    def _get_cache_key(self) -> str:
+        """
+        Get the key of the search in the result cache.
+
+        Returns:
+            str: The cache key.
+        """
+        return ResultCache.make_key(tool="polarion",
+                                    server=self.config.get("profile", self.config.get("server")),
+                                    project=self.config["project"],
+                                    query=self.config["query"],
+                                    fields=sorted(self.config["fields"]))
+
     def search(self) -> dict:
         """
         Search in Polarion using the search command of pyPolarionCli.
+        If a result cache is available, a valid cached result is used instead.
+        The time to live can be set by "cache_ttl" in the 'polarion_config'.
+        If "incremental" is set in the 'polarion_config', only the work items
+        updated since the last search are fetched, see _search_incremental().
+        If "partitions" is a list or a dictionary, the query is split, see
+        _search_partitioned().
 
         Returns:
             dict: Search results.
         """
+        # pylint: disable=duplicate-code
+        output = None
+        cache_key = None
+
+        if self._result_cache is not None:
+            cache_key = self._get_cache_key()
+            output = self._result_cache.get(cache_key, self.config.get("cache_ttl"))
+
+        self.is_cached = output is not None
+
+        if output is None:
+            if self.config.get("incremental") is True:
+                output = self._search_incremental()
+            else:
+                output = self._search_query(self.config["query"])
+
+            # Only successful searches are cached.
+            if (cache_key is not None) and output:
+                self._result_cache.put(cache_key, output)
+
+        return output
+
+    def search_stream(self):
+        """
+        Search in Polarion like search(), but keep the results in their file,
+        so they can be read work item by work item, see SearchResultFile.
+        A valid cached result is used if available, but streamed results are
+        not cached, as this would require to load them completely.
+        Incremental and partitioned searches always return the complete results.
+
+        Returns:
+            dict or SearchResultFile: Search results. Empty dict on error.
+        """
+        # pylint: disable=duplicate-code
+        output = None
+
+        if self._result_cache is not None:
+            output = self._result_cache.get(self._get_cache_key(), self.config.get("cache_ttl"))
+
+        self.is_cached = output is not None
+
+        if output is None:
+            if (self.config.get("incremental") is True) or (_is_partitioned(self.config) is True):
+                output = self.search()
+            else:
+                output_file_name = self._run_search(self.config["query"])
+
+                if output_file_name is None:
+                    output = {}
+                else:
+                    output = SearchResultFile(output_file_name, WORK_ITEMS_KEY)
+
+        return output
+
+    def _get_snapshot_key(self) -> str:
+        """
+        Get the key of the search in the snapshot store.
+
+        Returns:
+            str: The snapshot key.
+        """
+        return self._get_cache_key()
+
+    def _search_incremental(self) -> dict:
+        """
+        Search only the work items updated since the last search and merge
+        them into the local snapshot of all work items, keyed by their id.
+        A full search is done if there is no snapshot yet and every
+        "full_sync_interval" seconds (default: one day, 0 for never).
+        Only the full search removes deleted work items or work items
+        which no longer match the query.
+
+        Returns:
+            dict: Search results with all work items of the snapshot.
+        """
         output = {}
 
-        output_file_name = os.path.join(self.config['output'],
-                                        f"{self.config['project']}_search_results.json")
+        store = SnapshotStore(self._get_snapshot_key(), _get_work_item_id, _get_work_item_updated)
+        store.load()
 
-        server: str
-        username: str
-        password: str
-        token: str
+        is_full = store.is_full_sync_due(self.config.get("full_sync_interval",
+                                                         _DEFAULT_FULL_SYNC_INTERVAL))
+        query = self.config["query"]
 
-        # Read credentials from the profile if a profile name has been given
-        # in the 'polarion_config'.
-        # pylint: disable=R0801
-        if "profile" in self.config:
-            profile_mgr = ProfileMgr()
-            ret_code = profile_mgr.load(self.config["profile"])
-            if ret_code != Ret.CODE.RET_OK:
-                print("Error loading profile:", self.config['profile'])
-                return output
-
-            # Check for profile type 'polarion'.
-            if profile_mgr.loaded_profile.profile_type != ProfileType.POLARION:
-                print("The profile type is not 'polarion'.")
-                return output
-
-            server = profile_mgr.loaded_profile.server_url
-            username = profile_mgr.loaded_profile.user
-            password = profile_mgr.loaded_profile.password
-            token = profile_mgr.loaded_profile.token
-        # Else take credentials from the 'polarion_config'.
+        if is_full is False:
+            query = f"({query}) AND {_get_updated_since_query(store.watermark)}"
+
+        LOG.info("Incremental Polarion search (full: %s): %s", is_full, query)
+
+        results = self._search_query(query, ["id", "updated"])
+
+        if results:
+            output = store.merge(results, WORK_ITEMS_KEY, is_full)
+
+        return output
+
+    def _search_query(self, query: str, extra_fields: list = None) -> dict:
+        """
+        Search a query, split into partitions if "partitions" in the
+        'polarion_config' is a list or a dictionary.
+
+        Args:
+            query (str): The Polarion query of the search.
+            extra_fields (list): Fields to add if the fields are restricted.
+
+        Returns:
+            dict: Search results.
+        """
+        if _is_partitioned(self.config) is True:
+            output = self._search_partitioned(query, extra_fields)
         else:
-            server = self.config["server"]
-            username = self.config["username"]
-            password = self.config["password"]
-            token = self.config["token"]
+            output = self._search_pypolarioncli(query, extra_fields)
+
+        return output
+
+    def _search_partitioned(self, query: str, extra_fields: list = None) -> dict:
+        """
+        Search a query in partitions, each restricted by a clause of
+        "partitions" in the 'polarion_config', see get_partition_clauses().
+        Up to "partition_workers" partitions (default: 4) are searched at the
+        same time by separate pyPolarionCli processes, each with its own
+        output directory. The work items are merged in the order of the
+        partitions, a work item found by several partitions only once.
+        The id is always requested, as the merge needs it.
+
+        Args:
+            query (str): The Polarion query of the search.
+            extra_fields (list): Fields to add if the fields are restricted.
+
+        Returns:
+            dict: Search results with the work items of all partitions. Empty dict on error.
+        """
+        # pylint: disable=duplicate-code
+        output = {}
+
+        try:
+            clauses = get_partition_clauses(self.config["partitions"], datetime.date.today())
+        except ValueError as e:
+            LOG.error("The partitions of the Polarion query are invalid: %s", e)
+            clauses = []
+
+        if len(clauses) > 0:
+            LOG.info("Searching in Polarion in %d partitions: %s", len(clauses), query)
+
+            workers = int(self.config.get("partition_workers", _DEFAULT_PARTITION_WORKERS))
+            extra_fields = ["id"] + [field for field in (extra_fields or []) if field != "id"]
+
+            with ThreadPoolExecutor(max_workers=max(1, min(workers, len(clauses))),
+                                    thread_name_prefix="polarion_partition") as executor:
+                futures = [executor.submit(self._search_pypolarioncli,
+                                           f"({query}) AND ({clause})", extra_fields,
+                                           os.path.join(self.config["output"],
+                                                        f"partition_{index}"))
+                           for index, clause in enumerate(clauses)]
+                partitions = [future.result() for future in futures]
+
+            if all(partitions):
+                output = _merge_partitions(partitions)
+
+        return output
+
+    def _search_pypolarioncli(self,
+                              query: str,
+                              extra_fields: list = None,
+                              output_dir: Optional[str] = None) -> dict:
+        """
+        Run the search command of pyPolarionCli and load its results.
+        The results are handed over as set by "handoff" in the 'polarion_config',
+        by default in the given directory, see Handoff.
+
+        Args:
+            query (str): The Polarion query of the search.
+            extra_fields (list): Fields to add if the fields are restricted.
+            output_dir (Optional[str]): The output directory, defaults to the
+                output directory given in the 'polarion_config'.
+
+        Returns:
+            dict: Search results.
+        """
+        output = {}
+
+        if output_dir is None:
+            output_dir = self.config['output']
+
+        with Handoff(output_dir, self.config.get("handoff"), is_directory=True) as handoff:
+            output_file_name = self._run_search(query, extra_fields, handoff.path)
+
+            if output_file_name is not None:
+
+                try:
+                    output = load_file(output_file_name)
+                except Exception as e:  # pylint: disable=broad-except
+                    LOG.error(
+                        "An error occurred loading the Polarion results from file: %s", e)
+
+        return output
+
+    def _run_search(self,
+                    query: str,
+                    extra_fields: list = None,
+                    output_dir: Optional[str] = None) -> Optional[str]:
+        """
+        Run the search command of pyPolarionCli, which writes the results to a
+        file in the output directory.
+
+        Args:
+            query (str): The Polarion query of the search.
+            extra_fields (list): Fields to add if the fields are restricted.
+            output_dir (Optional[str]): The output directory, defaults to the
+                output directory given in the 'polarion_config'. It is created if needed.
+
+        Returns:
+            Optional[str]: Path to the result file or None if the search failed.
+        """
+        output = None
+
+        if output_dir is None:
+            output_dir = self.config['output']
+        else:
+            os.makedirs(output_dir, exist_ok=True)
+
+        output_file_name = os.path.join(output_dir,
+                                        f"{self.config['project']}_search_results.json")
+
+        # Check the profile if a profile name has been given in the 'polarion_config',
+        # else read the credentials from the 'polarion_config'.
+        credentials = resolve_credentials(self.config, ProfileType.POLARION)
+        if credentials is None:
+            return output
 
         command_list: list = []
 
+        # The credentials of a profile are not passed, as they would be visible
+        # in the process list. pyPolarionCli loads the profile itself.
+        if "profile" in self.config:
+            command_list += ["--profile", self.config["profile"]]
         # Add token if available. pyPolarionCli will use it instead of the password if provided.
-        if token:
-            command_list += ["--token", token]
+        elif credentials.token:
+            command_list += ["--server", credentials.server,
+                             "--token", credentials.token]
         else:
-            command_list += ["--user", username,
-                             "--password", password]
+            command_list += ["--server", credentials.server,
+                             "--user", credentials.user,
+                             "--password", credentials.password]
 
-        command_list += ["--server", server,
-                         "search",
+        command_list += ["search",
                          "--project", self.config["project"],
-                         "--output", self.config["output"],
-                         "--query", self.config["query"]]
+                         "--output", output_dir,
+                         "--query", query]
 
-        for field in self.config["fields"]:
-            command_list.append("--field")
-            command_list.append(field)
+        command_list += get_field_arguments(self.config["fields"], extra_fields)
 
         ret = self._run_pypolarioncli(command_list)
 
@@ -170,13 +407,7 @@ class Polarion:  # pylint: disable=too-few-public-methods
             print("Error while running pyPolarionCli!")
             print(ret.stderr)
         else:
-
-            try:
-                with open(output_file_name, "r", encoding="utf-8") as file:
-                    output = json.load(file)
-            except Exception as e:  # pylint: disable=broad-except
-                LOG.error(
-                    "An error occurred loading the Polarion results from file: %s", e)
+            output = output_file_name
 
         return output
 
@@ -185,6 +416,174 @@ class Polarion:  # pylint: disable=too-few-public-methods
 # Functions
 ################################################################################
 
+
+def _get_updated_since_query(watermark: str) -> str:
+    """
+    Get the Polarion query for work items updated since the watermark.
+
+    Args:
+        watermark (str): The UTC timestamp of the last update, see to_utc_timestamp().
+
+    Returns:
+        str: The Polarion query.
+    """
+    since = datetime.datetime.fromisoformat(watermark) - _WATERMARK_OVERLAP
+
+    return f"updated:[{since.strftime(_QUERY_DATE_FORMAT)} TO {_QUERY_MAX_DATE}]"
+
+
+def _is_partitioned(polarion_config: dict) -> bool:
+    """
+    Check whether a query is split into partitions. Only a list of clauses
+    or a dictionary are partitions of Polarion, other values like a number
+    of partitions, as used for Jira, are ignored.
+
+    Args:
+        polarion_config (dict): The 'polarion_config'.
+
+    Returns:
+        bool: True if the query is split into partitions, False otherwise.
+    """
+    return isinstance(polarion_config.get("partitions"), (list, dict))
+
+
+def get_partition_clauses(partitions, today: datetime.date) -> list:
+    """
+    Get the query clauses of the partitions of a query. "partitions" is either
+    - a list of clauses, e.g. ["type:requirement", "NOT type:requirement"],
+    - {"by": "type", "values": [...]}: a partition per work item type and one
+      for all other types,
+    - {"by": "created", "start": "YYYY-MM-DD", "count": n}: n ranges of the
+      creation date, all work items created before start and n - 1 ranges of
+      equal length from start until today. The last range includes all newer
+      work items.
+
+    Args:
+        partitions: The "partitions" of the 'polarion_config'.
+        today (datetime.date): The current date.
+
+    Returns:
+        list: The query clauses.
+
+    Raises:
+        ValueError: If the partitions are invalid.
+    """
+    if isinstance(partitions, list):
+        clauses = [str(clause) for clause in partitions]
+    elif not isinstance(partitions, dict):
+        raise ValueError("'partitions' must be a list of clauses or a dictionary")
+    elif partitions.get("by") == "type":
+        values = [str(value) for value in partitions.get("values", [])]
+        clauses = [f"type:{value}" for value in values]
+        clauses += ["NOT (" + " OR ".join(clauses) + ")"] if len(clauses) > 0 else []
+    elif partitions.get("by") == "created":
+        try:
+            start = datetime.date.fromisoformat(str(partitions["start"]))
+        except (KeyError, ValueError) as e:
+            raise ValueError("'start' must be a date in the format YYYY-MM-DD") from e
+
+        if int(partitions.get("count", 0)) < 2:
+            raise ValueError("'count' must be at least 2")
+
+        clauses = _get_created_clauses(start, today, int(partitions["count"]))
+    else:
+        raise ValueError("'by' must be \"type\" or \"created\"")
+
+    if len(clauses) == 0:
+        raise ValueError("no partition given")
+
+    return clauses
+
+
+def _get_created_clauses(start: datetime.date, today: datetime.date, count: int) -> list:
+    """
+    Get the query clauses of disjoint ranges of the creation date, which
+    together cover all work items. Polarion compares dates by days, so the
+    ranges include their first and their last day.
+
+    Args:
+        start (datetime.date): The start of the second range.
+        today (datetime.date): The current date.
+        count (int): The number of ranges, at least 2.
+
+    Returns:
+        list: The query clauses, oldest range first.
+    """
+    days = max((today - start).days + 1, 1)
+    boundaries = [start]
+
+    for index in range(1, count - 1):
+        boundary = start + datetime.timedelta(days=days * index // (count - 1))
+
+        if boundary > boundaries[-1]:
+            boundaries.append(boundary)
+
+    dates = [boundary.strftime(_QUERY_DATE_FORMAT) for boundary in boundaries]
+    last_days = [(boundary - datetime.timedelta(days=1)).strftime(_QUERY_DATE_FORMAT)
+                 for boundary in boundaries]
+    ranges = zip([_QUERY_MIN_DATE] + dates, last_days + [_QUERY_MAX_DATE])
+
+    return [f"created:[{first} TO {last}]" for first, last in ranges]
+
+
+def _merge_partitions(partitions: list) -> dict:
+    """
+    Merge the search results of the partitions of a query, in their order.
+    Work items found by several partitions are kept only once. Work items
+    without id are always kept, as they can not be told apart.
+
+    Args:
+        partitions (list): The search results of each partition.
+
+    Returns:
+        dict: The search results of the first partition with the work items of all partitions.
+    """
+    output = partitions[0]
+    items_key = find_items_key(output, WORK_ITEMS_KEY)
+    work_items = []
+    known_ids = set()
+
+    for partition in partitions:
+        for work_item in partition.get(find_items_key(partition, WORK_ITEMS_KEY), []):
+            if work_item.get("id") is None:
+                work_items.append(work_item)
+            else:
+                work_item_id = _get_work_item_id(work_item)
+
+                if work_item_id not in known_ids:
+                    known_ids.add(work_item_id)
+                    work_items.append(work_item)
+
+    output[items_key] = work_items
+
+    return output
+
+
+def _get_work_item_id(work_item: dict) -> str:
+    """
+    Get the unique id of a work item.
+
+    Args:
+        work_item (dict): The work item of the search results.
+
+    Returns:
+        str: The work item id.
+    """
+    return str(work_item.get("id"))
+
+
+def _get_work_item_updated(work_item: dict) -> Optional[str]:
+    """
+    Get the time of the last update of a work item.
+
+    Args:
+        work_item (dict): The work item of the search results.
+
+    Returns:
+        Optional[str]: The UTC timestamp or None if not available.
+    """
+    return to_utc_timestamp(work_item.get("updated"))
+
 ################################################################################
 # Main
 ################################################################################
@@ -0,0 +1,345 @@
+"""
+Shared asyncio engine running the tool processes with timeouts, cancellation and retries.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import re
+import signal
+import random
+import asyncio
+import logging
+import threading
+import subprocess
+import concurrent.futures
+from asyncio.subprocess import PIPE, Process
+from typing import Optional
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# Return code of a process which was killed after its timeout, like timeout(1).
+RETURN_CODE_TIMEOUT = 124
+
+# Return code of a process which was cancelled, like after SIGINT.
+RETURN_CODE_CANCELLED = 130
+
+# Return code if the executable could not be started, like a shell.
+RETURN_CODE_NOT_STARTED = 127
+
+# Default seconds until a tool process is killed.
+DEFAULT_TIMEOUT = 3600
+
+# Default number of retries after a transient failure.
+DEFAULT_RETRIES = 2
+
+# Default maximum number of tool processes running at the same time.
+DEFAULT_MAX_PROCESSES = 8
+
+# Seconds before the first retry, doubled for each further retry.
+_BACKOFF_BASE = 2.0
+_BACKOFF_MAX = 60.0
+
+# Output of the tools which indicates a transient failure, e.g. of the network.
+_TRANSIENT_PATTERN = re.compile(r"time[ds]?[ -]?out|connection|temporar|unavailable|"
+                                r"too many requests|\b(?:429|502|503|504)\b",
+                                re.IGNORECASE)
+
+# The engine shared by all wrappers of this process.
+_engine: Optional["ProcessEngine"] = None
+_engine_lock = threading.Lock()
+
+################################################################################
+# Classes
+################################################################################
+
+
+class ProcessEngine:
+    """
+    Runs the tool processes on an asyncio event loop in a background thread,
+    shared by all searches and uploads of the process. Each call has a
+    timeout, after which the process is killed, and may be retried with
+    exponential backoff after a transient failure. At most max_processes
+    tool processes run at the same time, further calls wait.
+    cancel() kills all running processes and cancels all further calls,
+    e.g. on SIGINT or SIGTERM.
+    """
+
+    def __init__(self, max_processes: int = DEFAULT_MAX_PROCESSES) -> None:
+        """
+        Initializes the engine. The event loop is started by the first call.
+
+        Args:
+            max_processes (int): Maximum number of processes running at the same time.
+        """
+        self.max_processes = max(1, max_processes)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._is_cancelled = False
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        Get the event loop of the engine, started in a background thread if needed.
+
+        Returns:
+            asyncio.AbstractEventLoop: The event loop.
+        """
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever,
+                                 name="process_engine",
+                                 daemon=True).start()
+
+            return self._loop
+
+    def run(self,  # pylint: disable=too-many-arguments
+            args: list,
+            timeout: Optional[float] = DEFAULT_TIMEOUT,
+            retries: int = DEFAULT_RETRIES,
+            pass_fds: tuple = (),
+            retry_timeout: bool = False) -> subprocess.CompletedProcess:
+        """
+        Run a process and wait for its result. Can be called from any thread.
+
+        Args:
+            args (list): The executable and its arguments.
+            timeout (Optional[float]): Seconds until the process is killed, None for no limit.
+            retries (int): Number of retries after a transient failure.
+            pass_fds (tuple): File descriptors inherited by the process.
+            retry_timeout (bool): Whether a process which timed out is retried.
+                A retried timeout multiplies the time until a hanging process
+                fails, and a process which is not idempotent, like an upload,
+                may have taken effect before its timeout. Default: False
+
+        Returns:
+            subprocess.CompletedProcess[bytes]: The result of the last attempt.
+                The return code is RETURN_CODE_TIMEOUT if it timed out and
+                RETURN_CODE_CANCELLED if it was cancelled.
+        """
+        result = subprocess.CompletedProcess(args, RETURN_CODE_CANCELLED, b"", b"Cancelled.")
+
+        if self._is_cancelled is False:
+            future = asyncio.run_coroutine_threadsafe(
+                self._run_with_retries(args, timeout, retries, pass_fds, retry_timeout),
+                self._get_loop())
+
+            try:
+                result = future.result()
+            except concurrent.futures.CancelledError:
+                pass
+
+        return result
+
+    def cancel(self) -> None:
+        """
+        Cancel all running calls, which kills their processes,
+        and all calls made afterwards.
+        """
+        with self._lock:
+            self._is_cancelled = True
+            loop = self._loop
+
+        if loop is not None:
+            def cancel_tasks() -> None:
+                for task in asyncio.all_tasks(loop):
+                    task.cancel()
+
+            loop.call_soon_threadsafe(cancel_tasks)
+
+    async def _run_with_retries(self,  # pylint: disable=too-many-arguments
+                                args: list,
+                                timeout: Optional[float],
+                                retries: int,
+                                pass_fds: tuple,
+                                retry_timeout: bool) -> subprocess.CompletedProcess:
+        """
+        Run a process and retry it after transient failures.
+
+        Args:
+            args (list): The executable and its arguments.
+            timeout (Optional[float]): Seconds until the process is killed, None for no limit.
+            retries (int): Number of retries after a transient failure.
+            pass_fds (tuple): File descriptors inherited by the process.
+            retry_timeout (bool): Whether a process which timed out is retried.
+
+        Returns:
+            subprocess.CompletedProcess[bytes]: The result of the last attempt.
+        """
+        attempt = 0
+        result = await self._run_once(args, timeout, pass_fds)
+
+        while (attempt < retries) and (_is_transient(result, retry_timeout) is True):
+            delay = _get_backoff(attempt)
+            attempt += 1
+
+            LOG.warning("%s failed with return code %d, retry %d of %d in %.1f s.",
+                        args[0], result.returncode, attempt, retries, delay)
+
+            await asyncio.sleep(delay)
+            result = await self._run_once(args, timeout, pass_fds)
+
+        return result
+
+    async def _run_once(self,
+                        args: list,
+                        timeout: Optional[float],
+                        pass_fds: tuple) -> subprocess.CompletedProcess:
+        """
+        Run a process once, waiting for a free slot first.
+
+        Args:
+            args (list): The executable and its arguments.
+            timeout (Optional[float]): Seconds until the process is killed, None for no limit.
+            pass_fds (tuple): File descriptors inherited by the process.
+
+        Returns:
+            subprocess.CompletedProcess[bytes]: The result of the process.
+        """
+        # The semaphore is only used by the thread of the event loop.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_processes)
+
+        async with self._semaphore:
+            # Calls submitted while cancel() was running are not cancelled by it.
+            if self._is_cancelled is True:
+                raise asyncio.CancelledError()
+
+            try:
+                # On POSIX the tool gets its own process group, so its child
+                # processes are killed with it and do not keep the pipes open.
+                process = await asyncio.create_subprocess_exec(*args, stdout=PIPE, stderr=PIPE,
+                                                               start_new_session=os.name == "posix",
+                                                               pass_fds=pass_fds)
+            except OSError as e:
+                return subprocess.CompletedProcess(args, RETURN_CODE_NOT_STARTED,
+                                                   b"", str(e).encode("utf-8"))
+
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                await _kill(process)
+                LOG.error("%s timed out after %s s and was killed.", args[0], timeout)
+                return subprocess.CompletedProcess(args, RETURN_CODE_TIMEOUT, b"",
+                                                   f"Timed out after {timeout} s.".encode("utf-8"))
+            except asyncio.CancelledError:
+                await _kill(process)
+                raise
+
+        return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
+################################################################################
+# Functions
+################################################################################
+
+
+async def _kill(process: Process) -> None:
+    """
+    Kill a process, on POSIX with its process group, and wait for its end.
+
+    Args:
+        process (Process): The process.
+    """
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+    await process.wait()
+
+
+def _get_backoff(attempt: int) -> float:
+    """
+    Get the seconds to wait before a retry: exponential backoff,
+    limited to _BACKOFF_MAX, with a random jitter of up to half of it.
+
+    Args:
+        attempt (int): Number of retries done so far, starting with 0.
+
+    Returns:
+        float: The seconds to wait.
+    """
+    return min(_BACKOFF_MAX, _BACKOFF_BASE * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+def _is_transient(result: subprocess.CompletedProcess, is_timeout_transient: bool = False) -> bool:
+    """
+    Check if a failed process may succeed if retried: its output indicates
+    a network or server problem, or it timed out and timeouts are transient.
+
+    Args:
+        result (subprocess.CompletedProcess): The result of the process.
+        is_timeout_transient (bool): Whether a timeout counts as transient.
+
+    Returns:
+        bool: True if the failure is transient, False if the process succeeded
+            or the failure is permanent.
+    """
+    is_transient = False
+
+    if result.returncode == RETURN_CODE_TIMEOUT:
+        is_transient = is_timeout_transient
+    elif result.returncode not in (0, RETURN_CODE_CANCELLED, RETURN_CODE_NOT_STARTED):
+        output = (result.stderr or b"") + b"\n" + (result.stdout or b"")
+        is_transient = _TRANSIENT_PATTERN.search(output.decode("utf-8", "replace")) is not None
+
+    return is_transient
+
+
+def get_engine() -> ProcessEngine:
+    """
+    Get the engine shared by all wrappers of this process.
+
+    Returns:
+        ProcessEngine: The engine.
+    """
+    global _engine  # pylint: disable=global-statement
+
+    with _engine_lock:
+        if _engine is None:
+            _engine = ProcessEngine()
+
+        return _engine
+
+################################################################################
+# Main
+################################################################################
@@ -0,0 +1,230 @@
+"""
+Planner which runs identical searches of several adapters only once.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import copy
+import json
+
+from pyMetricCli.adapter_interface import AdapterInterface
+from pyMetricCli.process_engine import DEFAULT_TIMEOUT, DEFAULT_RETRIES
+
+################################################################################
+# Variables
+################################################################################
+
+# Configuration keys which do not change the search itself.
+_IGNORED_CONFIG_KEYS = ("fields", "file", "output", "stream", "partitions", "timeout", "retries",
+                        "retry_timeout")
+
+# Keys of the search configuration merged as the maximum of the adapters, with their defaults.
+_MAX_CONFIG_KEYS = {
+    "partitions": 1,
+    "timeout": DEFAULT_TIMEOUT,
+    "retries": DEFAULT_RETRIES
+}
+
+################################################################################
+# Classes
+################################################################################
+
+
+class PlannedSearch:  # pylint: disable=too-few-public-methods
+    """
+    A distinct search and the adapters which need its results.
+    The search requests the union of the fields of all these adapters.
+    Its results are only streamed if all these adapters stream them.
+    It uses the largest timeout and number of retries of these adapters,
+    an adapter without them counts with their defaults, and retries a
+    timeout if any of these adapters does. Settings which no
+    adapter sets stay unset. A Jira search is split into the largest number
+    of partitions of these adapters. Partition clauses of Polarion are taken
+    from the first adapter setting them, as they must cover the whole query anyway.
+    """
+
+    def __init__(self, config: dict) -> None:
+        """
+        Initializes the planned search.
+
+        Args:
+            config (dict): The search configuration of the first adapter.
+        """
+        self.config = copy.deepcopy(config)
+        self.config["fields"] = list(config.get("fields", []))
+        self.adapter_indices = []
+
+    def add_adapter(self, index: int, config: dict) -> None:
+        """
+        Add an adapter which needs the results of this search.
+
+        Args:
+            index (int): The index of the adapter.
+            config (dict): The search configuration of the adapter.
+        """
+        fields = config.get("fields", [])
+
+        if len(self.adapter_indices) > 0:
+            # An empty field list requests all fields.
+            if (len(fields) == 0) or (len(self.config["fields"]) == 0):
+                self.config["fields"] = []
+            else:
+                self.config["fields"] += [field for field in fields
+                                          if field not in self.config["fields"]]
+
+            self.config["stream"] = (self.config.get("stream") is True) and \
+                (config.get("stream") is True)
+
+            if ("retry_timeout" in self.config) or ("retry_timeout" in config):
+                self.config["retry_timeout"] = (self.config.get("retry_timeout") is True) or \
+                    (config.get("retry_timeout") is True)
+
+            for key, default in _MAX_CONFIG_KEYS.items():
+                if (key in self.config) or (key in config):
+                    self.config[key] = _get_maximum(self.config.get(key, default),
+                                                    config.get(key, default))
+
+        self.adapter_indices.append(index)
+
+
+class QueryPlanner:
+    """
+    Groups the Jira and Polarion searches of several adapters by their
+    normalized configuration, so each distinct search runs only once and
+    its results are passed to all adapters which need them.
+    """
+
+    def __init__(self) -> None:
+        self._jira_searches = {}
+        self._polarion_searches = {}
+
+    @property
+    def jira_searches(self) -> list:
+        """
+        The distinct Jira searches.
+        """
+        return list(self._jira_searches.values())
+
+    @property
+    def polarion_searches(self) -> list:
+        """
+        The distinct Polarion searches.
+        """
+        return list(self._polarion_searches.values())
+
+    def add_adapter(self, index: int, adapter: AdapterInterface) -> None:
+        """
+        Add the searches of an adapter to the plan.
+        Jira is ignored if the filter is empty, Polarion if the query is empty.
+
+        Args:
+            index (int): The index of the adapter.
+            adapter (AdapterInterface): The adapter.
+        """
+        if adapter.jira_config.get("filter", "") != "":
+            _add_search(self._jira_searches, index, adapter.jira_config, "filter")
+
+        if adapter.polarion_config.get("query", "") != "":
+            _add_search(self._polarion_searches, index, adapter.polarion_config, "query")
+
+################################################################################
+# Functions
+################################################################################
+
+
+def _get_search_key(config: dict, query_key: str) -> str:
+    """
+    Get the key of a search, which is equal for searches that only
+    differ in the requested fields or in the whitespace of the query.
+
+    Args:
+        config (dict): The search configuration.
+        query_key (str): The key of the filter or query in the configuration.
+
+    Returns:
+        str: The search key.
+    """
+    normalized = {key: value for key, value in config.items()
+                  if key not in _IGNORED_CONFIG_KEYS}
+    normalized[query_key] = " ".join(str(config[query_key]).split())
+
+    return json.dumps(normalized, sort_keys=True, default=str)
+
+
+def _get_maximum(first, second):
+    """
+    Get the larger of two settings of the adapters sharing a search.
+    None is larger than any number, as it means no limit, e.g. for the timeout.
+    A setting which is not a number, e.g. the partition clauses of Polarion,
+    is preferred to a number, as the number is a default then.
+
+    Args:
+        first: The setting of the planned search.
+        second: The setting of the added adapter.
+
+    Returns:
+        The larger setting, the first if both are not numbers.
+    """
+    maximum = first
+
+    if (first is None) or (second is None):
+        maximum = None
+    elif isinstance(first, (int, float)) and isinstance(second, (int, float)):
+        maximum = max(first, second)
+    elif isinstance(first, (int, float)):
+        maximum = second
+
+    return maximum
+
+
+def _add_search(searches: dict, index: int, config: dict, query_key: str) -> None:
+    """
+    Add a search of an adapter to the distinct searches.
+
+    Args:
+        searches (dict): The distinct searches by their search key.
+        index (int): The index of the adapter.
+        config (dict): The search configuration of the adapter.
+        query_key (str): The key of the filter or query in the configuration.
+    """
+    key = _get_search_key(config, query_key)
+
+    if key not in searches:
+        searches[key] = PlannedSearch(config)
+
+    searches[key].add_adapter(index, config)
+
+################################################################################
+# Main
+################################################################################
@@ -0,0 +1,230 @@
+"""
+Persistent cache for the search results of Jira and Polarion.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Optional
+
+from pyMetricCli.paths import get_cache_dir, make_private_dir
+from pyMetricCli.serializer import dump_file, load_file
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# Default time to live of a cache entry in seconds.
+DEFAULT_TTL = 300
+
+# Default maximum size of all cache entries in bytes.
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+_CACHE_SUB_DIR_NAME = "results"
+_ENTRY_FILE_EXTENSION = ".json"
+
+################################################################################
+# Classes
+################################################################################
+
+
+class ResultCache:
+    """
+    Content-addressed cache for search results, stored as files on disk.
+    Each entry expires after its time to live. If the size of all entries
+    exceeds the maximum size, the least recently used entries are removed.
+    The entries are not encrypted, so the directory is only accessible by
+    the current user.
+    """
+
+    def __init__(self,
+                 directory: Optional[str] = None,
+                 ttl: int = DEFAULT_TTL,
+                 max_size: int = DEFAULT_MAX_SIZE,
+                 refresh: bool = False) -> None:
+        """
+        Initializes the cache.
+
+        Args:
+            directory (Optional[str]): Directory of the cache entries.
+                Defaults to a sub directory of the pyMetricCli cache directory.
+            ttl (int): Default time to live of an entry in seconds.
+            max_size (int): Maximum size of all entries in bytes.
+            refresh (bool): If True, entries are never read, but still written.
+        """
+        if directory is None:
+            directory = os.path.join(get_cache_dir(), _CACHE_SUB_DIR_NAME)
+
+        self.directory = directory
+        self.ttl = ttl
+        self.max_size = max_size
+        self.refresh = refresh
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        """
+        Build the cache key from the parts which identify a search.
+        The order of the parts does not matter.
+
+        Args:
+            parts: The search parameters, e.g. server, filter and fields.
+
+        Returns:
+            str: The cache key.
+        """
+        normalized = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def _get_entry_path(self, key: str) -> str:
+        """
+        Get the path of the file storing the entry with the given key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            str: Path to the entry file.
+        """
+        return os.path.join(self.directory, key + _ENTRY_FILE_EXTENSION)
+
+    def get(self, key: str, ttl: Optional[int] = None) -> Optional[dict]:
+        """
+        Get the search results stored with the given key.
+
+        Args:
+            key (str): The cache key.
+            ttl (Optional[int]): Time to live in seconds for this lookup.
+                Defaults to the time to live of the cache.
+
+        Returns:
+            Optional[dict]: The search results or None if there is no valid entry.
+        """
+        results = None
+
+        if ttl is None:
+            ttl = self.ttl
+
+        if self.refresh is False:
+            entry_path = self._get_entry_path(key)
+
+            try:
+                entry = load_file(entry_path)
+
+                if (time.time() - entry["created"]) <= ttl:
+                    results = entry["results"]
+
+                    # The modification time tracks the last use for the eviction.
+                    os.utime(entry_path)
+                    LOG.info("Using cached search results %s.", key)
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                LOG.warning("The cached search results %s could not be read: %s", key, e)
+
+        return results
+
+    def put(self, key: str, results: dict) -> None:
+        """
+        Store the search results with the given key.
+        Errors are only logged, as the cache is not essential.
+
+        Args:
+            key (str): The cache key.
+            results (dict): The search results.
+        """
+        entry_path = self._get_entry_path(key)
+        temp_file_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        try:
+            make_private_dir(self.directory)
+
+            dump_file({"created": time.time(), "results": results}, temp_file_path)
+
+            # Replace the file at once, so other processes never read a partial file.
+            os.replace(temp_file_path, entry_path)
+        except (OSError, TypeError, ValueError) as e:
+            LOG.warning("The search results could not be cached: %s", e)
+            return
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used entries until the size of all entries
+        is within the maximum size.
+        """
+        with self._lock:
+            entries = []
+            total_size = 0
+
+            try:
+                with os.scandir(self.directory) as directory_entries:
+                    for directory_entry in directory_entries:
+                        if directory_entry.name.endswith(_ENTRY_FILE_EXTENSION):
+                            stat = directory_entry.stat()
+                            entries.append((stat.st_mtime, stat.st_size, directory_entry.path))
+                            total_size += stat.st_size
+            except OSError as e:
+                LOG.warning("The result cache could not be read: %s", e)
+                return
+
+            # Oldest use first.
+            entries.sort()
+
+            for _, size, path in entries:
+                if total_size <= self.max_size:
+                    break
+
+                try:
+                    os.remove(path)
+                    total_size -= size
+                except OSError:
+                    # Removed in the meantime by another process.
+                    pass
+
+################################################################################
+# Functions
+################################################################################
+
+################################################################################
+# Main
+################################################################################
@@ -0,0 +1,276 @@
+"""
+Pluggable JSON serialization, using orjson or msgspec if installed.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import json
+import logging
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# Environment variable to select the serializer: "orjson", "msgspec" or "json".
+SERIALIZER_ENV = "PYMETRICCLI_SERIALIZER"
+
+# The serializer used by the functions of this module, see get_serializer().
+_active: Optional["JsonSerializer"] = None
+
+################################################################################
+# Classes
+################################################################################
+
+
+class JsonSerializer:
+    """
+    Serializer using the json module of the standard library.
+    Its results are the reference for the faster serializers, which fall
+    back to it for content they do not support, e.g. integers beyond 64 bit.
+    """
+
+    name = "json"
+
+    def dumps(self, content, pretty: bool = False) -> bytes:
+        """
+        Serialize content to JSON.
+
+        Args:
+            content: The content, e.g. a dictionary.
+            pretty (bool): True to indent by 2 spaces for humans,
+                False for compact JSON for machines.
+
+        Returns:
+            bytes: The UTF-8 encoded JSON.
+        """
+        if pretty is True:
+            text = json.dumps(content, indent=2)
+        else:
+            text = json.dumps(content, separators=(",", ":"))
+
+        return text.encode("utf-8")
+
+    def loads(self, data):
+        """
+        Deserialize JSON.
+
+        Args:
+            data (bytes or str): The JSON.
+
+        Returns:
+            The content.
+
+        Raises:
+            ValueError: If the JSON is invalid.
+        """
+        return json.loads(data)
+
+
+class OrjsonSerializer(JsonSerializer):
+    """
+    Serializer using orjson. Integers beyond 64 bit are decoded as float.
+    """
+
+    name = "orjson"
+
+    def dumps(self, content, pretty: bool = False) -> bytes:
+        # pylint: disable=no-member
+        option = orjson.OPT_NON_STR_KEYS
+
+        if pretty is True:
+            option |= orjson.OPT_INDENT_2
+
+        try:
+            data = orjson.dumps(content, option=option)
+        except TypeError:
+            data = super().dumps(content, pretty)
+
+        return data
+
+    def loads(self, data):
+        # pylint: disable=no-member
+        try:
+            content = orjson.loads(data)
+        except orjson.JSONDecodeError:
+            content = json.loads(data)
+
+        return content
+
+
+class MsgspecSerializer(JsonSerializer):
+    """
+    Serializer using msgspec.
+    """
+
+    name = "msgspec"
+
+    def dumps(self, content, pretty: bool = False) -> bytes:
+        try:
+            data = msgspec.json.encode(content)
+
+            if pretty is True:
+                data = msgspec.json.format(data, indent=2)
+        except (TypeError, OverflowError, msgspec.MsgspecError):
+            data = super().dumps(content, pretty)
+
+        return data
+
+    def loads(self, data):
+        try:
+            content = msgspec.json.decode(data)
+        except msgspec.DecodeError:
+            content = json.loads(data)
+
+        return content
+
+################################################################################
+# Functions
+################################################################################
+
+
+def get_serializer() -> JsonSerializer:
+    """
+    Get the serializer used by this module. It is selected by the
+    PYMETRICCLI_SERIALIZER environment variable, by default the first
+    installed of orjson, msgspec and json.
+
+    Returns:
+        JsonSerializer: The serializer.
+    """
+    global _active  # pylint: disable=global-statement
+
+    if _active is None:
+        available = {"json": JsonSerializer}
+
+        if msgspec is not None:
+            available["msgspec"] = MsgspecSerializer
+
+        if orjson is not None:
+            available["orjson"] = OrjsonSerializer
+
+        name = os.environ.get(SERIALIZER_ENV, "")
+
+        if name not in available:
+            if name != "":
+                LOG.warning("Serializer '%s' is not available.", name)
+
+            name = next(name for name in ("orjson", "msgspec", "json") if name in available)
+
+        _active = available[name]()
+
+    return _active
+
+
+def set_serializer(serializer: Optional[JsonSerializer]) -> None:
+    """
+    Set the serializer used by this module.
+
+    Args:
+        serializer (Optional[JsonSerializer]): The serializer, None to select
+            it again, see get_serializer().
+    """
+    global _active  # pylint: disable=global-statement
+    _active = serializer
+
+
+def dumps(content, pretty: bool = False) -> bytes:
+    """
+    Serialize content to JSON, see JsonSerializer.dumps().
+
+    Args:
+        content: The content, e.g. a dictionary.
+        pretty (bool): True to indent for humans, False for compact JSON.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON.
+    """
+    return get_serializer().dumps(content, pretty)
+
+
+def loads(data):
+    """
+    Deserialize JSON, see JsonSerializer.loads().
+
+    Args:
+        data (bytes or str): The JSON.
+
+    Returns:
+        The content.
+    """
+    return get_serializer().loads(data)
+
+
+def dump_file(content, file_path: str, pretty: bool = False) -> None:
+    """
+    Write content as JSON file.
+
+    Args:
+        content: The content, e.g. a dictionary.
+        file_path (str): Path to the file.
+        pretty (bool): True to indent for humans, False for compact JSON.
+    """
+    with open(file_path, "wb") as file:
+        file.write(dumps(content, pretty))
+
+
+def load_file(file_path: str):
+    """
+    Read a JSON file at once, which is faster than parsing it from the file object.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        The content.
+    """
+    with open(file_path, "rb") as file:
+        return loads(file.read())
+
+################################################################################
+# Main
+################################################################################
@@ -0,0 +1,385 @@
+"""
+Long-running service which runs the adapters on their schedules and
+on demand via a local HTTP endpoint.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import copy
+import logging
+import datetime
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Tuple
+
+from pyMetricCli.ret import Ret
+from pyMetricCli.cron import CronSchedule
+from pyMetricCli.serializer import dumps
+from pyMetricCli.adapter_interface import AdapterInterface
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# Schedule of adapters without 'schedule' attribute.
+DEFAULT_SCHEDULE = "0 * * * *"
+
+# Default address of the HTTP endpoint.
+DEFAULT_LISTEN_ADDRESS = "127.0.0.1:8765"
+
+################################################################################
+# Classes
+################################################################################
+
+
+class ScheduledAdapter:  # pylint: disable=too-few-public-methods
+    """
+    An adapter loaded by the service, with its schedule and last run.
+    """
+
+    def __init__(self,
+                 adapter_file: str,
+                 adapter: AdapterInterface,
+                 schedule: CronSchedule) -> None:
+        """
+        Initializes the scheduled adapter.
+
+        Args:
+            adapter_file (str): The adapter file.
+            adapter (AdapterInterface): The loaded adapter.
+            schedule (CronSchedule): The schedule of the adapter.
+        """
+        self.adapter_file = adapter_file
+        self.adapter = adapter
+        self.schedule = schedule
+        # Handlers usually accumulate into the output, so each run starts with the initial one.
+        self.initial_output = copy.deepcopy(adapter.output)
+        self.next_run = schedule.get_next_time(datetime.datetime.now())
+        self.last_run: Optional[dict] = None
+
+    def reset_output(self) -> None:
+        """
+        Reset the output of the adapter to its initial values.
+        """
+        self.adapter.output.clear()
+        self.adapter.output.update(copy.deepcopy(self.initial_output))
+
+    def get_status(self) -> dict:
+        """
+        Get the status of the adapter.
+
+        Returns:
+            dict: The status, serializable to JSON.
+        """
+        return {"adapter_file": self.adapter_file,
+                "schedule": self.schedule.expression,
+                "next_run": self.next_run.isoformat(),
+                "last_run": self.last_run}
+
+
+class MetricService:
+    """
+    Runs loaded adapters on their cron schedules within one process, so
+    the adapters, the tool detection, the result cache and the outbox stay
+    loaded between runs. Runs can also be triggered via HTTP:
+
+    - GET /status returns the status of all adapters as JSON.
+    - POST /run runs all adapters, POST /run?adapter=<file> a single one.
+
+    Only one run is active at a time. Adapters due at the same time are run
+    together, so they share their searches.
+    """
+
+    def __init__(self,
+                 adapters: list,
+                 run_adapters: Callable[[list], list],
+                 default_schedule: str = DEFAULT_SCHEDULE) -> None:
+        """
+        Initializes the service.
+
+        Args:
+            adapters (list): Tuples of the adapter file and the loaded adapter.
+            run_adapters (Callable[[list], list]): Runs the given loaded adapters,
+                see run_loaded_adapters() of the pipeline. Returns the status of each adapter.
+            default_schedule (str): Schedule of adapters without 'schedule' attribute.
+
+        Raises:
+            ValueError: If a schedule is invalid.
+        """
+        self._run_adapters = run_adapters
+        self._run_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._wake_up = threading.Event()
+        self._is_stopped = False
+        self._pending_files: set = set()
+        self.adapters = [ScheduledAdapter(adapter_file,
+                                          adapter,
+                                          CronSchedule(getattr(adapter, "schedule",
+                                                               default_schedule)))
+                         for adapter_file, adapter in adapters]
+
+    def get_status(self) -> dict:
+        """
+        Get the status of the service and all adapters.
+
+        Returns:
+            dict: The status, serializable to JSON.
+        """
+        with self._state_lock:
+            return {"running": self._run_lock.locked(),
+                    "pending": sorted(self._pending_files),
+                    "adapters": [scheduled.get_status() for scheduled in self.adapters]}
+
+    def trigger(self, adapter_file: Optional[str] = None) -> bool:
+        """
+        Request a run of all adapters or a single one, as soon as possible.
+
+        Args:
+            adapter_file (Optional[str]): The adapter file, None for all adapters.
+
+        Returns:
+            bool: True if the run was requested, False if the adapter is unknown.
+        """
+        adapter_files = [scheduled.adapter_file for scheduled in self.adapters
+                         if adapter_file in (None, scheduled.adapter_file)]
+
+        with self._state_lock:
+            self._pending_files.update(adapter_files)
+
+        self._wake_up.set()
+
+        return len(adapter_files) > 0
+
+    def run(self, scheduled_adapters: list) -> list:
+        """
+        Run the given adapters together.
+
+        Args:
+            scheduled_adapters (list): The scheduled adapters to run.
+
+        Returns:
+            list: The return status of each adapter.
+        """
+        with self._run_lock:
+            started = datetime.datetime.now()
+
+            for scheduled in scheduled_adapters:
+                scheduled.reset_output()
+
+            try:
+                results = self._run_adapters([(Ret.OK, scheduled.adapter)
+                                              for scheduled in scheduled_adapters])
+            except Exception as e:  # pylint: disable=broad-except
+                LOG.error("An error occurred running the adapters: %s", e)
+                results = [Ret.ERROR] * len(scheduled_adapters)
+
+            finished = datetime.datetime.now()
+
+            with self._state_lock:
+                for scheduled, ret_status in zip(scheduled_adapters, results):
+                    scheduled.last_run = {"started": started.isoformat(),
+                                          "finished": finished.isoformat(),
+                                          "status": Ret(ret_status).name}
+
+                    LOG.info("%s: %s", scheduled.adapter_file, Ret(ret_status).name)
+
+        return results
+
+    def _get_due_adapters(self, now: datetime.datetime) -> list:
+        """
+        Get the adapters which are due or were triggered, and schedule their next run.
+
+        Args:
+            now (datetime.datetime): The current time.
+
+        Returns:
+            list: The scheduled adapters to run.
+        """
+        due_adapters = []
+
+        with self._state_lock:
+            for scheduled in self.adapters:
+                if (scheduled.next_run <= now) or (scheduled.adapter_file in self._pending_files):
+                    due_adapters.append(scheduled)
+
+                    if scheduled.next_run <= now:
+                        scheduled.next_run = scheduled.schedule.get_next_time(now)
+
+            self._pending_files.clear()
+
+        return due_adapters
+
+    def run_scheduler(self) -> None:
+        """
+        Run the adapters on their schedules until stop() is called.
+        """
+        while self._is_stopped is False:
+            now = datetime.datetime.now()
+            due_adapters = self._get_due_adapters(now)
+
+            if len(due_adapters) > 0:
+                self.run(due_adapters)
+            else:
+                next_run = min(scheduled.next_run for scheduled in self.adapters)
+                self._wake_up.wait(max(0.0, (next_run - now).total_seconds()))
+                self._wake_up.clear()
+
+    def stop(self) -> None:
+        """
+        Stop the scheduler after the active run.
+        """
+        self._is_stopped = True
+        self._wake_up.set()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles the HTTP requests to the service.
+    """
+
+    def _send_json(self, status_code: int, content: dict) -> None:
+        """
+        Send a JSON response.
+
+        Args:
+            status_code (int): The HTTP status code.
+            content (dict): The content of the response.
+        """
+        body = dumps(content, pretty=True)
+
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """
+        Handle GET requests.
+        """
+        if urllib.parse.urlsplit(self.path).path == "/status":
+            self._send_json(200, self.server.service.get_status())
+        else:
+            self._send_json(404, {"error": "Unknown path."})
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """
+        Handle POST requests.
+        """
+        url = urllib.parse.urlsplit(self.path)
+
+        if url.path == "/run":
+            adapter_file = urllib.parse.parse_qs(url.query).get("adapter", [None])[0]
+
+            if self.server.service.trigger(adapter_file) is True:
+                self._send_json(202, {"triggered": adapter_file or "all"})
+            else:
+                self._send_json(404, {"error": f"Unknown adapter '{adapter_file}'."})
+        else:
+            self._send_json(404, {"error": "Unknown path."})
+
+    def log_message(self, format, *args) -> None:  # pylint: disable=redefined-builtin
+        """
+        Log requests with the logger of the module instead of stderr.
+        """
+        LOG.info("%s - %s", self.address_string(), format % args)
+
+################################################################################
+# Functions
+################################################################################
+
+
+def parse_listen_address(address: str) -> Tuple[str, int]:
+    """
+    Parse the address of the HTTP endpoint.
+
+    Args:
+        address (str): The address, e.g. "127.0.0.1:8765" or "8765".
+
+    Returns:
+        Tuple[str, int]: The host and the port.
+
+    Raises:
+        ValueError: If the port is invalid.
+    """
+    host, _, port = address.rpartition(":")
+
+    return (host or "127.0.0.1"), int(port)
+
+
+def serve(service: MetricService, address: str) -> Ret:
+    """
+    Run the service with its HTTP endpoint until it is interrupted.
+
+    Args:
+        service (MetricService): The service.
+        address (str): The address of the HTTP endpoint, e.g. "127.0.0.1:8765".
+
+    Returns:
+        Ret: The return status.
+    """
+    ret_status = Ret.OK
+
+    try:
+        http_server = ThreadingHTTPServer(parse_listen_address(address), _RequestHandler)
+    except (OSError, ValueError) as e:
+        LOG.error("The HTTP endpoint %s could not be opened: %s", address, e)
+        ret_status = Ret.ERROR_INVALID_ARGUMENT
+    else:
+        http_server.service = service
+        http_thread = threading.Thread(target=http_server.serve_forever,
+                                       name="http",
+                                       daemon=True)
+        http_thread.start()
+
+        LOG.info("Serving %d adapters, endpoint: http://%s:%d",
+                 len(service.adapters), *http_server.server_address[:2])
+
+        try:
+            service.run_scheduler()
+        except KeyboardInterrupt:
+            LOG.info("Stopping the service...")
+        finally:
+            service.stop()
+            http_server.shutdown()
+            http_server.server_close()
+
+    return ret_status
+
+################################################################################
+# Main
+################################################################################
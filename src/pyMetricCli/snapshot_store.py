@@ -0,0 +1,289 @@
+"""
+Local snapshot of search result items for incremental searches.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import re
+import time
+import logging
+import datetime
+from typing import Callable, Optional
+
+from pyMetricCli.paths import get_cache_dir, make_private_dir
+from pyMetricCli.serializer import dump_file, load_file
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+_SNAPSHOT_SUB_DIR_NAME = "snapshots"
+
+# Matches a UTC offset without colon at the end of a timestamp, e.g. "+0200".
+_UTC_OFFSET_PATTERN = re.compile(r"([+-]\d{2})(\d{2})$")
+
+################################################################################
+# Classes
+################################################################################
+
+
+class SnapshotStore:
+    """
+    Stores all items of a search by their id, together with the watermark
+    of the last search. An incremental search only fetches the items
+    changed since the watermark and merges them into the snapshot.
+    """
+
+    def __init__(self,
+                 key: str,
+                 get_id: Callable[[dict], str],
+                 get_updated: Callable[[dict], Optional[str]],
+                 directory: Optional[str] = None) -> None:
+        """
+        Initializes the store. Call load() to read the stored snapshot.
+
+        Args:
+            key (str): Unique key of the search, used as file name.
+            get_id (Callable[[dict], str]): Returns the unique id of an item.
+            get_updated (Callable[[dict], Optional[str]]): Returns the update
+                time of an item as UTC ISO timestamp, see to_utc_timestamp().
+            directory (Optional[str]): Directory of the snapshot files.
+                Defaults to a sub directory of the pyMetricCli cache directory.
+        """
+        if directory is None:
+            directory = os.path.join(get_cache_dir(), _SNAPSHOT_SUB_DIR_NAME)
+
+        self.file_path = os.path.join(directory, key + ".json")
+        self._get_id = get_id
+        self._get_updated = get_updated
+        self.watermark: Optional[str] = None
+        self.last_full_sync: float = 0.0
+        self.items: dict = {}
+        self.results: dict = {}
+
+    def load(self) -> None:
+        """
+        Load the snapshot from disk. If there is no valid snapshot,
+        the store stays empty and the next search must be a full one.
+        """
+        try:
+            snapshot = load_file(self.file_path)
+
+            self.watermark = snapshot["watermark"]
+            self.last_full_sync = snapshot["last_full_sync"]
+            self.items = snapshot["items"]
+            self.results = snapshot["results"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            LOG.warning("The snapshot %s could not be read: %s", self.file_path, e)
+            self.watermark = None
+            self.last_full_sync = 0.0
+            self.items = {}
+            self.results = {}
+
+    def save(self) -> bool:
+        """
+        Save the snapshot to disk.
+
+        Returns:
+            bool: True if the snapshot was saved, False otherwise.
+        """
+        is_saved = True
+        temp_file_path = f"{self.file_path}.{os.getpid()}.tmp"
+
+        try:
+            make_private_dir(os.path.dirname(self.file_path))
+
+            dump_file({"watermark": self.watermark,
+                       "last_full_sync": self.last_full_sync,
+                       "items": self.items,
+                       "results": self.results}, temp_file_path)
+
+            # Replace the file at once, so other processes never read a partial file.
+            os.replace(temp_file_path, self.file_path)
+        except (OSError, TypeError, ValueError) as e:
+            LOG.error("The snapshot %s could not be written: %s", self.file_path, e)
+            is_saved = False
+
+        return is_saved
+
+    def is_full_sync_due(self, interval: float) -> bool:
+        """
+        Check if the next search must fetch all items.
+        This is the case if there is no snapshot yet or if the last full
+        search is older than the given interval. Only a full search
+        removes items which were deleted or no longer match the search.
+
+        Args:
+            interval (float): Seconds between full searches. 0 for never.
+
+        Returns:
+            bool: True if a full search is due, False otherwise.
+        """
+        is_due = self.watermark is None
+
+        if 0 < interval <= (time.time() - self.last_full_sync):
+            is_due = True
+
+        return is_due
+
+    def update(self, results: dict, items_key: str, is_full: bool) -> None:
+        """
+        Update the snapshot with the items of a search.
+        A full search replaces all items, an incremental one is merged.
+        The watermark is advanced to the latest update time of the items.
+        If no item was ever found, there is no watermark and the next
+        search is a full one again.
+
+        Args:
+            results (dict): The search results.
+            items_key (str): Key of the item list in the search results.
+            is_full (bool): True if the search fetched all items.
+        """
+        fetched_items = results.get(items_key, [])
+
+        if is_full is True:
+            self.items = {}
+            self.last_full_sync = time.time()
+
+        for item in fetched_items:
+            self.items[self._get_id(item)] = item
+
+            updated = self._get_updated(item)
+            if (updated is not None) and ((self.watermark is None) or (updated > self.watermark)):
+                self.watermark = updated
+
+        # Keep all other values of the results, e.g. the search parameters.
+        self.results = {key: value for key, value in results.items() if key != items_key}
+
+    def merge(self, results: dict, default_items_key: str, is_full: bool) -> dict:
+        """
+        Update the snapshot with the items of a search, save it and
+        get the search results including all items of the snapshot.
+
+        Args:
+            results (dict): The search results.
+            default_items_key (str): Expected key of the item list in the search results.
+            is_full (bool): True if the search fetched all items.
+
+        Returns:
+            dict: The search results.
+        """
+        items_key = find_items_key(results, default_items_key)
+
+        self.update(results, items_key, is_full)
+        self.save()
+
+        return self.get_results(items_key)
+
+    def get_results(self, items_key: str) -> dict:
+        """
+        Get the search results including all items of the snapshot.
+
+        Args:
+            items_key (str): Key of the item list in the search results.
+
+        Returns:
+            dict: The search results.
+        """
+        results = dict(self.results)
+        results[items_key] = list(self.items.values())
+
+        if "total" in results:
+            results["total"] = len(self.items)
+
+        return results
+
+################################################################################
+# Functions
+################################################################################
+
+
+def to_utc_timestamp(value) -> Optional[str]:
+    """
+    Convert a timestamp of Jira or Polarion to an ISO timestamp in UTC.
+    Such timestamps can be compared as strings.
+
+    Args:
+        value: The timestamp, e.g. "2024-05-01T10:00:00.000+0200".
+
+    Returns:
+        Optional[str]: The UTC timestamp or None if the value is not a timestamp.
+    """
+    utc_timestamp = None
+
+    if isinstance(value, str):
+        normalized = value.strip().replace("Z", "+00:00")
+        normalized = _UTC_OFFSET_PATTERN.sub(r"\1:\2", normalized)
+
+        try:
+            timestamp = datetime.datetime.fromisoformat(normalized)
+
+            # Timestamps without offset are treated as local time.
+            utc_timestamp = timestamp.astimezone(
+                datetime.timezone.utc).isoformat(timespec="microseconds")
+        except ValueError:
+            utc_timestamp = None
+
+    return utc_timestamp
+
+
+def find_items_key(results: dict, default: str) -> str:
+    """
+    Find the key of the item list in the search results.
+
+    Args:
+        results (dict): The search results.
+        default (str): The expected key of the item list.
+
+    Returns:
+        str: The default key if present, otherwise the first key with a list value.
+    """
+    items_key = default
+
+    if default not in results:
+        for key, value in results.items():
+            if isinstance(value, list):
+                items_key = key
+                break
+
+    return items_key
+
+################################################################################
+# Main
+################################################################################
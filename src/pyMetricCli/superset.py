@@ -39,8 +39,10 @@ import subprocess
 import logging
 
 from pyProfileMgr.profile_data import ProfileType
-from pyProfileMgr.profile_mgr import ProfileMgr
-from pyProfileMgr.ret import Ret
+
+from pyMetricCli.backend import get_backend
+from pyMetricCli.credentials import resolve_credentials
+from pyMetricCli.tools import is_tool_installed
 
 
 ################################################################################
@@ -62,86 +64,64 @@ class Superset:  # pylint: disable=too-few-public-methods
 
     def __init__(self, superset_config: dict) -> None:
         self.config = superset_config
+        self._backend = get_backend(self.config, is_upload=True)
         self.is_installed = self._check_if_is_installed()
 
-    def _run_pysupersetcli(self, arguments) -> subprocess.CompletedProcess:
+    def _run_pysupersetcli(self, arguments, pass_fds: tuple = ()) -> subprocess.CompletedProcess:
         """
-        Wrapper to run pySupersetCli command line.
+        Wrapper to run pySupersetCli with the backend selected in the configuration.
 
         Args:
             arguments (list): List of arguments to pass to pySupersetCli.
+            pass_fds (tuple): File descriptors inherited by pySupersetCli.
 
         Returns:
             subprocess.CompletedProcess[bytes]: The result of the command.
             Includes return code, stdout and stderr.
         """
-        # pylint: disable=duplicate-code
-        args = ["pySupersetCli"]  # The executable to run.
-        args.extend(arguments)  # Add the arguments to the command.
-        return subprocess.run(args,
-                              capture_output=True,
-                              check=False,
-                              shell=False)
+        return self._backend.run("pySupersetCli", arguments, pass_fds)
 
     def _check_if_is_installed(self) -> bool:
         """
         Checks if the pySupersetCli Tool is installed.
+        Uses the cached tool detection instead of running the tool.
 
         Returns:
             bool: True if pySupersetCli is installed, False otherwise.
         """
-        is_installed = True
-        try:
-            ret = self._run_pysupersetcli(["--help"])
-            ret.check_returncode()
-        except subprocess.CalledProcessError:
+        is_installed = is_tool_installed("pySupersetCli")
+        if is_installed is False:
             print("pySupersetCli is not installed!")
-            is_installed = False
         return is_installed
 
-    def upload(self, input_file) -> int:
+    def upload(self, input_file, pass_fds: tuple = ()) -> int:
         """
         Upload to Superset using the upload command of pySupersetCli.
 
         Args:
             input_file (str): Path to JSON file which shall be uploaded.
+            pass_fds (tuple): File descriptors inherited by pySupersetCli,
+                e.g. of a Handoff with the file.
 
         Returns:
             int: Return Code of the command.
         """
+        # Check the profile if a profile name has been given in the 'superset_config',
+        # else read the credentials from the 'superset_config'.
+        credentials = resolve_credentials(self.config, ProfileType.SUPERSET)
+        if credentials is None:
+            return -1
 
-        server: str
-        username: str
-        password: str
+        command_list: list = ["--verbose"]
 
-        # Read credentials from the profile if a profile name has been given
-        # in the 'superset_config'.
-        # pylint: disable=R0801
+        # The credentials of a profile are not passed, as they would be visible
+        # in the process list. pySupersetCli loads the profile itself.
         if "profile" in self.config:
-            profile_mgr = ProfileMgr()
-            ret_code = profile_mgr.load(self.config["profile"])
-            if ret_code != Ret.CODE.RET_OK:
-                print("Error loading profile:", self.config['profile'])
-                return -1
-
-            # Check for profile type 'superset'.
-            if profile_mgr.loaded_profile.type != ProfileType.SUPERSET:
-                print("The profile type is not 'superset'.")
-                return -1
-
-            server = profile_mgr.loaded_profile.server_url
-            username = profile_mgr.loaded_profile.user
-            password = profile_mgr.loaded_profile.password
-        # Else take credentials from the 'superset_config'.
+            command_list += ["--profile", self.config["profile"]]
         else:
-            server = self.config["server"]
-            username = self.config["username"]
-            password = self.config["password"]
-
-        command_list: list = ["--verbose",
-                              "--server", server,
-                              "--user", username,
-                              "--password", password]
+            command_list += ["--server", credentials.server,
+                             "--user", credentials.user,
+                             "--password", credentials.password]
 
         if self.config.get("basic_auth") is True:
             command_list.append("--basic_auth")
@@ -156,7 +136,7 @@ class Superset:  # pylint: disable=too-few-public-methods
                              "--table", self.config["table"],
                              "--file", input_file
                              ])
-        ret = self._run_pysupersetcli(command_list)
+        ret = self._run_pysupersetcli(command_list, pass_fds)
 
         if 0 != ret.returncode:
             LOG.error("Error while uploading: %s", ret.stderr)
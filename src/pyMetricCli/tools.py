@@ -0,0 +1,175 @@
+"""
+Detection of the installed pyJiraCli, pyPolarionCli and pySupersetCli Tools.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import shutil
+import logging
+import threading
+import importlib.metadata
+from typing import Optional
+
+from pyMetricCli.backend import SubprocessBackend
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# Executable name of each tool and the name of the package providing it.
+TOOL_PACKAGES = {
+    "pyJiraCli": "pyJiraCli",
+    "pyPolarionCli": "pyPolarionCli",
+    "pySupersetCli": "pySupersetCli"
+}
+
+# Seconds until a tool is killed while checking if it is installed.
+_PROBE_TIMEOUT = 60
+
+# Detection results of this process, with the executable name as key.
+_detected: dict = {}
+_detected_lock = threading.Lock()
+
+################################################################################
+# Classes
+################################################################################
+
+################################################################################
+# Functions
+################################################################################
+
+
+def _is_package_installed(executable: str) -> bool:
+    """
+    Check if the package providing the given tool is installed.
+
+    Args:
+        executable (str): The name of the executable, e.g. "pyJiraCli".
+
+    Returns:
+        bool: True if the package is installed, False otherwise.
+    """
+    is_installed = True
+
+    try:
+        importlib.metadata.version(TOOL_PACKAGES.get(executable, executable))
+    except importlib.metadata.PackageNotFoundError:
+        is_installed = False
+
+    return is_installed
+
+
+def probe_tool(executable: str) -> bool:
+    """
+    Check if the tool is installed by running it with "--help".
+    This is the expensive but reliable check. The result is kept for the process.
+
+    Args:
+        executable (str): The name of the executable, e.g. "pyJiraCli".
+
+    Returns:
+        bool: True if the tool is installed, False otherwise.
+    """
+    try:
+        ret = SubprocessBackend(_PROBE_TIMEOUT, retries=0).run(executable, ["--help"])
+        is_installed = 0 == ret.returncode
+    except OSError:
+        is_installed = False
+
+    with _detected_lock:
+        _detected[executable] = is_installed
+
+    return is_installed
+
+
+def is_tool_installed(executable: str) -> bool:
+    """
+    Check if the tool is installed without running it.
+    The tool is detected by its package metadata or its executable on the
+    PATH. The result is kept in memory for the rest of the process.
+
+    Args:
+        executable (str): The name of the executable, e.g. "pyJiraCli".
+
+    Returns:
+        bool: True if the tool is installed, False otherwise.
+    """
+    with _detected_lock:
+        if executable not in _detected:
+            _detected[executable] = (_is_package_installed(executable) is True) or \
+                                    (shutil.which(executable) is not None)
+
+        is_installed = _detected[executable]
+
+    return is_installed
+
+
+def get_field_arguments(fields: list, extra_fields: Optional[list] = None) -> list:
+    """
+    Get the "--field" arguments of the search command of pyJiraCli and pyPolarionCli.
+
+    Args:
+        fields (list): The fields to restrict the search results to. Empty for all fields.
+        extra_fields (Optional[list]): Fields to add if the fields are restricted.
+
+    Returns:
+        list: The arguments.
+    """
+    fields = list(fields)
+
+    # Without fields all fields are returned anyway.
+    if (len(fields) > 0) and (extra_fields is not None):
+        fields += [field for field in extra_fields if field not in fields]
+
+    arguments = []
+    for field in fields:
+        arguments += ["--field", field]
+
+    return arguments
+
+
+def check_tools() -> dict:
+    """
+    Probe all tools by running them, see probe_tool().
+
+    Returns:
+        dict: The result of each tool, with the executable name as key.
+    """
+    return {executable: probe_tool(executable) for executable in TOOL_PACKAGES}
+
+################################################################################
+# Main
+################################################################################
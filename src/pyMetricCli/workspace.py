@@ -0,0 +1,161 @@
+"""
+Temporary workspaces of the runs, so concurrent runs do not share files.
+"""
+
+# BSD 3-Clause License
+#
+# Copyright (c) 2024 - 2025, NewTec GmbH
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice, this
+#    list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its
+#    contributors may be used to endorse or promote products derived from
+#    this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+# FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+# DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+# SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+# CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+# OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+# OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+################################################################################
+# Imports
+################################################################################
+
+import os
+import shutil
+import logging
+import tempfile
+from typing import Optional
+
+################################################################################
+# Variables
+################################################################################
+
+LOG: logging.Logger = logging.getLogger(__name__)
+
+# Directory of the tmpfs, which is kept in memory.
+_TMPFS_DIR = "/dev/shm"
+
+_WORKSPACE_PREFIX = "pyMetricCli_"
+
+# Base directory of the workspaces, None for get_default_base_dir().
+_base_dir: Optional[str] = None
+
+# True to keep the workspaces after the runs, e.g. for debugging.
+_is_kept: bool = False
+
+################################################################################
+# Classes
+################################################################################
+
+
+class Workspace:
+    """
+    A temporary directory for the files of a run, created with a unique
+    name in the base directory, see set_workspace_options(). It is removed
+    when the run ends, also on errors, unless the workspaces are kept.
+    Use it as context manager:
+
+        with Workspace("run") as workspace:
+            temp_dir = workspace.get_dir("jira")
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        Initializes the workspace. The directory is created on entering.
+
+        Args:
+            name (str): Part of the directory name, e.g. "run" or "outbox".
+        """
+        self.name = name
+        self.path = ""
+
+    def __enter__(self) -> "Workspace":
+        base_dir = get_base_dir()
+        os.makedirs(base_dir, exist_ok=True)
+        self.path = tempfile.mkdtemp(prefix=f"{_WORKSPACE_PREFIX}{self.name}_", dir=base_dir)
+        LOG.info("Workspace: %s", self.path)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if _is_kept is True:
+            LOG.info("Workspace kept: %s", self.path)
+        else:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+    def get_dir(self, *names: str) -> str:
+        """
+        Get a sub directory of the workspace, created if needed.
+
+        Args:
+            names (str): The path of the sub directory, e.g. "jira", "0".
+
+        Returns:
+            str: Path to the sub directory.
+        """
+        sub_dir = os.path.join(self.path, *names)
+        os.makedirs(sub_dir, exist_ok=True)
+
+        return sub_dir
+
+################################################################################
+# Functions
+################################################################################
+
+
+def get_default_base_dir() -> str:
+    """
+    Get the default base directory of the workspaces: the tmpfs if it is
+    writable, else the temporary directory of the platform.
+
+    Returns:
+        str: Path to the base directory.
+    """
+    base_dir = tempfile.gettempdir()
+
+    if os.path.isdir(_TMPFS_DIR) and os.access(_TMPFS_DIR, os.W_OK):
+        base_dir = _TMPFS_DIR
+
+    return base_dir
+
+
+def get_base_dir() -> str:
+    """
+    Get the base directory of the workspaces.
+
+    Returns:
+        str: Path to the base directory.
+    """
+    return get_default_base_dir() if _base_dir is None else _base_dir
+
+
+def set_workspace_options(base_dir: Optional[str], keep: bool = False) -> None:
+    """
+    Set the options of all workspaces of this process.
+
+    Args:
+        base_dir (Optional[str]): The base directory, None for get_default_base_dir().
+        keep (bool): True to keep the workspaces after the runs, False to remove them.
+    """
+    global _base_dir, _is_kept  # pylint: disable=global-statement
+    _base_dir = base_dir
+    _is_kept = keep
+
+################################################################################
+# Main
+################################################################################
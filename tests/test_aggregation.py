@@ -0,0 +1,150 @@
+"""Tests of the declared metrics, computed with NumPy and in pure Python.
+"""
+
+import pytest
+
+from pyMetricCli import aggregation
+from pyMetricCli.aggregation import MetricAggregator
+
+_ISSUES = [
+    {"key": "P-1", "fields": {"status": {"name": "Open"}, "points": 3, "priority": "High",
+                              "created": "2025-01-06T10:00:00.000+0100"}},
+    {"key": "P-2", "fields": {"status": {"name": "Open"}, "points": "5", "priority": "Low",
+                              "created": "2025-01-07T10:00:00.000+0100"}},
+    {"key": "P-3", "fields": {"status": {"name": "Done"}, "points": 8, "priority": "High",
+                              "created": "2025-02-01T10:00:00.000+0100"}},
+    {"key": "P-4", "fields": {"status": {"name": "Done"}, "points": None, "priority": "",
+                              "created": "unknown"}},
+    {"key": "P-5", "fields": {"status": None}},
+]
+
+
+@pytest.fixture(name="engine", params=["numpy", "python"])
+def fixture_engine(request, monkeypatch):
+    """Compute the metrics with NumPy and in pure Python.
+    """
+    if request.param == "numpy":
+        if aggregation.numpy is None:
+            pytest.skip("NumPy is not installed.")
+    else:
+        monkeypatch.setattr(aggregation, "numpy", None)
+
+    return request.param
+
+
+def _apply(metrics: list, output: dict, items: list = None) -> dict:
+    """Compute the metrics over the items and return the output.
+    """
+    aggregator = MetricAggregator(metrics)
+    aggregator.add_items(_ISSUES if items is None else items)
+    aggregator.apply(output)
+
+    return output
+
+
+@pytest.mark.usefixtures("engine")
+def test_operations():
+    """Each operation over the numeric values of a field.
+    """
+    metrics = [{"output": "total"},
+               {"output": "points_sum", "op": "sum", "field": "fields.points"},
+               {"output": "points_avg", "op": "avg", "field": "fields.points"},
+               {"output": "points_min", "op": "min", "field": "fields.points"},
+               {"output": "points_max", "op": "max", "field": "fields.points"},
+               {"output": "points_median", "op": "percentile", "field": "fields.points"},
+               {"output": "points_p25", "op": "percentile", "field": "fields.points", "q": 25}]
+    output = _apply(metrics, {key: None for key in ("total", "points_sum", "points_avg",
+                                                     "points_min", "points_max",
+                                                     "points_median", "points_p25")})
+
+    assert output == {"total": 5, "points_sum": 16.0, "points_avg": pytest.approx(16 / 3),
+                      "points_min": 3.0, "points_max": 8.0, "points_median": 5.0,
+                      "points_p25": 4.0}
+
+
+@pytest.mark.usefixtures("engine")
+def test_group_by():
+    """Groups are counted by value, items without value are skipped.
+    """
+    metrics = [{"output": "status_{group}", "group_by": "fields.status.name"}]
+
+    assert _apply(metrics, {"status_open": 0, "status_done": 0}) == \
+        {"status_open": 2, "status_done": 2}
+
+
+@pytest.mark.usefixtures("engine")
+def test_where():
+    """Only items matching all predicates are aggregated.
+    """
+    metrics = [{"output": "high_open", "where": [("fields.priority", "==", "High"),
+                                                 ("fields.status.name", "!=", "Done")]},
+               {"output": "big", "where": [("fields.points", ">=", 5)]},
+               {"output": "listed", "where": [("fields.priority", "in", ["High", "Low"])]},
+               {"output": "not_listed", "where": [("fields.priority", "not in", ["High"])]}]
+
+    assert _apply(metrics, {"high_open": 0, "big": 0, "listed": 0, "not_listed": 0}) == \
+        {"high_open": 1, "big": 2, "listed": 3, "not_listed": 1}
+
+
+@pytest.mark.parametrize("unit, expected", [
+    ("day", {"2025-01-06": 1, "2025-01-07": 1, "2025-02-01": 1}),
+    ("week", {"2025-W02": 2, "2025-W05": 1}),
+    ("month", {"2025-01": 2, "2025-02": 1}),
+    ("year", {"2025": 3}),
+])
+@pytest.mark.usefixtures("engine")
+def test_bucket(unit, expected):
+    """Items are counted by date bucket, items without date are skipped.
+    """
+    metrics = [{"output": "created_{bucket}", "bucket": ("fields.created", unit)}]
+    output = _apply(metrics, {f"created_{bucket}": 0 for bucket in expected})
+
+    assert output == {f"created_{bucket}": count for bucket, count in expected.items()}
+
+
+@pytest.mark.usefixtures("engine")
+def test_group_and_bucket():
+    """Groups and buckets combined.
+    """
+    metrics = [{"output": "{group}_{bucket}", "op": "sum", "field": "fields.points",
+                "group_by": "fields.priority", "bucket": ("fields.created", "month")}]
+
+    assert _apply(metrics, {"High_2025-01": 0, "High_2025-02": 0, "Low_2025-01": 0}) == \
+        {"High_2025-01": 3.0, "High_2025-02": 8.0, "Low_2025-01": 5.0}
+
+
+@pytest.mark.usefixtures("engine")
+def test_no_values():
+    """Counts and sums of no items are 0, other operations leave the output unchanged.
+    """
+    metrics = [{"output": "count"},
+               {"output": "sum", "op": "sum", "field": "fields.points"},
+               {"output": "avg", "op": "avg", "field": "fields.points"}]
+
+    assert _apply(metrics, {"count": None, "sum": None, "avg": -1}, items=[]) == \
+        {"count": 0, "sum": 0.0, "avg": -1}
+
+
+@pytest.mark.usefixtures("engine")
+def test_output_keys():
+    """Output keys are matched regardless of their case, unknown keys are ignored.
+    """
+    metrics = [{"output": "status_{group}", "group_by": "fields.status.name"}]
+
+    assert _apply(metrics, {"Status_Open": 0}) == {"Status_Open": 2}
+
+
+@pytest.mark.parametrize("declaration", [
+    "count",
+    {"op": "count"},
+    {"output": "x", "op": "median", "field": "f"},
+    {"output": "x", "op": "sum"},
+    {"output": "x", "op": "percentile", "field": "f", "q": 101},
+    {"output": "x", "where": [("f", "~", 1)]},
+    {"output": "x", "bucket": ("f", "hour")},
+])
+def test_invalid_declaration(declaration):
+    """Invalid declarations raise a ValueError.
+    """
+    with pytest.raises(ValueError):
+        MetricAggregator([declaration])
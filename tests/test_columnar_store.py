@@ -0,0 +1,98 @@
+"""Tests of the snapshots of the data directory.
+"""
+
+import pytest
+
+from pyMetricCli.columnar_store import ColumnarStore, read_columns, read_results, \
+    _escape_key, _split_path
+
+pytest.importorskip("pyarrow")
+
+_CONFIG = {"server": "https://jira.example.com", "filter": "project = P"}
+
+
+def _write(tmp_path, items: list) -> str:
+    """Write the items as snapshot and return its path.
+    """
+    return ColumnarStore(str(tmp_path)).write("jira", _CONFIG, {"total": len(items)},
+                                              iter(items), "issues")
+
+
+@pytest.mark.parametrize("key", ["name", "a.b", "a\\b", "a\\.b", ".", "\\"])
+def test_escape_key(key):
+    """Escaped keys are one element of a field path.
+    """
+    assert _split_path(f"fields.{_escape_key(key)}.value") == ["fields", key, "value"]
+
+
+def test_round_trip(tmp_path):
+    """The search results are read as they were written.
+    """
+    items = [
+        {"key": "P-1", "fields": {"status": {"name": "Open"}, "labels": ["a"], "points": 3}},
+        {"key": "P-2", "fields": {"status": {"name": "Done"}, "labels": "b"}},
+    ]
+
+    assert read_results(_write(tmp_path, items)) == {"total": 2, "issues": items}
+
+
+def test_explicit_null(tmp_path):
+    """Explicit null values are kept apart from missing fields.
+    """
+    items = [
+        {"key": "P-1", "fields": {"resolution": None, "due": None}},
+        {"key": "P-2", "fields": {"resolution": None, "due": "2025-01-01"}},
+        {"key": "P-3", "fields": {"resolution": None}},
+    ]
+
+    assert read_results(_write(tmp_path, items))["issues"] == items
+
+
+def test_dotted_keys(tmp_path):
+    """Keys containing dots are not split into nested fields.
+    """
+    items = [{"key": "P-1", "fields": {"customfield.1": 5, "a": {"b.c": "x"}}}]
+    file_path = _write(tmp_path, items)
+
+    assert read_results(file_path)["issues"] == items
+    assert read_columns(file_path, ["fields.customfield\\.1", "fields.a.b\\.c"]) == \
+        ({"fields.customfield\\.1": [5], "fields.a.b\\.c": ["x"]}, 1)
+
+
+def test_read_missing_columns(tmp_path):
+    """Columns missing in the snapshot are None for all items.
+    """
+    file_path = _write(tmp_path, [{"key": "P-1"}, {"key": "P-2"}])
+
+    assert read_columns(file_path, ["key", "fields.status.name"]) == \
+        ({"key": ["P-1", "P-2"], "fields.status.name": [None, None]}, 2)
+
+
+def test_round_trip_lists_of_objects(tmp_path):
+    """Lists of objects with differing keys are read as they were written.
+    """
+    items = [
+        {"key": "P-1", "fields": {"components": [{"id": "1", "name": "UI"}, {"id": "2"}],
+                                  "fixVersions": []}},
+        {"key": "P-2", "fields": {"components": [], "fixVersions": [{"name": "1.0"}]}},
+    ]
+    file_path = _write(tmp_path, items)
+
+    assert read_results(file_path)["issues"] == items
+    assert read_columns(file_path, ["fields.components"])[0] == \
+        {"fields.components": [[{"id": "1", "name": "UI"}, {"id": "2"}], []]}
+
+
+def test_round_trip_mixed_types(tmp_path):
+    """Mixed integers and floats, booleans and empty objects keep their types.
+    """
+    items = [
+        {"key": "P-1", "fields": {"points": 3, "flag": True, "extra": {}}},
+        {"key": "P-2", "fields": {"points": 2.5, "flag": 1, "extra": {}}},
+    ]
+
+    issues = read_results(_write(tmp_path, items))["issues"]
+
+    assert issues == items
+    assert [type(issue["fields"]["points"]) for issue in issues] == [int, float]
+    assert [type(issue["fields"]["flag"]) for issue in issues] == [bool, int]
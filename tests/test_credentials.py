@@ -0,0 +1,119 @@
+"""Tests of the profile cache and of the command lines using profiles.
+"""
+
+import os
+import subprocess
+
+import pytest
+from pyProfileMgr.profile_data import ProfileType
+
+from pyMetricCli import credentials
+from pyMetricCli.credentials import CredentialResolver, Credentials
+from pyMetricCli.jira import Jira
+from pyMetricCli.polarion import Polarion
+from pyMetricCli.superset import Superset
+
+_SECRETS = ("user", "secret", "token")
+
+
+@pytest.fixture(name="loads")
+def fixture_loads(monkeypatch, tmp_path) -> list:
+    """Load fake profiles of the type given by their name and record the loads.
+    """
+    loads = []
+
+    def load_profile(profile_name: str) -> tuple:
+        loads.append(profile_name)
+        return ProfileType(profile_name), Credentials("https://server", *_SECRETS)
+
+    monkeypatch.setattr(credentials, "_load_profile", load_profile)
+    monkeypatch.setattr(credentials, "_resolver", CredentialResolver(str(tmp_path)))
+
+    return loads
+
+
+def test_profile_cached_until_changed(loads, tmp_path):
+    """A profile is loaded again only after one of its files changed.
+    """
+    profile_file = tmp_path / "jira" / "profile.json"
+    profile_file.parent.mkdir()
+    profile_file.write_text("{}")
+    resolver = credentials.get_resolver()
+
+    assert resolver.resolve("jira", ProfileType.JIRA).token == "token"
+    assert resolver.resolve("jira", ProfileType.JIRA).token == "token"
+    assert loads == ["jira"]
+
+    modified = os.stat(profile_file).st_mtime_ns + 1_000_000_000
+    os.utime(profile_file, ns=(modified, modified))
+    resolver.resolve("jira", ProfileType.JIRA)
+
+    assert loads == ["jira", "jira"]
+
+
+def test_untracked_profile_expires(loads, monkeypatch):
+    """A profile without files in the profile directory is loaded again after a minute.
+    """
+    now = [1000.0]
+    monkeypatch.setattr(credentials.time, "monotonic", lambda: now[0])
+    resolver = credentials.get_resolver()
+
+    resolver.resolve("polarion", ProfileType.POLARION)
+    now[0] += 30
+    resolver.resolve("polarion", ProfileType.POLARION)
+
+    assert loads == ["polarion"]
+
+    now[0] += 31
+    resolver.resolve("polarion", ProfileType.POLARION)
+
+    assert loads == ["polarion", "polarion"]
+
+
+@pytest.mark.usefixtures("loads")
+def test_profile_type():
+    """A profile of another type can not be used.
+    """
+    assert credentials.get_resolver().resolve("jira", ProfileType.SUPERSET) is None
+
+
+def _record(arguments: list) -> callable:
+    """Get a fake tool run method which records its arguments and fails.
+    """
+    def run(_self, command_list, *_args) -> subprocess.CompletedProcess:
+        arguments.extend(command_list)
+        return subprocess.CompletedProcess(command_list, 1, b"", b"")
+
+    return run
+
+
+@pytest.mark.usefixtures("loads")
+def test_profile_not_on_command_line(monkeypatch, tmp_path):
+    """All tools get the profile name, but not its credentials.
+    """
+    arguments = {"jira": [], "polarion": [], "superset": []}
+    monkeypatch.setattr(Jira, "_Jira__run_pyjiracli", _record(arguments["jira"]))
+    monkeypatch.setattr(Polarion, "_run_pypolarioncli", _record(arguments["polarion"]))
+    monkeypatch.setattr(Superset, "_run_pysupersetcli", _record(arguments["superset"]))
+
+    # pylint: disable=protected-access
+    Jira({"profile": "jira", "filter": "project = P", "fields": [],
+          "file": str(tmp_path / "results.json")})._Jira__run_search("project = P", 0)
+    Polarion({"profile": "polarion", "project": "PRJ", "query": "type:requirement",
+              "fields": [], "output": str(tmp_path)})._run_search("type:requirement")
+    Superset({"profile": "superset", "database": "1", "table": "t"}).upload("rows.json")
+
+    for tool, tool_arguments in arguments.items():
+        assert ["--profile", tool] == tool_arguments[tool_arguments.index("--profile"):][:2]
+        assert not set(_SECRETS) & set(tool_arguments)
+
+
+@pytest.mark.usefixtures("loads")
+def test_invalid_profile_not_run(monkeypatch):
+    """A tool is not run with a profile of another type.
+    """
+    arguments = []
+    monkeypatch.setattr(Superset, "_run_pysupersetcli", _record(arguments))
+
+    assert Superset({"profile": "jira", "database": "1", "table": "t"}).upload("rows.json") == -1
+    assert not arguments
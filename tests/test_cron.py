@@ -0,0 +1,130 @@
+"""Tests of the cron schedules.
+"""
+
+import datetime
+
+import pytest
+
+from pyMetricCli.cron import CronSchedule
+
+# 2025-01-06 is a Monday.
+MONDAY = datetime.datetime(2025, 1, 6, 10, 7, 30)
+
+
+def test_every_quarter_hour():
+    """A step matches every n-th minute.
+    """
+    schedule = CronSchedule("*/15 * * * *")
+
+    assert schedule.matches(MONDAY.replace(minute=0)) is True
+    assert schedule.matches(MONDAY.replace(minute=45)) is True
+    assert schedule.matches(MONDAY.replace(minute=7)) is False
+
+
+def test_ranges_and_lists():
+    """Ranges and lists restrict the hours and the days of week.
+    """
+    schedule = CronSchedule("0,30 9-17 * * 1-5")
+
+    assert schedule.matches(MONDAY.replace(hour=9, minute=30)) is True
+    assert schedule.matches(MONDAY.replace(hour=18, minute=0)) is False
+    # Saturday.
+    assert schedule.matches(MONDAY.replace(day=11, hour=9, minute=0)) is False
+
+
+def test_single_value_with_step():
+    """A single value with a step runs to the maximum.
+    """
+    schedule = CronSchedule("5/20 * * * *")
+
+    assert [minute for minute in range(60)
+            if schedule.matches(MONDAY.replace(minute=minute))] == [5, 25, 45]
+
+
+def test_sunday_as_seven():
+    """Sunday may be given as 0 or 7.
+    """
+    sunday = MONDAY.replace(day=5, hour=0, minute=0)
+
+    assert CronSchedule("0 0 * * 7").matches(sunday) is True
+    assert CronSchedule("0 0 * * 0").matches(sunday) is True
+
+
+def test_day_of_month_or_day_of_week():
+    """If both are restricted, the day of month or the day of week must match.
+    """
+    schedule = CronSchedule("0 0 13 * 5")
+
+    # Friday, 2025-01-10.
+    assert schedule.matches(datetime.datetime(2025, 1, 10)) is True
+    # Monday, 2025-01-13.
+    assert schedule.matches(datetime.datetime(2025, 1, 13)) is True
+    # Tuesday, 2025-01-14.
+    assert schedule.matches(datetime.datetime(2025, 1, 14)) is False
+
+
+def test_day_of_month_and_month():
+    """If the day of week is not restricted, the day of month must match.
+    """
+    schedule = CronSchedule("0 0 1 7 *")
+
+    assert schedule.matches(datetime.datetime(2025, 7, 1)) is True
+    assert schedule.matches(datetime.datetime(2025, 7, 2)) is False
+    assert schedule.matches(datetime.datetime(2025, 6, 1)) is False
+
+
+def test_aliases():
+    """The aliases are replaced by their expressions.
+    """
+    assert CronSchedule("@daily").matches(MONDAY.replace(hour=0, minute=0)) is True
+    assert CronSchedule("@hourly").matches(MONDAY.replace(minute=0)) is True
+    assert CronSchedule("@hourly").matches(MONDAY) is False
+    assert CronSchedule("@weekly").matches(MONDAY.replace(hour=0, minute=0)) is False
+
+
+@pytest.mark.parametrize("expression, after, expected", [
+    ("*/15 * * * *", MONDAY, datetime.datetime(2025, 1, 6, 10, 15)),
+    ("0 * * * *", MONDAY, datetime.datetime(2025, 1, 6, 11, 0)),
+    ("@monthly", datetime.datetime(2025, 1, 31, 12, 0), datetime.datetime(2025, 2, 1)),
+    ("0 0 29 2 *", MONDAY, datetime.datetime(2028, 2, 29)),
+    ("30 8 * * 1", MONDAY, datetime.datetime(2025, 1, 13, 8, 30)),
+])
+def test_next_time(expression, after, expected):
+    """The next time is the first matching minute after the given time.
+    """
+    assert CronSchedule(expression).get_next_time(after) == expected
+
+
+def test_next_time_is_after_matching_time():
+    """A matching time itself is not the next time.
+    """
+    now = MONDAY.replace(minute=15, second=0)
+
+    assert CronSchedule("*/15 * * * *").get_next_time(now) == now.replace(minute=30)
+
+
+def test_never_matching():
+    """A schedule which never matches raises an error instead of searching forever.
+    """
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 30 2 *").get_next_time(MONDAY)
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "* * * * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "* * * 13 *",
+    "* * * * 8",
+    "*/0 * * * *",
+    "5-1 * * * *",
+    "a * * * *",
+    "",
+])
+def test_invalid_expressions(expression):
+    """Invalid expressions raise a ValueError.
+    """
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
@@ -0,0 +1,158 @@
+"""Tests of the partitioned Jira search.
+"""
+
+import re
+import datetime
+
+import pytest
+
+from pyMetricCli.jira import Jira, _add_jql_condition, _set_jql_order, _get_created_order, \
+    _get_created_conditions, _merge_partitions
+
+_ISSUES = [{"key": f"P-{index + 1}", "fields": {"created": created}}
+           for index, created in enumerate(["2024-01-05T10:00:00.000+0100",
+                                            "2024-03-31T23:30:00.000+0100",
+                                            "2024-06-15T08:00:00.000+0200",
+                                            "2024-12-31T12:00:00.000+0100"])]
+
+
+@pytest.mark.parametrize("jql_filter, expected", [
+    ("project = P", "(project = P) AND created >= \"2024-01-01\""),
+    ("project = P ORDER BY created DESC",
+     "(project = P) AND created >= \"2024-01-01\" ORDER BY created DESC"),
+    ("ORDER BY key", "created >= \"2024-01-01\" ORDER BY key"),
+    ("", "created >= \"2024-01-01\""),
+])
+def test_add_jql_condition(jql_filter, expected):
+    """The condition restricts the filter, its ORDER BY stays at the end.
+    """
+    assert _add_jql_condition(jql_filter, "created >= \"2024-01-01\"") == expected
+
+
+@pytest.mark.parametrize("jql_filter, expected", [
+    ("project = P", "project = P ORDER BY created ASC"),
+    ("project = P order by priority, key", "project = P ORDER BY created ASC"),
+    ("", "ORDER BY created ASC"),
+])
+def test_set_jql_order(jql_filter, expected):
+    """The ORDER BY clause of the filter is replaced.
+    """
+    assert _set_jql_order(jql_filter, "created ASC") == expected
+
+
+@pytest.mark.parametrize("jql_filter, expected", [
+    ("project = P", "ASC"),
+    ("project = P ORDER BY created", "ASC"),
+    ("project = P ORDER BY Created asc, key", "ASC"),
+    ("project = P ORDER BY created DESC", "DESC"),
+    ("project = P order by created desc, priority", "DESC"),
+    ("project = P ORDER BY priority, created", None),
+    ("project = P ORDER BY createdDate", None),
+])
+def test_get_created_order(jql_filter, expected):
+    """Only filters ordered by the creation date first can be partitioned.
+    """
+    assert _get_created_order(jql_filter) == expected
+
+
+def test_created_conditions():
+    """The first range has no lower and the last range no upper bound.
+    """
+    conditions = _get_created_conditions(datetime.date(2024, 1, 1),
+                                         datetime.date(2024, 12, 31), 4)
+
+    assert conditions == [
+        "created < \"2024-04-01\"",
+        "created >= \"2024-04-01\" AND created < \"2024-07-02\"",
+        "created >= \"2024-07-02\" AND created < \"2024-10-01\"",
+        "created >= \"2024-10-01\"",
+    ]
+
+
+def test_created_conditions_short_range():
+    """Ranges are at least one day long, so there may be fewer ranges.
+    """
+    assert _get_created_conditions(datetime.date(2024, 1, 1), datetime.date(2024, 1, 2), 4) == \
+        ["created < \"2024-01-02\"", "created >= \"2024-01-02\""]
+
+
+@pytest.mark.parametrize("oldest, newest", [
+    (datetime.date(2024, 1, 1), datetime.date(2024, 1, 1)),
+    (None, datetime.date(2024, 1, 1)),
+    (None, None),
+])
+def test_created_conditions_single_range(oldest, newest):
+    """A single range covers all issues if the dates do not allow a split.
+    """
+    assert _get_created_conditions(oldest, newest, 4) == ["created IS NOT EMPTY"]
+
+
+def test_merge_partitions():
+    """The issues are merged in the order of the partitions and the totals summed up.
+    """
+    partitions = [{"total": 1, "issues": [_ISSUES[0]]},
+                  {"total": 0, "issues": []},
+                  {"total": 2, "issues": _ISSUES[1:3]}]
+
+    assert _merge_partitions(partitions) == {"total": 3, "issues": _ISSUES[:3]}
+
+
+def _search(monkeypatch, jql_filter: str, partitions: int = 4) -> tuple:
+    """Run a partitioned search against fake pyJiraCli results.
+    Returns the issue keys and the searched filters.
+    """
+    searched_filters = []
+
+    def search_pyjiracli(jql_filter, max_results, _extra_fields=None, _file_path=None):
+        searched_filters.append(jql_filter)
+        issues = _ISSUES
+
+        for operator, date in re.findall(r"created (<|>=) \"([0-9-]+)\"", jql_filter):
+            boundary = datetime.date.fromisoformat(date)
+            issues = [issue for issue in issues
+                      if (datetime.date.fromisoformat(issue["fields"]["created"][:10]) < boundary)
+                      == (operator == "<")]
+
+        if "created DESC" in jql_filter:
+            issues = list(reversed(issues))
+
+        if str(max_results) != "0":
+            issues = issues[:int(max_results)]
+
+        return {"total": len(issues), "issues": issues}
+
+    jira = Jira({"server": "s", "token": "t", "filter": jql_filter, "max": "0", "fields": [],
+                 "file": "results.json", "partitions": partitions})
+    monkeypatch.setattr(jira, "_Jira__search_pyjiracli", search_pyjiracli)
+
+    results = jira.search()
+
+    return [issue["key"] for issue in results["issues"]], searched_filters
+
+
+def test_partitioned_search(monkeypatch):
+    """All issues are found once, oldest first.
+    """
+    keys, searched_filters = _search(monkeypatch, "project = P")
+
+    assert keys == ["P-1", "P-2", "P-3", "P-4"]
+    assert searched_filters[:2] == ["project = P ORDER BY created ASC",
+                                    "project = P ORDER BY created DESC"]
+    assert len(searched_filters) == 6
+
+
+def test_partitioned_search_descending(monkeypatch):
+    """A filter ordered by creation date descending keeps its order.
+    """
+    keys, _ = _search(monkeypatch, "project = P ORDER BY created DESC")
+
+    assert keys == ["P-4", "P-3", "P-2", "P-1"]
+
+
+def test_partitioned_search_other_order(monkeypatch):
+    """A filter ordered by another field is searched in one go.
+    """
+    keys, searched_filters = _search(monkeypatch, "project = P ORDER BY priority")
+
+    assert keys == ["P-1", "P-2", "P-3", "P-4"]
+    assert searched_filters == ["project = P ORDER BY priority"]
@@ -0,0 +1,188 @@
+"""Tests of the outbox.
+"""
+
+import os
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from pyMetricCli import pipeline
+from pyMetricCli.outbox import Outbox
+
+SUPERSET_CONFIG = {"server": "https://superset", "database": 1, "table": "metrics"}
+
+
+class _Uploader:  # pylint: disable=too-few-public-methods
+    """Records the uploaded files and fails from a given upload on.
+    """
+
+    def __init__(self, fail_from: int = -1) -> None:
+        self.uploads = []
+        self.fail_from = fail_from
+
+    def __call__(self, file_path: str, _pass_fds: tuple) -> int:
+        if (self.fail_from >= 0) and (len(self.uploads) >= self.fail_from):
+            return 1
+
+        with open(file_path, "r", encoding="utf-8") as file:
+            self.uploads.append(json.load(file))
+
+        return 0
+
+
+def _flush(outbox: Outbox, uploader: _Uploader, tmp_path, is_batch: bool = False) -> bool:
+    """Flush the group of SUPERSET_CONFIG, handing the file over on disk.
+    """
+    return outbox.flush(Outbox.get_group_key(SUPERSET_CONFIG), uploader, str(tmp_path),
+                        "file", is_batch)
+
+
+def test_max_rows(tmp_path):
+    """A group is due once it has the maximum number of rows.
+    """
+    outbox = Outbox(str(tmp_path / "outbox"), max_rows=3, max_age=3600)
+    group_key = Outbox.get_group_key(SUPERSET_CONFIG)
+
+    assert outbox.is_flush_due(group_key) is False
+
+    for index in range(2):
+        assert outbox.add(SUPERSET_CONFIG, {"value": index}) is True
+
+    assert outbox.is_flush_due(group_key) is False
+
+    outbox.add(SUPERSET_CONFIG, {"value": 2})
+
+    assert outbox.is_flush_due(group_key) is True
+
+
+def test_max_age(tmp_path, monkeypatch):
+    """A group is due once its oldest row has the maximum age.
+    """
+    outbox = Outbox(str(tmp_path / "outbox"), max_rows=100, max_age=60)
+    group_key = Outbox.get_group_key(SUPERSET_CONFIG)
+    now = time.time()
+
+    outbox.add(SUPERSET_CONFIG, {"value": 0})
+
+    assert outbox.is_flush_due(group_key) is False
+
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+
+    assert outbox.is_flush_due(group_key) is True
+
+
+def test_flush_all(tmp_path):
+    """With flush_all a group is due regardless of the thresholds.
+    """
+    outbox = Outbox(str(tmp_path / "outbox"), max_rows=100, max_age=3600, flush_all=True)
+    outbox.add(SUPERSET_CONFIG, {"value": 0})
+
+    assert outbox.is_flush_due(Outbox.get_group_key(SUPERSET_CONFIG)) is True
+
+
+def test_flush_uploads_each_row(tmp_path):
+    """Each row is uploaded as its own file and removed afterwards.
+    """
+    outbox = Outbox(str(tmp_path / "outbox"), max_rows=1)
+    uploader = _Uploader()
+
+    for index in range(3):
+        outbox.add(SUPERSET_CONFIG, {"value": index})
+
+    assert _flush(outbox, uploader, tmp_path) is True
+    assert uploader.uploads == [{"value": 0}, {"value": 1}, {"value": 2}]
+    assert outbox.is_flush_due(Outbox.get_group_key(SUPERSET_CONFIG)) is False
+
+
+def test_flush_batch(tmp_path):
+    """In batch mode all rows are uploaded as one list.
+    """
+    outbox = Outbox(str(tmp_path / "outbox"), max_rows=1)
+    uploader = _Uploader()
+
+    for index in range(3):
+        outbox.add(SUPERSET_CONFIG, {"value": index})
+
+    assert _flush(outbox, uploader, tmp_path, is_batch=True) is True
+    assert uploader.uploads == [[{"value": 0}, {"value": 1}, {"value": 2}]]
+
+
+def test_restore_after_failure(tmp_path):
+    """After a failed upload only the rows not uploaded are kept, before newer rows.
+    """
+    outbox = Outbox(str(tmp_path / "outbox"), max_rows=1)
+
+    for index in range(3):
+        outbox.add(SUPERSET_CONFIG, {"value": index})
+
+    assert _flush(outbox, _Uploader(fail_from=1), tmp_path) is False
+
+    outbox.add(SUPERSET_CONFIG, {"value": 3})
+    uploader = _Uploader()
+
+    assert _flush(outbox, uploader, tmp_path) is True
+    assert uploader.uploads == [{"value": 1}, {"value": 2}, {"value": 3}]
+    assert not any(file_name.endswith(".flushing")
+                   for file_name in os.listdir(tmp_path / "outbox"))
+
+
+def test_rows_added_during_upload(tmp_path):
+    """Rows added while an upload runs are kept for the next upload.
+    """
+    outbox = Outbox(str(tmp_path / "outbox"), max_rows=1)
+    outbox.add(SUPERSET_CONFIG, {"value": 0})
+    uploader = _Uploader()
+
+    def upload(file_path: str, pass_fds: tuple) -> int:
+        outbox.add(SUPERSET_CONFIG, {"value": 1})
+        return uploader(file_path, pass_fds)
+
+    assert _flush(outbox, upload, tmp_path) is True
+    assert uploader.uploads == [{"value": 0}]
+
+    uploader = _Uploader()
+
+    assert _flush(outbox, uploader, tmp_path) is True
+    assert uploader.uploads == [{"value": 1}]
+
+
+def test_recover_interrupted_upload(tmp_path):
+    """Rows claimed by a process which ended during its upload are put back.
+    """
+    outbox = Outbox(str(tmp_path / "outbox"), max_rows=2)
+    group_key = Outbox.get_group_key(SUPERSET_CONFIG)
+    rows_path = tmp_path / "outbox" / f"{group_key}.jsonl"
+
+    outbox.add(SUPERSET_CONFIG, {"value": 0})
+    os.replace(rows_path, f"{rows_path}.99999.1.flushing")
+    outbox.add(SUPERSET_CONFIG, {"value": 1})
+
+    assert outbox.is_flush_due(group_key) is True
+
+    uploader = _Uploader()
+
+    assert _flush(outbox, uploader, tmp_path) is True
+    assert uploader.uploads == [{"value": 0}, {"value": 1}]
+
+
+@pytest.mark.parametrize("superset_config, expected_uploads", [
+    (SUPERSET_CONFIG, [[{"value": 0}, {"value": 1}, {"value": 2}]]),
+    (dict(SUPERSET_CONFIG, outbox_batch=False), [{"value": 0}, {"value": 1}, {"value": 2}]),
+])
+def test_flush_outbox_uploads(tmp_path, monkeypatch, superset_config, expected_uploads):
+    """The rows of a table are uploaded by a single call, unless batches are disabled.
+    """
+    uploader = _Uploader()
+    monkeypatch.setattr(pipeline, "Superset",
+                        lambda _config: SimpleNamespace(is_installed=True, upload=uploader))
+
+    outbox = Outbox(str(tmp_path / "outbox"), flush_all=True)
+
+    for index in range(3):
+        outbox.add(superset_config, {"value": index})
+
+    pipeline.flush_outbox(outbox, [SimpleNamespace(superset_config=superset_config)])
+
+    assert uploader.uploads == expected_uploads
@@ -0,0 +1,124 @@
+"""Tests of the incremental and the partitioned Polarion search.
+"""
+
+import datetime
+
+import pytest
+
+from pyMetricCli.polarion import Polarion, get_partition_clauses, _get_updated_since_query, \
+    _get_work_item_id, _get_work_item_updated, _merge_partitions
+
+_TODAY = datetime.date(2024, 12, 31)
+
+
+def test_updated_since_query():
+    """The query covers the days since the watermark with a day of overlap.
+    """
+    assert _get_updated_since_query("2024-05-01T00:30:00.000000+00:00") == \
+        "updated:[20240430 TO 30000101]"
+
+
+def test_work_item_watermark():
+    """Work items are identified by id and their update time is in UTC.
+    """
+    work_item = {"id": "PRJ-1", "updated": "2024-05-01T10:00:00.000+0200"}
+
+    assert _get_work_item_id(work_item) == "PRJ-1"
+    assert _get_work_item_updated(work_item) == "2024-05-01T08:00:00.000000+00:00"
+    assert _get_work_item_updated({"id": "PRJ-2"}) is None
+
+
+def test_partition_clauses_list():
+    """A list of clauses is used as given.
+    """
+    assert get_partition_clauses(["type:requirement", "NOT type:requirement"], _TODAY) == \
+        ["type:requirement", "NOT type:requirement"]
+
+
+def test_partition_clauses_type():
+    """A partition per type and one for all other types.
+    """
+    assert get_partition_clauses({"by": "type", "values": ["requirement", "testcase"]},
+                                 _TODAY) == \
+        ["type:requirement", "type:testcase", "NOT (type:requirement OR type:testcase)"]
+
+
+def test_partition_clauses_created():
+    """The first range has no lower and the last range no upper bound,
+    and the ranges are disjoint and include their first and last day.
+    """
+    assert get_partition_clauses({"by": "created", "start": "2024-01-01", "count": 4},
+                                 _TODAY) == [
+        "created:[00010101 TO 20231231]",
+        "created:[20240101 TO 20240501]",
+        "created:[20240502 TO 20240831]",
+        "created:[20240901 TO 30000101]",
+    ]
+
+
+@pytest.mark.parametrize("start", ["2024-12-31", "2025-03-01"])
+def test_partition_clauses_created_short_range(start):
+    """A start at or after today leaves only the open ended ranges.
+    """
+    start_date = datetime.date.fromisoformat(start)
+    last_day = (start_date - datetime.timedelta(days=1)).strftime("%Y%m%d")
+
+    assert get_partition_clauses({"by": "created", "start": start, "count": 4}, _TODAY) == \
+        [f"created:[00010101 TO {last_day}]", f"created:[{start_date:%Y%m%d} TO 30000101]"]
+
+
+@pytest.mark.parametrize("partitions", [
+    "type:requirement",
+    [],
+    {"by": "type", "values": []},
+    {"by": "status"},
+    {"by": "created", "count": 4},
+    {"by": "created", "start": "01.01.2024", "count": 4},
+    {"by": "created", "start": "2024-01-01", "count": 1},
+])
+def test_invalid_partitions(partitions):
+    """Invalid partitions raise a ValueError.
+    """
+    with pytest.raises(ValueError):
+        get_partition_clauses(partitions, _TODAY)
+
+
+def test_merge_partitions():
+    """Work items found by several partitions are kept once, in the order of the partitions.
+    """
+    partitions = [{"workitems": [{"id": "PRJ-1"}, {"id": "PRJ-2"}]},
+                  {"workitems": [{"id": "PRJ-2"}, {"id": "PRJ-3"}]},
+                  {"workitems": []}]
+
+    assert _merge_partitions(partitions) == \
+        {"workitems": [{"id": "PRJ-1"}, {"id": "PRJ-2"}, {"id": "PRJ-3"}]}
+
+
+def test_merge_partitions_without_id():
+    """Work items without id are all kept.
+    """
+    partitions = [{"workitems": [{"status": "open"}, {"status": "closed"}]},
+                  {"workitems": [{"status": "open"}]}]
+
+    assert _merge_partitions(partitions) == \
+        {"workitems": [{"status": "open"}, {"status": "closed"}, {"status": "open"}]}
+
+
+def test_partitioned_search_requests_id(monkeypatch, tmp_path):
+    """A partitioned search requests the id, also if the fields exclude it.
+    """
+    requested = []
+
+    def search_pypolarioncli(_self, query, extra_fields=None, _output_dir=None):
+        requested.append(extra_fields)
+        return {"workitems": [{"id": query, "status": "open"}]}
+
+    monkeypatch.setattr(Polarion, "_search_pypolarioncli", search_pypolarioncli)
+
+    polarion = Polarion({"server": "s", "project": "PRJ", "query": "type:requirement",
+                         "fields": ["status"], "output": str(tmp_path),
+                         "partitions": ["created:[00010101 TO 20231231]",
+                                        "created:[20240101 TO 30000101]"]})
+
+    assert len(polarion.search()["workitems"]) == 2
+    assert requested == [["id"], ["id"]]
@@ -0,0 +1,172 @@
+"""Tests of the retries of the process engine.
+"""
+
+import sys
+import asyncio
+import subprocess
+
+import pytest
+
+from pyMetricCli import process_engine
+from pyMetricCli.backend import get_backend
+from pyMetricCli.process_engine import ProcessEngine, _is_transient, _get_backoff, \
+    RETURN_CODE_TIMEOUT, RETURN_CODE_CANCELLED, RETURN_CODE_NOT_STARTED
+
+
+def _result(returncode: int, stderr: bytes = b"", stdout: bytes = b"") \
+        -> subprocess.CompletedProcess:
+    """Create the result of a tool process.
+    """
+    return subprocess.CompletedProcess(["tool"], returncode, stdout, stderr)
+
+
+@pytest.mark.parametrize("result, expected", [
+    (_result(0, b"Connection reset."), False),
+    (_result(1, b"Invalid JQL."), False),
+    (_result(1, b"ConnectionError: Max retries exceeded"), True),
+    (_result(1, b"", b"HTTP 503 Service Unavailable"), True),
+    (_result(1, b"HTTP 429 Too Many Requests"), True),
+    (_result(1, b"Read timed out."), True),
+    (_result(1, b"Temporary failure in name resolution"), True),
+    (_result(1, b"Issue 5031 not found."), False),
+    (_result(RETURN_CODE_TIMEOUT), False),
+    (_result(RETURN_CODE_CANCELLED, b"Connection reset."), False),
+    (_result(RETURN_CODE_NOT_STARTED, b"Connection reset."), False),
+])
+def test_is_transient(result, expected):
+    """Network or server errors are transient, timeouts by default not.
+    """
+    assert _is_transient(result) is expected
+
+
+def test_timeout_transient():
+    """A timeout is transient if timeouts are retried.
+    """
+    assert _is_transient(_result(RETURN_CODE_TIMEOUT), True) is True
+    assert _is_transient(_result(1, b"Connection reset."), True) is True
+
+
+@pytest.mark.parametrize("attempt, minimum, maximum", [
+    (0, 1.0, 2.0),
+    (1, 2.0, 4.0),
+    (2, 4.0, 8.0),
+    (5, 30.0, 60.0),
+    (20, 30.0, 60.0),
+])
+def test_backoff(attempt, minimum, maximum):
+    """The backoff doubles with each retry up to its maximum, with jitter.
+    """
+    delays = [_get_backoff(attempt) for _ in range(100)]
+
+    assert minimum <= min(delays)
+    assert max(delays) <= maximum
+
+
+def _run_with_retries(monkeypatch, results: list, retries: int, retry_timeout: bool = False):
+    """Run a fake process with retries and return the attempts and the backoffs.
+    """
+    attempts = []
+    delays = []
+
+    async def run_once(args, _timeout, _pass_fds):
+        attempts.append(args)
+        return results[len(attempts) - 1]
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    engine = ProcessEngine()
+    monkeypatch.setattr(engine, "_run_once", run_once)
+    monkeypatch.setattr(process_engine.asyncio, "sleep", sleep)
+    monkeypatch.setattr(process_engine.random, "uniform", lambda low, high: high)
+
+    # pylint: disable=protected-access
+    result = asyncio.run(engine._run_with_retries(["tool"], 10, retries, (), retry_timeout))
+
+    return result, len(attempts), delays
+
+
+def test_retries(monkeypatch):
+    """Transient failures are retried with exponential backoff.
+    """
+    results = [_result(1, b"HTTP 503"), _result(1, b"Connection reset."), _result(0)]
+    result, attempts, delays = _run_with_retries(monkeypatch, results, 2)
+
+    assert result.returncode == 0
+    assert attempts == 3
+    assert delays == [2.0, 4.0]
+
+
+def test_retries_exhausted(monkeypatch):
+    """The last result is returned if all retries fail.
+    """
+    results = [_result(1, b"HTTP 503")] * 3
+    result, attempts, _ = _run_with_retries(monkeypatch, results, 2)
+
+    assert result.returncode == 1
+    assert attempts == 3
+
+
+def test_permanent_failure(monkeypatch):
+    """Permanent failures are not retried.
+    """
+    result, attempts, delays = _run_with_retries(monkeypatch, [_result(1, b"Invalid JQL.")], 2)
+
+    assert result.returncode == 1
+    assert attempts == 1
+    assert not delays
+
+
+def test_timeout_not_retried(monkeypatch):
+    """A timeout is not retried by default.
+    """
+    results = [_result(RETURN_CODE_TIMEOUT), _result(0)]
+    result, attempts, _ = _run_with_retries(monkeypatch, results, 2)
+
+    assert result.returncode == RETURN_CODE_TIMEOUT
+    assert attempts == 1
+
+
+def test_timeout_retried(monkeypatch):
+    """A timeout is retried if timeouts are retried.
+    """
+    results = [_result(RETURN_CODE_TIMEOUT), _result(0)]
+    result, attempts, _ = _run_with_retries(monkeypatch, results, 2, retry_timeout=True)
+
+    assert result.returncode == 0
+    assert attempts == 2
+
+
+def test_search_timeout_not_retried(tmp_path):
+    """A search which timed out is not run again.
+    """
+    starts_path = tmp_path / "starts"
+    script = f"open({str(starts_path)!r}, 'a').write('x'); import time; time.sleep(30)"
+
+    result = get_backend({"timeout": 0.5, "retries": 2}).run(sys.executable, ["-c", script])
+
+    assert result.returncode == RETURN_CODE_TIMEOUT
+    assert starts_path.read_text() == "x"
+
+
+def test_timeout_kills_process():
+    """A process is killed after its timeout.
+    """
+    result = ProcessEngine().run([sys.executable, "-c", "import time; time.sleep(30)"],
+                                 timeout=0.5, retries=0)
+
+    assert result.returncode == RETURN_CODE_TIMEOUT
+
+
+def test_upload_backend():
+    """Searches retry timeouts only if configured, uploads are not retried
+    by default and never after a timeout.
+    """
+    search_backend = get_backend({})
+    upload_backend = get_backend({}, is_upload=True)
+    configured_backend = get_backend({"retries": 1, "retry_timeout": True}, is_upload=True)
+
+    assert (search_backend.retries, search_backend.retry_timeout) == (2, False)
+    assert get_backend({"retry_timeout": True}).retry_timeout is True
+    assert (upload_backend.retries, upload_backend.retry_timeout) == (0, False)
+    assert (configured_backend.retries, configured_backend.retry_timeout) == (1, False)
@@ -0,0 +1,159 @@
+"""Tests of the grouping of the searches of several adapters.
+"""
+
+from types import SimpleNamespace
+
+from pyMetricCli.polarion import Polarion
+from pyMetricCli.query_planner import QueryPlanner
+
+_JIRA = {"server": "https://jira.example.com", "token": "t", "filter": "project = P",
+         "max": "0", "fields": ["status"]}
+_POLARION = {"server": "https://polarion.example.com", "project": "PRJ",
+             "query": "type:requirement", "fields": ["id"]}
+
+
+def _adapter(jira_config: dict = None, polarion_config: dict = None) -> SimpleNamespace:
+    """Create an adapter with the given search configurations.
+    """
+    return SimpleNamespace(jira_config={} if jira_config is None else jira_config,
+                           polarion_config={} if polarion_config is None else polarion_config)
+
+
+def _plan(*adapters) -> QueryPlanner:
+    """Plan the searches of the adapters.
+    """
+    planner = QueryPlanner()
+
+    for index, adapter in enumerate(adapters):
+        planner.add_adapter(index, adapter)
+
+    return planner
+
+
+def test_equal_searches():
+    """Searches differing only in fields and whitespace run once with all fields.
+    """
+    planner = _plan(_adapter(_JIRA, _POLARION),
+                    _adapter(dict(_JIRA, filter="project  =  P ", fields=["status", "labels"]),
+                             dict(_POLARION, fields=["title"], file="other.json")))
+
+    assert len(planner.jira_searches) == 1
+    assert planner.jira_searches[0].adapter_indices == [0, 1]
+    assert planner.jira_searches[0].config["fields"] == ["status", "labels"]
+    assert planner.jira_searches[0].config["filter"] == "project = P"
+    assert len(planner.polarion_searches) == 1
+    assert planner.polarion_searches[0].config["fields"] == ["id", "title"]
+
+
+def test_different_searches():
+    """Searches with another filter, server or maximum run separately.
+    """
+    planner = _plan(_adapter(_JIRA),
+                    _adapter(dict(_JIRA, filter="project = Q")),
+                    _adapter(dict(_JIRA, server="https://other.example.com")),
+                    _adapter(dict(_JIRA, max="10")),
+                    _adapter(dict(_JIRA, fields=[])))
+
+    assert [search.adapter_indices for search in planner.jira_searches] == \
+        [[0, 4], [1], [2], [3]]
+
+
+def test_all_fields():
+    """An adapter requesting all fields gets all fields for the shared search.
+    """
+    planner = _plan(_adapter(_JIRA), _adapter(dict(_JIRA, fields=[])), _adapter(_JIRA))
+
+    assert planner.jira_searches[0].config["fields"] == []
+
+
+def test_empty_searches():
+    """Adapters without filter or query have no search.
+    """
+    planner = _plan(_adapter(dict(_JIRA, filter=""), _POLARION), _adapter())
+
+    assert not planner.jira_searches
+    assert [search.adapter_indices for search in planner.polarion_searches] == [[0]]
+
+
+def test_stream():
+    """A shared search is only streamed if all its adapters stream it.
+    """
+    streamed = _plan(_adapter(dict(_JIRA, stream=True)), _adapter(dict(_JIRA, stream=True)))
+    mixed = _plan(_adapter(dict(_JIRA, stream=True)), _adapter(_JIRA))
+
+    assert streamed.jira_searches[0].config["stream"] is True
+    assert mixed.jira_searches[0].config["stream"] is False
+
+
+def test_maximum_settings():
+    """Partitions, timeout and retries are the largest of the adapters,
+    including their defaults.
+    """
+    planner = _plan(_adapter(dict(_JIRA, partitions=4, timeout=60)),
+                    _adapter(dict(_JIRA, partitions=2, retries=5)))
+    config = planner.jira_searches[0].config
+
+    assert (config["partitions"], config["timeout"], config["retries"]) == (4, 3600, 5)
+
+
+def test_unset_settings():
+    """Settings which no adapter sets stay unset.
+    """
+    config = _plan(_adapter(_JIRA, _POLARION), _adapter(_JIRA, _POLARION)).jira_searches[0].config
+
+    assert not {"partitions", "timeout", "retries"} & set(config)
+
+
+def test_polarion_partitions():
+    """The partition clauses of Polarion are kept, also if the first adapter has none.
+    """
+    clauses = ["type:requirement", "NOT type:requirement"]
+    planner = _plan(_adapter(polarion_config=_POLARION),
+                    _adapter(polarion_config=dict(_POLARION, partitions=clauses)))
+
+    assert planner.polarion_searches[0].config["partitions"] == clauses
+
+
+def test_shared_polarion_search(monkeypatch):
+    """Two adapters sharing a Polarion query get the results of a single search.
+    """
+    queries = []
+
+    def search_pypolarioncli(_self, query, _extra_fields=None, _output_dir=None):
+        queries.append(query)
+        return {"workitems": [{"id": "PRJ-1"}]}
+
+    monkeypatch.setattr(Polarion, "_search_pypolarioncli", search_pypolarioncli)
+
+    planner = _plan(_adapter(polarion_config=_POLARION), _adapter(polarion_config=_POLARION))
+    polarion = Polarion(planner.polarion_searches[0].config)
+
+    assert polarion.search() == {"workitems": [{"id": "PRJ-1"}]}
+    assert queries == ["type:requirement"]
+
+
+def test_retry_timeout():
+    """A shared search retries a timeout if any of its adapters does.
+    """
+    planner = _plan(_adapter(_JIRA), _adapter(dict(_JIRA, retry_timeout=True)))
+
+    assert len(planner.jira_searches) == 1
+    assert planner.jira_searches[0].config["retry_timeout"] is True
+
+
+def test_no_timeout():
+    """No timeout is larger than any timeout.
+    """
+    planner = _plan(_adapter(dict(_JIRA, timeout=60)), _adapter(dict(_JIRA, timeout=None)),
+                    _adapter(dict(_JIRA, timeout=7200)))
+
+    assert planner.jira_searches[0].config["timeout"] is None
+
+
+def test_config_not_changed():
+    """The configurations of the adapters are not changed by the plan.
+    """
+    jira_config = dict(_JIRA)
+    _plan(_adapter(jira_config), _adapter(dict(_JIRA, fields=["labels"])))
+
+    assert jira_config == _JIRA
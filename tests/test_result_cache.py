@@ -0,0 +1,92 @@
+"""Tests of the result cache.
+"""
+
+import os
+import stat
+import time
+
+from pyMetricCli import result_cache
+from pyMetricCli.result_cache import ResultCache
+
+_RESULTS = {"total": 1, "issues": [{"key": "P-1"}]}
+
+
+def test_make_key():
+    """The key does not depend on the order of the parts.
+    """
+    assert ResultCache.make_key(server="s", filter="f") == \
+        ResultCache.make_key(filter="f", server="s")
+    assert ResultCache.make_key(server="s", filter="f") != \
+        ResultCache.make_key(server="s", filter="g")
+
+
+def test_put_and_get(tmp_path):
+    """Stored results are returned until they expire.
+    """
+    cache = ResultCache(str(tmp_path / "results"))
+    cache.put("a", _RESULTS)
+
+    assert cache.get("a") == _RESULTS
+    assert cache.get("b") is None
+
+    if os.name == "posix":
+        assert stat.S_IMODE(os.stat(cache.directory).st_mode) == 0o700
+
+
+def test_ttl(tmp_path, monkeypatch):
+    """An entry expires after the time to live of the cache or of the lookup.
+    """
+    now = time.time()
+    cache = ResultCache(str(tmp_path), ttl=60)
+    cache.put("a", _RESULTS)
+
+    monkeypatch.setattr(result_cache.time, "time", lambda: now + 61)
+
+    assert cache.get("a") is None
+    assert cache.get("a", ttl=120) == _RESULTS
+
+    monkeypatch.setattr(result_cache.time, "time", lambda: now + 121)
+
+    assert cache.get("a", ttl=120) is None
+
+
+def test_refresh(tmp_path):
+    """Refreshing caches never read entries, but still write them.
+    """
+    ResultCache(str(tmp_path), refresh=True).put("a", _RESULTS)
+
+    assert ResultCache(str(tmp_path), refresh=True).get("a") is None
+    assert ResultCache(str(tmp_path)).get("a") == _RESULTS
+
+
+def test_lru_eviction(tmp_path):
+    """The least recently used entries are removed if the cache is too large.
+    """
+    cache = ResultCache(str(tmp_path))
+
+    for index, key in enumerate(["a", "b", "c"]):
+        cache.put(key, _RESULTS)
+        os.utime(os.path.join(cache.directory, f"{key}.json"), (1000 + index, 1000 + index))
+
+    # The entries differ by a few bytes, as their creation times differ.
+    entry_size = os.path.getsize(os.path.join(cache.directory, "a.json"))
+    cache.max_size = entry_size * 3 + entry_size // 2
+
+    # Using "a" makes "b" the least recently used entry.
+    assert cache.get("a") == _RESULTS
+
+    cache.put("d", _RESULTS)
+
+    assert sorted(os.listdir(cache.directory)) == ["a.json", "c.json", "d.json"]
+
+
+def test_invalid_entry(tmp_path):
+    """An unreadable entry is a cache miss.
+    """
+    cache = ResultCache(str(tmp_path))
+    cache.put("a", _RESULTS)
+
+    with open(os.path.join(cache.directory, "a.json"), "wb") as file:
+        file.write(b"{")
+
+    assert cache.get("a") is None
@@ -0,0 +1,71 @@
+"""Tests of the JSON serializers.
+"""
+
+import json
+
+import pytest
+
+from pyMetricCli import serializer
+from pyMetricCli.serializer import JsonSerializer, OrjsonSerializer, MsgspecSerializer
+
+_SERIALIZERS = [JsonSerializer]
+
+if serializer.orjson is not None:
+    _SERIALIZERS.append(OrjsonSerializer)
+
+if serializer.msgspec is not None:
+    _SERIALIZERS.append(MsgspecSerializer)
+
+_CONTENT = {"issues": [{"key": "P-1", "fields": {"summary": "Ä €", "points": 2.5,
+                                                 "labels": [], "resolution": None}}],
+            "total": 1}
+
+
+@pytest.fixture(name="json_serializer", params=_SERIALIZERS)
+def fixture_json_serializer(request):
+    """Each installed serializer.
+    """
+    return request.param()
+
+
+def test_round_trip(json_serializer):
+    """Content is decoded as it was encoded, like by the json module.
+    """
+    data = json_serializer.dumps(_CONTENT)
+
+    assert json_serializer.loads(data) == _CONTENT
+    assert json.loads(data) == _CONTENT
+    assert json_serializer.loads(data.decode("utf-8")) == _CONTENT
+
+
+def test_compact_and_pretty(json_serializer):
+    """Compact JSON has no whitespace, pretty JSON is indented by 2 spaces.
+    """
+    assert json_serializer.dumps({"a": [1, 2]}) == b'{"a":[1,2]}'
+    assert json_serializer.dumps({"a": 1}, pretty=True) == b'{\n  "a": 1\n}'
+
+
+def test_big_integer(json_serializer):
+    """Integers beyond 64 bit are encoded by the fallback.
+    """
+    assert json.loads(json_serializer.dumps({"id": 2 ** 70})) == {"id": 2 ** 70}
+
+
+def test_invalid_json(json_serializer):
+    """Invalid JSON raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        json_serializer.loads(b'{"a": ')
+
+
+def test_select_serializer(monkeypatch):
+    """The serializer is selected by the environment variable.
+    """
+    monkeypatch.setenv(serializer.SERIALIZER_ENV, "json")
+    serializer.set_serializer(None)
+
+    try:
+        assert serializer.get_serializer().name == "json"
+        assert serializer.loads(serializer.dumps(_CONTENT)) == _CONTENT
+    finally:
+        serializer.set_serializer(None)
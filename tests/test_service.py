@@ -0,0 +1,213 @@
+"""Tests of the service mode.
+"""
+
+import json
+import datetime
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from pyMetricCli.ret import Ret
+from pyMetricCli.adapter_interface import AdapterInterface
+from pyMetricCli.service import MetricService, _RequestHandler, parse_listen_address
+
+
+class _Adapter(AdapterInterface):
+    """Adapter counting its runs in its output.
+    """
+    output = {"runs": 0}
+    jira_config = {}
+    polarion_config = {}
+    superset_config = {}
+
+    def __init__(self, schedule: str = None) -> None:
+        self.output = {"runs": 0}
+
+        if schedule is not None:
+            self.schedule = schedule
+
+        super().__init__()
+
+    def handle_jira(self, _search_results: dict) -> bool:
+        return True
+
+    def handle_polarion(self, _search_results: dict) -> bool:
+        return True
+
+
+class _Runner:  # pylint: disable=too-few-public-methods
+    """Stands in for run_loaded_adapters() and records the runs.
+    """
+
+    def __init__(self, results: list = None) -> None:
+        self.runs = []
+        self.results = results
+
+    def __call__(self, loaded_adapters: list) -> list:
+        self.runs.append([adapter for _, adapter in loaded_adapters])
+
+        for _, adapter in loaded_adapters:
+            adapter.output["runs"] += 1
+
+        if self.results is not None:
+            return self.results[:len(loaded_adapters)]
+
+        return [Ret.OK] * len(loaded_adapters)
+
+
+@pytest.fixture(name="http_service")
+def fixture_http_service():
+    """A service with two adapters behind its HTTP endpoint.
+    """
+    service = MetricService([("a.py", _Adapter()), ("b.py", _Adapter())], _Runner())
+    http_server = ThreadingHTTPServer(("127.0.0.1", 0), _RequestHandler)
+    http_server.service = service
+    threading.Thread(target=http_server.serve_forever, daemon=True).start()
+
+    yield service, f"http://127.0.0.1:{http_server.server_address[1]}"
+
+    http_server.shutdown()
+    http_server.server_close()
+
+
+def _request(url: str, method: str = "GET"):
+    """Send a request and return the status code and the JSON content.
+    """
+    request = urllib.request.Request(url, method=method)
+
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_schedules():
+    """Adapters use their own schedule or the default schedule.
+    """
+    service = MetricService([("a.py", _Adapter("*/5 * * * *")), ("b.py", _Adapter())],
+                            _Runner(), default_schedule="@daily")
+
+    assert [scheduled.schedule.expression for scheduled in service.adapters] == \
+        ["*/5 * * * *", "@daily"]
+
+
+def test_invalid_schedule():
+    """An invalid schedule is an error of the service.
+    """
+    with pytest.raises(ValueError):
+        MetricService([("a.py", _Adapter("every minute"))], _Runner())
+
+
+def test_due_adapters():
+    """Only due adapters run, and their next run is scheduled.
+    """
+    service = MetricService([("a.py", _Adapter("*/5 * * * *")), ("b.py", _Adapter("@daily"))],
+                            _Runner())
+    now = datetime.datetime(2025, 1, 6, 10, 5)
+
+    for scheduled in service.adapters:
+        scheduled.next_run = scheduled.schedule.get_next_time(now - datetime.timedelta(minutes=1))
+
+    # pylint: disable=protected-access
+    due_adapters = service._get_due_adapters(now)
+
+    assert [scheduled.adapter_file for scheduled in due_adapters] == ["a.py"]
+    assert service.adapters[0].next_run == datetime.datetime(2025, 1, 6, 10, 10)
+    assert not service._get_due_adapters(now)
+
+
+def test_trigger():
+    """Triggered adapters are due regardless of their schedule.
+    """
+    service = MetricService([("a.py", _Adapter()), ("b.py", _Adapter())], _Runner())
+    now = datetime.datetime.now()
+
+    assert service.trigger("unknown.py") is False
+    assert service.trigger("b.py") is True
+    assert service.get_status()["pending"] == ["b.py"]
+
+    # pylint: disable=protected-access
+    assert [scheduled.adapter_file for scheduled in service._get_due_adapters(now)] == ["b.py"]
+    assert service.get_status()["pending"] == []
+
+
+def test_run_resets_output():
+    """Each run starts with the initial output and records its status.
+    """
+    runner = _Runner([Ret.OK, Ret.ERROR_SUPERSET_UPLOAD])
+    service = MetricService([("a.py", _Adapter()), ("b.py", _Adapter())], runner)
+
+    service.run(service.adapters)
+    results = service.run(service.adapters)
+
+    assert results == [Ret.OK, Ret.ERROR_SUPERSET_UPLOAD]
+    assert [scheduled.adapter.output["runs"] for scheduled in service.adapters] == [1, 1]
+    assert [scheduled.last_run["status"] for scheduled in service.adapters] == \
+        ["OK", "ERROR_SUPERSET_UPLOAD"]
+
+
+def test_run_error():
+    """An error of the run marks all its adapters as failed.
+    """
+    def run_adapters(_loaded_adapters: list) -> list:
+        raise RuntimeError("Failed.")
+
+    service = MetricService([("a.py", _Adapter())], run_adapters)
+
+    assert service.run(service.adapters) == [Ret.ERROR]
+    assert service.adapters[0].last_run["status"] == "ERROR"
+
+
+def test_http_status(http_service):
+    """GET /status returns the status of all adapters.
+    """
+    _, url = http_service
+    status_code, content = _request(f"{url}/status")
+
+    assert status_code == 200
+    assert content["running"] is False
+    assert [adapter["adapter_file"] for adapter in content["adapters"]] == ["a.py", "b.py"]
+
+
+def test_http_run(http_service):
+    """POST /run triggers all adapters or a single one.
+    """
+    service, url = http_service
+
+    assert _request(f"{url}/run?adapter=a.py", "POST") == (202, {"triggered": "a.py"})
+    assert service.get_status()["pending"] == ["a.py"]
+    assert _request(f"{url}/run", "POST") == (202, {"triggered": "all"})
+    assert service.get_status()["pending"] == ["a.py", "b.py"]
+
+
+def test_http_errors(http_service):
+    """Unknown paths and adapters are answered with 404.
+    """
+    _, url = http_service
+
+    assert _request(f"{url}/run?adapter=c.py", "POST")[0] == 404
+    assert _request(f"{url}/unknown")[0] == 404
+    assert _request(f"{url}/status", "POST")[0] == 404
+
+
+@pytest.mark.parametrize("address, expected", [
+    ("127.0.0.1:8765", ("127.0.0.1", 8765)),
+    ("0.0.0.0:80", ("0.0.0.0", 80)),
+    ("8080", ("127.0.0.1", 8080)),
+    (":8080", ("127.0.0.1", 8080)),
+])
+def test_parse_listen_address(address, expected):
+    """The host defaults to the local host.
+    """
+    assert parse_listen_address(address) == expected
+
+
+def test_parse_invalid_listen_address():
+    """An invalid port raises a ValueError.
+    """
+    with pytest.raises(ValueError):
+        parse_listen_address("localhost:http")
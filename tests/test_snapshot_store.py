@@ -0,0 +1,157 @@
+"""Tests of the snapshots of the incremental searches.
+"""
+
+import re
+import datetime
+
+import pytest
+
+from pyMetricCli import snapshot_store
+from pyMetricCli.snapshot_store import SnapshotStore, to_utc_timestamp, find_items_key
+from pyMetricCli.jira import _get_updated_since_condition, _get_issue_key, _get_issue_updated
+
+
+def _issue(key: str, updated: str, summary: str = "") -> dict:
+    """Create an issue of the Jira search results.
+    """
+    return {"key": key, "fields": {"updated": updated, "summary": summary}}
+
+
+def _store(tmp_path) -> SnapshotStore:
+    """Create a store of Jira issues.
+    """
+    return SnapshotStore("search", _get_issue_key, _get_issue_updated, str(tmp_path))
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-05-01T10:00:00.000+0200", "2024-05-01T08:00:00.000000+00:00"),
+    ("2024-05-01T10:00:00+02:00", "2024-05-01T08:00:00.000000+00:00"),
+    ("2024-05-01T08:00:00.123Z", "2024-05-01T08:00:00.123000+00:00"),
+    ("2024-04-30T23:30:00.000-0100", "2024-05-01T00:30:00.000000+00:00"),
+    ("yesterday", None),
+    (None, None),
+    (1714550400, None),
+])
+def test_to_utc_timestamp(value, expected):
+    """Timestamps with any offset are converted to comparable UTC timestamps.
+    """
+    assert to_utc_timestamp(value) == expected
+
+
+def test_find_items_key():
+    """The expected key is preferred, else the first list.
+    """
+    assert find_items_key({"total": 1, "issues": []}, "issues") == "issues"
+    assert find_items_key({"total": 1, "values": []}, "issues") == "values"
+    assert find_items_key({"total": 0}, "issues") == "issues"
+
+
+def test_full_and_incremental_merge(tmp_path):
+    """An incremental search updates and adds items, a full search replaces them.
+    """
+    store = _store(tmp_path)
+    results = store.merge({"total": 2, "issues": [_issue("P-1", "2024-05-01T10:00:00.000+0200"),
+                                                  _issue("P-2", "2024-05-02T10:00:00.000+0200")]},
+                          "issues", is_full=True)
+
+    assert results["total"] == 2
+
+    results = store.merge({"total": 2, "issues": [_issue("P-2", "2024-05-03T10:00:00.000+0200",
+                                                         "changed"),
+                                                  _issue("P-3", "2024-05-03T11:00:00.000+0200")]},
+                          "issues", is_full=False)
+
+    assert results["total"] == 3
+    assert [issue["key"] for issue in results["issues"]] == ["P-1", "P-2", "P-3"]
+    assert results["issues"][1]["fields"]["summary"] == "changed"
+
+    results = store.merge({"total": 1, "issues": [_issue("P-3", "2024-05-03T11:00:00.000+0200")]},
+                          "issues", is_full=True)
+
+    assert [issue["key"] for issue in results["issues"]] == ["P-3"]
+
+
+def test_watermark(tmp_path):
+    """The watermark is the latest update of all items, in UTC.
+    """
+    store = _store(tmp_path)
+    store.update({"issues": [_issue("P-1", "2024-05-01T10:00:00.000+0200"),
+                             _issue("P-2", "2024-05-01T09:30:00.000+0000"),
+                             _issue("P-3", "unknown")]}, "issues", is_full=True)
+
+    assert store.watermark == "2024-05-01T09:30:00.000000+00:00"
+
+    # An older item does not move the watermark back.
+    store.update({"issues": [_issue("P-1", "2024-04-01T10:00:00.000+0200")]}, "issues",
+                 is_full=False)
+
+    assert store.watermark == "2024-05-01T09:30:00.000000+00:00"
+
+
+def test_no_items(tmp_path):
+    """Without any item there is no watermark, so the next search is a full one.
+    """
+    store = _store(tmp_path)
+    store.update({"total": 0, "issues": []}, "issues", is_full=True)
+
+    assert store.watermark is None
+    assert store.is_full_sync_due(0) is True
+
+
+def test_save_and_load(tmp_path):
+    """A saved snapshot is loaded by the next run.
+    """
+    store = _store(tmp_path)
+    store.merge({"total": 1, "startAt": 0, "issues": [_issue("P-1", "2024-05-01T10:00:00Z")]},
+                "issues", is_full=True)
+
+    loaded = _store(tmp_path)
+    loaded.load()
+
+    assert loaded.watermark == store.watermark
+    assert loaded.get_results("issues") == {"total": 1, "startAt": 0,
+                                            "issues": [_issue("P-1", "2024-05-01T10:00:00Z")]}
+
+
+def test_invalid_snapshot(tmp_path):
+    """An unreadable snapshot is ignored, so the next search is a full one.
+    """
+    store = _store(tmp_path)
+
+    with open(store.file_path, "wb") as file:
+        file.write(b"{")
+
+    store.load()
+
+    assert (store.watermark, store.items) == (None, {})
+
+
+def test_full_sync_interval(tmp_path, monkeypatch):
+    """A full search is due after the interval, never for 0.
+    """
+    now = 1_000_000.0
+    monkeypatch.setattr(snapshot_store.time, "time", lambda: now)
+
+    store = _store(tmp_path)
+    store.update({"issues": [_issue("P-1", "2024-05-01T10:00:00Z")]}, "issues", is_full=True)
+    monkeypatch.setattr(snapshot_store.time, "time", lambda: now + 3600)
+
+    assert store.is_full_sync_due(7200) is False
+    assert store.is_full_sync_due(3600) is True
+    assert store.is_full_sync_due(0) is False
+
+
+def test_updated_since_condition():
+    """The Jira condition covers the time since the watermark with an overlap.
+    """
+    watermark = (datetime.datetime.now(datetime.timezone.utc) -
+                 datetime.timedelta(minutes=60)).isoformat()
+    minutes = int(re.fullmatch(r"updated >= -(\d+)m", _get_updated_since_condition(watermark))[1])
+
+    assert 65 <= minutes <= 66
+
+    # A watermark in the future still fetches the last minutes.
+    future = (datetime.datetime.now(datetime.timezone.utc) +
+              datetime.timedelta(hours=1)).isoformat()
+
+    assert _get_updated_since_condition(future) == "updated >= -5m"